@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from typing import Dict, Tuple
+
+class BalanceAccumulator:
+    """重量平衡累加器
+
+    维护各区域重量、扭矩以及加权质心的累加和，箱子加入、移除、移动、
+    旋转时以O(1)更新，calculate_weight_balance直接由累加和得出结果。
+
+    坐标系与 Container.calculate_weight_balance 一致：
+    X轴（length方向）= 前后方向，Y轴（width方向）= 左右方向；
+    质心 X < 中心为前方，Y < 中心为右侧（界面上方）。
+    """
+
+    def __init__(self, length: float, width: float):
+        self.center_x_line = length / 2
+        self.center_y_line = width / 2
+        self.reset()
+
+    def reset(self) -> None:
+        """清零所有累加和"""
+        self.count = 0
+        self.total_weight = 0.0
+        self.weighted_x = 0.0  # Σ 重量 × 质心X
+        self.weighted_y = 0.0  # Σ 重量 × 质心Y
+        self.left_weight = 0.0
+        self.right_weight = 0.0
+        self.front_weight = 0.0
+        self.rear_weight = 0.0
+        self.left_torque = 0.0
+        self.right_torque = 0.0
+        self.front_torque = 0.0
+        self.rear_torque = 0.0
+
+    def add(self, weight: float, center_x: float, center_y: float) -> None:
+        """加入一个质心位于 (center_x, center_y) 的重量"""
+        self._apply(weight, center_x, center_y, 1)
+
+    def remove(self, weight: float, center_x: float, center_y: float) -> None:
+        """移除之前加入的重量"""
+        self._apply(weight, center_x, center_y, -1)
+
+    def _apply(self, weight: float, center_x: float, center_y: float, sign: int) -> None:
+        signed_weight = sign * weight
+        self.count += sign
+        self.total_weight += signed_weight
+        self.weighted_x += signed_weight * center_x
+        self.weighted_y += signed_weight * center_y
+
+        distance_to_fr_line = abs(center_x - self.center_x_line)
+        if center_x < self.center_x_line:
+            self.front_weight += signed_weight
+            self.front_torque += signed_weight * distance_to_fr_line
+        else:
+            self.rear_weight += signed_weight
+            self.rear_torque += signed_weight * distance_to_fr_line
+
+        distance_to_lr_line = abs(center_y - self.center_y_line)
+        if center_y < self.center_y_line:
+            self.right_weight += signed_weight
+            self.right_torque += signed_weight * distance_to_lr_line
+        else:
+            self.left_weight += signed_weight
+            self.left_torque += signed_weight * distance_to_lr_line
+
+        if self.count == 0:
+            # 清空后归零，消除浮点累计误差
+            self.reset()
+
+    @property
+    def signed_torques(self) -> Tuple[float, float]:
+        """带符号净扭矩 (左-右, 前-后)，单位 kg·mm"""
+        return (self.left_torque - self.right_torque, self.front_torque - self.rear_torque)
+
+def balance_report(regions: Dict[str, float], length: float, width: float,
+                   lr_torque_limit: float, fr_torque_limit: float) -> Dict[str, float]:
+    """由各区域重量、扭矩和重心得出完整的重量平衡结果（字段与 Container.calculate_weight_balance 相同）"""
+    left_torque = regions['left_torque']
+    right_torque = regions['right_torque']
+    front_torque = regions['front_torque']
+    rear_torque = regions['rear_torque']
+
+    lr_torque = abs(left_torque - right_torque)
+    fr_torque = abs(front_torque - rear_torque)
+
+    left_equivalent = left_torque / (width / 2)
+    right_equivalent = right_torque / (width / 2)
+    front_equivalent = front_torque / (length / 2)
+    rear_equivalent = rear_torque / (length / 2)
+
+    return {
+        'left_weight': regions['left_weight'],
+        'right_weight': regions['right_weight'],
+        'front_weight': regions['front_weight'],
+        'rear_weight': regions['rear_weight'],
+        'left_torque': left_torque,
+        'right_torque': right_torque,
+        'front_torque': front_torque,
+        'rear_torque': rear_torque,
+        'lr_torque': lr_torque,
+        'fr_torque': fr_torque,
+        'left_equivalent': left_equivalent,
+        'right_equivalent': right_equivalent,
+        'front_equivalent': front_equivalent,
+        'rear_equivalent': rear_equivalent,
+        'lr_equivalent_diff': abs(left_equivalent - right_equivalent),
+        'fr_equivalent_diff': abs(front_equivalent - rear_equivalent),
+        'lr_torque_limit': lr_torque_limit,
+        'fr_torque_limit': fr_torque_limit,
+        'center_x': regions['center_x'],
+        'center_y': regions['center_y'],
+        'is_balanced': lr_torque <= lr_torque_limit and fr_torque <= fr_torque_limit
+    }
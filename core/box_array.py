@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .box import Box
+
+class BoxArray:
+    """箱子的列式存储（结构数组）
+
+    每个字段一列 NumPy 数组：ids, length, width, weight, height, x, y, rotated，
+    集装箱范围的面积、重量、平衡、边界检查、重叠矩阵等运算都写成数组表达式。
+    行号通过 Box → 行 的映射以O(1)查找；删除时把最后一行换到空位，
+    容量按倍数增长，追加为摊还O(1)。sequence 列记录加入顺序，用于还原箱子列表顺序。
+
+    freeze() 把当前列以只读视图交给快照共享（写时复制）：之后第一次写入时
+    才复制被共享的列组。只移动、旋转箱子时只复制位置列组（x, y, rotated），
+    尺寸、重量等静态列在快照之间继续共享。
+    """
+
+    # 静态列（只在增删箱子时变化）与位置列
+    STATIC_COLUMNS = ("ids", "sequence", "length", "width", "weight", "height")
+    POSITION_COLUMNS = ("x", "y", "rotated")
+
+    INITIAL_CAPACITY = 64
+
+    def __init__(self, boxes: Iterable[Box] = ()):
+        self._rows: Dict[Box, int] = {}
+        self._allocate(self.INITIAL_CAPACITY)
+        self.count = 0
+        self._next_sequence = 0
+        for box in boxes:
+            self.append(box)
+
+    def _allocate(self, capacity: int) -> None:
+        self.ids = np.empty(capacity, dtype=object)
+        self.sequence = np.zeros(capacity, dtype=np.int64)
+        self.length = np.zeros(capacity)
+        self.width = np.zeros(capacity)
+        self.weight = np.zeros(capacity)
+        self.height = np.full(capacity, np.nan)  # 未知高度为NaN
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.rotated = np.zeros(capacity, dtype=bool)
+        self._boxes: List[Optional[Box]] = [None] * capacity
+        # 列组是否正被快照共享
+        self._static_shared = False
+        self._position_shared = False
+
+    def _grow(self) -> None:
+        count = self.count
+        old_columns = self._columns()
+        old_boxes = self._boxes
+        self._allocate(len(old_boxes) * 2)
+        for new, old in zip(self._columns(), old_columns):
+            new[:count] = old[:count]
+        self._boxes[:count] = old_boxes[:count]
+
+    def _columns(self) -> Tuple[np.ndarray, ...]:
+        return tuple(getattr(self, name) for name in self.STATIC_COLUMNS + self.POSITION_COLUMNS)
+
+    def _own_static(self) -> None:
+        """写入静态列之前：若正被快照共享则先复制"""
+        if self._static_shared:
+            for name in self.STATIC_COLUMNS:
+                setattr(self, name, getattr(self, name).copy())
+            self._static_shared = False
+
+    def _own_positions(self) -> None:
+        """写入位置列之前：若正被快照共享则先复制"""
+        if self._position_shared:
+            for name in self.POSITION_COLUMNS:
+                setattr(self, name, getattr(self, name).copy())
+            self._position_shared = False
+
+    def freeze(self) -> Dict[str, np.ndarray]:
+        """当前所有列的只读视图（长度为箱子数），与本数组共享内存直到下一次写入"""
+        columns = {}
+        for name in self.STATIC_COLUMNS + self.POSITION_COLUMNS:
+            view = getattr(self, name)[:self.count]
+            view.flags.writeable = False
+            columns[name] = view
+        self._static_shared = True
+        self._position_shared = True
+        return columns
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, box) -> bool:
+        return box in self._rows
+
+    def row_of(self, box: Box) -> Optional[int]:
+        """箱子所在行号，不在数组中返回None"""
+        return self._rows.get(box)
+
+    def box_at(self, row: int) -> Box:
+        """行号对应的箱子"""
+        return self._boxes[row]
+
+    @property
+    def boxes(self) -> List[Box]:
+        """按行顺序的箱子列表"""
+        return self._boxes[:self.count]
+
+    def append(self, box: Box) -> int:
+        """追加箱子，已存在时更新该行；返回行号"""
+        row = self._rows.get(box)
+        if row is not None:
+            self.update(box)
+            return row
+        if self.count == len(self._boxes):
+            self._grow()
+        self._own_static()
+        row = self.count
+        self.count += 1
+        self._rows[box] = row
+        self._boxes[row] = box
+        self.ids[row] = box.id
+        self.sequence[row] = self._next_sequence
+        self._next_sequence += 1
+        self.length[row] = box.length
+        self.width[row] = box.width
+        self.weight[row] = box.weight
+        self.height[row] = box.height if box.height is not None else np.nan
+        self._write(row, box)
+        return row
+
+    def update(self, box: Box) -> None:
+        """箱子位置或旋转状态变化后同步该行"""
+        row = self._rows.get(box)
+        if row is not None:
+            self._write(row, box)
+
+    def _write(self, row: int, box: Box) -> None:
+        self._own_positions()
+        self.x[row] = box.x
+        self.y[row] = box.y
+        self.rotated[row] = box.rotated
+
+    def remove(self, box: Box) -> bool:
+        """移除箱子：最后一行移到空位"""
+        row = self._rows.pop(box, None)
+        if row is None:
+            return False
+        last = self.count - 1
+        self._own_static()
+        self._own_positions()
+        if row != last:
+            moved = self._boxes[last]
+            for column in self._columns():
+                column[row] = column[last]
+            self._boxes[row] = moved
+            self._rows[moved] = row
+        self._boxes[last] = None
+        self.ids[last] = None
+        self.count = last
+        return True
+
+    def clear(self) -> None:
+        """清空"""
+        self._rows.clear()
+        self._allocate(self.INITIAL_CAPACITY)
+        self.count = 0
+        self._next_sequence = 0
+
+    def sync(self, boxes: Iterable[Box]) -> None:
+        """按给定箱子重建全部行"""
+        self.clear()
+        for box in boxes:
+            self.append(box)
+
+    # ---- 向量化视图与运算 ----
+
+    def actual_length(self) -> np.ndarray:
+        """实际长度（考虑旋转）"""
+        n = self.count
+        return np.where(self.rotated[:n], self.width[:n], self.length[:n])
+
+    def actual_width(self) -> np.ndarray:
+        """实际宽度（考虑旋转）"""
+        n = self.count
+        return np.where(self.rotated[:n], self.length[:n], self.width[:n])
+
+    def bounds(self) -> np.ndarray:
+        """所有箱子的边界，形状 (n, 4)，每行 (x1, y1, x2, y2)"""
+        n = self.count
+        x, y = self.x[:n], self.y[:n]
+        return np.column_stack((x, y, x + self.actual_length(), y + self.actual_width()))
+
+    def centers(self) -> Tuple[np.ndarray, np.ndarray]:
+        """所有箱子的质心 (X数组, Y数组)"""
+        n = self.count
+        return self.x[:n] + self.actual_length() / 2, self.y[:n] + self.actual_width() / 2
+
+    def total_area(self) -> float:
+        """箱子总面积"""
+        n = self.count
+        return float(np.dot(self.length[:n], self.width[:n]))
+
+    def total_weight(self) -> float:
+        """箱子总重量"""
+        return float(self.weight[:self.count].sum())
+
+    def weight_balance(self, length: float, width: float) -> Dict[str, float]:
+        """按集装箱尺寸计算各区域重量、扭矩和重心（与完整计算的分区规则一致）"""
+        center_x, center_y = self.centers()
+        return region_balance(self.weight[:self.count], center_x, center_y, length, width)
+
+    def out_of_bounds(self, length: float, width: float, tolerance: float = 0.0) -> np.ndarray:
+        """超出集装箱边界的行掩码"""
+        bounds = self.bounds()
+        return ((bounds[:, 0] < -tolerance) | (bounds[:, 1] < -tolerance) |
+                (bounds[:, 2] > length + tolerance) | (bounds[:, 3] > width + tolerance))
+
+    def intersecting(self, rect: Tuple[float, float, float, float],
+                     exclude: Optional[Box] = None) -> np.ndarray:
+        """与矩形 (x1, y1, x2, y2) 相交（仅接触不算）的行号"""
+        bounds = self.bounds()
+        x1, y1, x2, y2 = rect
+        mask = ~((bounds[:, 2] <= x1) | (bounds[:, 0] >= x2) |
+                 (bounds[:, 3] <= y1) | (bounds[:, 1] >= y2))
+        row = self._rows.get(exclude) if exclude is not None else None
+        if row is not None:
+            mask[row] = False
+        return np.flatnonzero(mask)
+
+    def overlap_matrix(self, tolerance: float = 0.0) -> np.ndarray:
+        """两两重叠矩阵 (n, n)，重叠深度需超过tolerance；对角线为False
+
+        内存为O(n²)，上万个箱子时请改用分块或排序扫描。
+        """
+        bounds = self.bounds()
+        x1, y1, x2, y2 = bounds[:, 0], bounds[:, 1], bounds[:, 2], bounds[:, 3]
+        overlap_x = np.minimum(x2[:, None], x2[None, :]) - np.maximum(x1[:, None], x1[None, :])
+        overlap_y = np.minimum(y2[:, None], y2[None, :]) - np.maximum(y1[:, None], y1[None, :])
+        matrix = (overlap_x > tolerance) & (overlap_y > tolerance)
+        np.fill_diagonal(matrix, False)
+        return matrix
+
+def region_balance(weight: np.ndarray, center_x: np.ndarray, center_y: np.ndarray,
+                   length: float, width: float) -> Dict[str, float]:
+    """由重量和质心数组计算各区域重量、扭矩和重心
+
+    分区规则与 Container 的完整计算一致：质心 X < 中心为前方，Y < 中心为右侧。
+    """
+    center_x_line = length / 2
+    center_y_line = width / 2
+
+    front = center_x < center_x_line
+    right = center_y < center_y_line
+    fr_torque = weight * np.abs(center_x - center_x_line)
+    lr_torque = weight * np.abs(center_y - center_y_line)
+
+    total_weight = float(weight.sum())
+    if total_weight > 0:
+        gravity_x = float(np.dot(weight, center_x)) / total_weight
+        gravity_y = float(np.dot(weight, center_y)) / total_weight
+    else:
+        gravity_x, gravity_y = center_x_line, center_y_line
+
+    return {
+        'left_weight': float(weight[~right].sum()),
+        'right_weight': float(weight[right].sum()),
+        'front_weight': float(weight[front].sum()),
+        'rear_weight': float(weight[~front].sum()),
+        'left_torque': float(lr_torque[~right].sum()),
+        'right_torque': float(lr_torque[right].sum()),
+        'front_torque': float(fr_torque[front].sum()),
+        'rear_torque': float(fr_torque[~front].sum()),
+        'center_x': gravity_x,
+        'center_y': gravity_y,
+    }
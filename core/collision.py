@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from .box import Box
+
+# 重叠判定容差 (mm)：两个箱子在X、Y方向都嵌入超过该值才算重叠
+OVERLAP_TOLERANCE = 1.0
+
+# 箱子数量超过该值时改用NumPy向量化扫描
+NUMPY_THRESHOLD = 256
+
+def boxes_overlap(box1: Box, box2: Box, tolerance: float = OVERLAP_TOLERANCE) -> bool:
+    """检查两个箱子是否重叠（带容差）"""
+    x1, y1, x2, y2 = box1.get_bounds()
+    ox1, oy1, ox2, oy2 = box2.get_bounds()
+    return (x2 > ox1 + tolerance and ox2 > x1 + tolerance and
+            y2 > oy1 + tolerance and oy2 > y1 + tolerance)
+
+def is_out_of_bounds(box: Box, length: float, width: float) -> bool:
+    """检查箱子是否超出集装箱边界"""
+    return (box.x < 0 or box.y < 0 or
+            box.x + box.actual_length > length or
+            box.y + box.actual_width > width)
+
+def find_out_of_bounds(boxes: Sequence[Box], length: float, width: float) -> List[Box]:
+    """查找所有超出集装箱边界的箱子"""
+    return [box for box in boxes if is_out_of_bounds(box, length, width)]
+
+def find_overlapping_index_pairs(bounds: Sequence[Tuple[float, float, float, float]],
+                                 tolerance: float = OVERLAP_TOLERANCE) -> List[Tuple[int, int]]:
+    """排序扫描查找所有重叠的矩形对
+
+    按左边界排序后沿X方向扫描，只保留右边界仍可能与当前矩形重叠的活动集合，
+    再对活动集合做Y区间检查。复杂度 O(n log n + k)（k为X方向相交的对数）。
+
+    Returns:
+        List[Tuple[int, int]]: 下标对 (i, j)，i < j，按 (i, j) 排序
+    """
+    order = sorted(range(len(bounds)), key=lambda index: bounds[index][0])
+    active: List[int] = []
+    pairs = []
+
+    for index in order:
+        x1, y1, x2, y2 = bounds[index]
+        # 右边界不超过当前左边界+容差的矩形与之后的所有矩形都不会重叠
+        active = [other for other in active if bounds[other][2] > x1 + tolerance]
+        for other in active:
+            ox1, oy1, ox2, oy2 = bounds[other]
+            if x2 > ox1 + tolerance and y2 > oy1 + tolerance and oy2 > y1 + tolerance:
+                pairs.append((other, index) if other < index else (index, other))
+        active.append(index)
+
+    pairs.sort()
+    return pairs
+
+def find_overlapping_index_pairs_numpy(bounds: np.ndarray,
+                                       tolerance: float = OVERLAP_TOLERANCE) -> np.ndarray:
+    """排序扫描的NumPy向量化版本
+
+    按左边界排序后用二分查找得到每个矩形在X方向的候选区间，
+    一次性展开所有候选对并用数组表达式完成X、Y检查。
+
+    Returns:
+        np.ndarray: 形状 (k, 2) 的下标对，每行 i < j，按 (i, j) 排序
+    """
+    bounds = np.asarray(bounds, dtype=float).reshape(-1, 4)
+    n = len(bounds)
+    if n < 2:
+        return np.empty((0, 2), dtype=np.intp)
+
+    order = np.argsort(bounds[:, 0], kind="stable")
+    x1, y1, x2, y2 = (bounds[order, column] for column in range(4))
+
+    # 左边界小于 x2 - 容差 的后续矩形才可能在X方向重叠
+    ends = np.searchsorted(x1, x2 - tolerance, side="left")
+    starts = np.arange(1, n + 1)
+    counts = np.maximum(ends - starts, 0)
+    total = int(counts.sum())
+    if total == 0:
+        return np.empty((0, 2), dtype=np.intp)
+
+    first = np.repeat(np.arange(n), counts)
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    second = starts[first] + offsets
+
+    mask = ((x2[second] > x1[first] + tolerance) &
+            (y2[first] > y1[second] + tolerance) & (y2[second] > y1[first] + tolerance))
+    pairs = np.column_stack((order[first[mask]], order[second[mask]]))
+    pairs.sort(axis=1)
+    return pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+
+def find_overlapping_pairs(boxes: Sequence[Box], tolerance: float = OVERLAP_TOLERANCE) -> List[Tuple[Box, Box]]:
+    """查找所有重叠的箱子对，顺序与两两比较的结果一致"""
+    bounds = [box.get_bounds() for box in boxes]
+    if len(bounds) > NUMPY_THRESHOLD:
+        index_pairs = find_overlapping_index_pairs_numpy(np.array(bounds), tolerance).tolist()
+    else:
+        index_pairs = find_overlapping_index_pairs(bounds, tolerance)
+    return [(boxes[i], boxes[j]) for i, j in index_pairs]
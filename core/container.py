@@ -1,9 +1,18 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from typing import List, Tuple, Optional
+import os
+from typing import Callable, Dict, Iterable, List, Tuple, Optional
 import numpy as np
 from .box import Box
+from .box_array import BoxArray
+from .collision import find_overlapping_index_pairs
+from .balance import BalanceAccumulator, balance_report
+from .free_space import FreeSpaceMap, Rect
+from .occupancy import OccupancyGrid
+from .snapshot import LayoutSnapshot
+from .spatial_index import BoundingBox, SpatialIndex, choose_spatial_index, create_spatial_index
+from .placement import PlacementEngine, create_placement_engine
 
 class Container:
     """集装箱类"""
@@ -12,12 +21,65 @@ class Container:
     DEFAULT_LENGTH = 12000
     DEFAULT_WIDTH = 2300
     
-    def __init__(self, name: str = "Container", length: float = None, width: float = None):
+    # 扭矩限制 (kg·mm)：左右方向更严格，前后方向更宽松
+    LR_TORQUE_LIMIT = 500000  # 500kg·m = 500000kg·mm（左右方向）
+    FR_TORQUE_LIMIT = 2000000  # 2000kg·m = 2000000kg·mm（前后方向）
+    
+    # 默认放置策略
+    DEFAULT_PLACEMENT_STRATEGY = "maxrects"
+    
+    # 默认空间索引后端（grid / rtree / quadtree）
+    DEFAULT_SPATIAL_INDEX = "grid"
+    
+    # 调试模式：每次计算重量平衡时用完整重算校验累加缓存
+    # 可通过环境变量 CONTAINER_DEBUG_BALANCE=1 开启
+    DEBUG_BALANCE = os.environ.get("CONTAINER_DEBUG_BALANCE", "") not in ("", "0")
+    
+    def __init__(self, name: str = "Container", length: float = None, width: float = None,
+                 placement_strategy: str = None):
         """初始化集装箱"""
         self.length = length or self.DEFAULT_LENGTH
         self.width = width or self.DEFAULT_WIDTH
         self.name = name
         self.boxes: List[Box] = []
+        # 重量平衡累加器及每个箱子已记录的 (重量, 质心X, 质心Y, 面积)
+        self._balance = BalanceAccumulator(self.length, self.width)
+        self._box_records: Dict[Box, Tuple[float, float, float, float]] = {}
+        self._used_area = 0.0
+        # 布局版本号：箱子增删、移动、旋转时单调递增，供查询结果缓存判断是否失效
+        self.layout_version = 0
+        self._snapshot: Optional[LayoutSnapshot] = None
+        # 布局变化监听器 listener(container, changes)，见 add_listener
+        self._listeners: List[Callable] = []
+        # 箱子的列式数组存储，用于集装箱范围的向量化运算
+        self.box_array = BoxArray()
+        # 空间索引，所有碰撞查询先用它筛选候选箱子
+        self.spatial_index: SpatialIndex = create_spatial_index(
+            self.DEFAULT_SPATIAL_INDEX, self.length, self.width)
+        # 极大空闲矩形分解，随箱子增删移动增量更新
+        self._free_space = FreeSpaceMap(self.length, self.width)
+        # 占用栅格（可选），由 enable_occupancy 或 raster 放置策略启用
+        self._occupancy: Optional[OccupancyGrid] = None
+        self.placement_engine: PlacementEngine = create_placement_engine(
+            placement_strategy or self.DEFAULT_PLACEMENT_STRATEGY, self)
+    
+    def set_placement_strategy(self, strategy: str, **kwargs) -> None:
+        """切换放置策略（maxrects / grid / raster / extreme_point）"""
+        self.placement_engine = create_placement_engine(strategy, self, **kwargs)
+    
+    def set_spatial_index(self, backend: str, **kwargs) -> None:
+        """切换空间索引后端并批量加载当前箱子（grid未指定cell_size时按箱子尺寸自动确定）"""
+        self.spatial_index = create_spatial_index(backend, self.length, self.width,
+                                                  self._spatial_items(), **kwargs)
+    
+    def tune_spatial_index(self, updates: int = 0) -> str:
+        """对当前箱子做基准测试，换用最快的空间索引后端，返回后端名称"""
+        backend = choose_spatial_index(self.length, self.width, self._spatial_items(), updates=updates)
+        self.set_spatial_index(backend)
+        return backend
+    
+    def _spatial_items(self) -> List[Tuple[Box, BoundingBox]]:
+        return [(box, BoundingBox(*box.get_bounds())) for box in self.boxes]
         
     @property
     def area(self) -> float:
@@ -27,7 +89,7 @@ class Container:
     @property
     def used_area(self) -> float:
         """获取已使用面积"""
-        return sum(box.area for box in self.boxes)
+        return self._used_area
     
     @property
     def area_utilization(self) -> float:
@@ -37,71 +99,322 @@ class Container:
     @property
     def total_weight(self) -> float:
         """获取总重量"""
-        return sum(box.weight for box in self.boxes)
+        return self._balance.total_weight
+    
+    def add_listener(self, listener: Callable) -> None:
+        """注册布局变化监听器
+        
+        每次箱子增删、移动、旋转后调用 listener(container, changes)，changes 为
+        [(箱子, 变化前状态, 变化后状态)]，状态为 (x, y, rotated)，不在集装箱中时为None
+        """
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+    
+    def remove_listener(self, listener: Callable) -> None:
+        """注销布局变化监听器"""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+    
+    def __contains__(self, box: Box) -> bool:
+        """箱子是否在集装箱中（按已记录的箱子查找，O(1)）"""
+        return box in self._box_records
+    
+    def _notify(self, changes: list) -> None:
+        for listener in list(self._listeners):
+            listener(self, changes)
+    
+    def recorded_state(self, box: Box) -> Optional[Tuple[float, float, bool]]:
+        """集装箱最后记录的箱子状态 (x, y, rotated)，不在集装箱中返回None
+        
+        箱子坐标被直接修改但尚未调用 update_box 时，返回的仍是修改前的状态
+        """
+        row = self.box_array.row_of(box)
+        if row is None:
+            return None
+        array = self.box_array
+        return (float(array.x[row]), float(array.y[row]), bool(array.rotated[row]))
+    
+    def _record_box(self, box: Box) -> None:
+        """记录箱子对重量平衡和面积的贡献"""
+        record = (box.weight, box.center_x, box.center_y, box.area)
+        self._box_records[box] = record
+        self._balance.add(record[0], record[1], record[2])
+        self._used_area += record[3]
+        bounds = box.get_bounds()
+        self._free_space.update(box, bounds)
+        if self._occupancy is not None:
+            self._occupancy.update(box, bounds)
+        self.spatial_index.update(box, BoundingBox(*bounds))
+        self.box_array.append(box)
+        self.layout_version += 1
     
-    def add_box(self, box: Box) -> bool:
-        """添加箱子到集装箱"""
-        if self.can_place_box(box):
+    def _forget_box(self, box: Box) -> None:
+        """撤销箱子之前记录的贡献"""
+        record = self._box_records.pop(box, None)
+        if record is not None:
+            self._balance.remove(record[0], record[1], record[2])
+            self._used_area -= record[3]
+            if not self._box_records:
+                self._used_area = 0.0
+    
+    def add_box(self, box: Box, check: bool = True) -> bool:
+        """添加箱子到集装箱（check为False时不做碰撞检查，用于撤销/重做恢复原布局）"""
+        if not check or self.can_place_box(box):
             self.boxes.append(box)
+            self._record_box(box)
+            self.placement_engine.box_added(box)
+            if self._listeners:
+                self._notify([(box, None, (box.x, box.y, box.rotated))])
             return True
         return False
     
     def remove_box(self, box: Box) -> bool:
         """从集装箱移除箱子"""
-        if box in self.boxes:
+        if box in self._box_records:
+            before = self.recorded_state(box)
             self.boxes.remove(box)
+            self._detach_box(box)
+            if self._listeners:
+                self._notify([(box, before, None)])
             return True
         return False
     
+    def _detach_box(self, box: Box) -> None:
+        """撤销箱子在所有缓存中的记录（不修改 self.boxes）"""
+        self._forget_box(box)
+        self._free_space.remove(box)
+        if self._occupancy is not None:
+            self._occupancy.remove(box)
+        self.box_array.remove(box)
+        self.spatial_index.remove(box)
+        self.placement_engine.box_removed(box)
+        self.layout_version += 1
+    
+    def move_box(self, box: Box, x: float, y: float) -> None:
+        """移动集装箱中的箱子（不做碰撞检查），同步更新重量平衡"""
+        box.move_to(x, y)
+        self.update_box(box)
+    
+    def rotate_box(self, box: Box) -> None:
+        """旋转集装箱中的箱子（不做碰撞检查），同步更新重量平衡"""
+        box.rotate()
+        self.update_box(box)
+    
+    def update_box(self, box: Box) -> None:
+        """箱子的位置或旋转状态被直接修改后，通知集装箱重新记录"""
+        change = self._rerecord_box(box)
+        if change and self._listeners:
+            self._notify([change])
+    
+    def _rerecord_box(self, box: Box) -> Optional[tuple]:
+        """按箱子当前状态重新记录，返回 (箱子, 变化前, 变化后)；无变化或不在集装箱中返回None"""
+        if box not in self._box_records:
+            return None
+        before = self.recorded_state(box)
+        after = (box.x, box.y, box.rotated)
+        if before == after:
+            # 状态未变化时不触碰任何缓存，也不递增 layout_version
+            return None
+        self._forget_box(box)
+        self._record_box(box)
+        self.placement_engine.box_updated(box)
+        return (box, before, after)
+    
+    # ---- 批量操作：整批校验一次，全部生效或全部不生效，只发出一次变化通知 ----
+    
+    def move_many(self, moves: Iterable[Tuple[Box, float, float]], check: bool = True) -> bool:
+        """批量移动箱子
+        
+        Args:
+            moves: (箱子, 新x, 新y)，不在集装箱中的箱子被忽略
+            check: 是否校验新位置（在集装箱内、不与批次外的箱子重叠、批次内互不重叠）
+        
+        Returns:
+            bool: 校验不通过时不做任何修改并返回False
+        """
+        moves = [(box, x, y) for box, x, y in moves if box in self._box_records]
+        if check:
+            placements = {box: (x, y, x + box.actual_length, y + box.actual_width)
+                          for box, x, y in moves}
+            if not self._validate_batch(placements):
+                return False
+        
+        changes = []
+        for box, x, y in moves:
+            box.move_to(x, y)
+            change = self._rerecord_box(box)
+            if change:
+                changes.append(change)
+        if changes and self._listeners:
+            self._notify(changes)
+        return True
+    
+    def rotate_many(self, boxes: Iterable[Box], check: bool = True) -> bool:
+        """批量原地旋转箱子（不可旋转或不在集装箱中的箱子被忽略），校验规则同 move_many"""
+        boxes = [box for box in dict.fromkeys(boxes) if box in self._box_records and box.can_rotate()]
+        if check:
+            placements = {box: (box.x, box.y, box.x + box.actual_width, box.y + box.actual_length)
+                          for box in boxes}
+            if not self._validate_batch(placements):
+                return False
+        
+        changes = []
+        for box in boxes:
+            box.rotate()
+            change = self._rerecord_box(box)
+            if change:
+                changes.append(change)
+        if changes and self._listeners:
+            self._notify(changes)
+        return True
+    
+    def remove_many(self, boxes: Iterable[Box]) -> List[Box]:
+        """批量移除箱子，一次重建箱子列表（O(n)），返回实际移除的箱子"""
+        removing = {box for box in boxes if box in self._box_records}
+        if not removing:
+            return []
+        removed = [box for box in self.boxes if box in removing]
+        changes = [(box, self.recorded_state(box), None) for box in removed]
+        self.boxes[:] = [box for box in self.boxes if box not in removing]
+        for box in removed:
+            self._detach_box(box)
+        if self._listeners:
+            self._notify(changes)
+        return removed
+    
+    def _validate_batch(self, placements: Dict[Box, Rect]) -> bool:
+        """批次内每个新位置都在集装箱内、不与批次外的箱子重叠，且批次内互不重叠（仅接触不算）"""
+        for rect in placements.values():
+            x1, y1, x2, y2 = rect
+            if x1 < 0 or y1 < 0 or x2 > self.length or y2 > self.width:
+                return False
+            # 批次内的箱子按新位置另行检查
+            if self._colliding_boxes(rect, placements, first_only=True):
+                return False
+        return not find_overlapping_index_pairs(list(placements.values()), tolerance=0.0)
+    
     def can_place_box(self, box: Box, exclude_self: bool = True) -> bool:
         """检查箱子是否可以放置在指定位置"""
+        exclude = (box,) if exclude_self else ()
+        return self.is_region_free(box.x, box.y, box.actual_length, box.actual_width, exclude)
+    
+    def is_region_free(self, x: float, y: float, length: float, width: float,
+                       exclude=()) -> bool:
+        """检查矩形区域是否在集装箱内且不与任何箱子重叠（仅接触不算重叠）
+        
+        Args:
+            x, y: 区域左下角
+            length, width: 区域尺寸（X方向、Y方向）
+            exclude: 不参与检查的箱子
+        """
         # 检查是否超出边界
-        if (box.x < 0 or box.y < 0 or 
-            box.x + box.actual_length > self.length or 
-            box.y + box.actual_width > self.width):
+        if x < 0 or y < 0 or x + length > self.length or y + width > self.width:
             return False
-        
-        # 检查是否与其他箱子重叠
-        for existing_box in self.boxes:
-            # 如果exclude_self为True且是同一个箱子，跳过检查
-            if exclude_self and existing_box is box:
+        # 占用栅格判定为空时一定不重叠，否则由空间索引精确检查
+        if self._occupancy is not None and self._occupancy.is_free(x, y, length, width, exclude):
+            return True
+        return not self._colliding_boxes((x, y, x + length, y + width), exclude, first_only=True)
+    
+    def find_collisions(self, box: Box) -> List[Box]:
+        """查找与箱子当前位置重叠的其他箱子"""
+        return self._colliding_boxes(box.get_bounds(), (box,))
+    
+    def _colliding_boxes(self, rect: Rect, exclude=(), first_only: bool = False) -> List[Box]:
+        """用空间索引筛选候选箱子，再按箱子当前边界精确检查"""
+        x1, y1, x2, y2 = rect
+        collisions = []
+        for other in self.spatial_index.query(BoundingBox(x1, y1, x2, y2)):
+            if other in exclude:
                 continue
-            if box.overlaps_with(existing_box):
-                return False
+            ox1, oy1, ox2, oy2 = other.get_bounds()
+            if not (x2 <= ox1 or x1 >= ox2 or y2 <= oy1 or y1 >= oy2):
+                collisions.append(other)
+                if first_only:
+                    break
+        return collisions
+    
+    def find_placement_position(self, box: Box, rotated: Optional[bool] = None) -> Optional[Tuple[float, float]]:
+        """为箱子寻找合适的放置位置（rotated为None时按箱子当前旋转状态）
         
-        return True
+        由放置引擎回答，不修改箱子坐标和旋转状态；找不到位置返回None
+        """
+        return self.placement_engine.find_position(box, rotated)
     
-    def find_placement_position(self, box: Box) -> Optional[Tuple[float, float]]:
-        """为箱子寻找合适的放置位置"""
-        # 保存原始位置
-        original_x, original_y = box.x, box.y
+    def calculate_weight_balance(self) -> dict:
+        """计算重量平衡 - 由累加缓存以O(1)得出，字段与完整计算相同
+        
+        调试模式下会与完整重算结果比对，不一致时打印差异并以重算结果重建缓存
+        """
+        if not self.boxes:
+            return self._calculate_weight_balance_full()
         
-        # 简单的左下角优先策略
-        step = 50  # 搜索步长 (mm)
+        balance = self._balance
+        total_weight = balance.total_weight
+        if total_weight > 0:
+            center_x = balance.weighted_x / total_weight
+            center_y = balance.weighted_y / total_weight
+        else:
+            center_x = self.length / 2
+            center_y = self.width / 2
         
-        max_y = max(0, int(self.width - box.actual_width))
-        max_x = max(0, int(self.length - box.actual_length))
+        result = balance_report({
+            'left_weight': balance.left_weight,
+            'right_weight': balance.right_weight,
+            'front_weight': balance.front_weight,
+            'rear_weight': balance.rear_weight,
+            'left_torque': balance.left_torque,
+            'right_torque': balance.right_torque,
+            'front_torque': balance.front_torque,
+            'rear_torque': balance.rear_torque,
+            'center_x': center_x,
+            'center_y': center_y,
+        }, self.length, self.width, self.LR_TORQUE_LIMIT, self.FR_TORQUE_LIMIT)
         
-        for y in range(0, max_y + step, step):
-            for x in range(0, max_x + step, step):
-                box.move_to(float(x), float(y))
-                if self.can_place_box(box):
-                    # 恢复原始位置后返回找到的位置
-                    box.move_to(original_x, original_y)
-                    return (float(x), float(y))
+        if self.DEBUG_BALANCE:
+            result = self._verify_balance_cache(result)
         
-        # 没找到位置，恢复原始位置
-        box.move_to(original_x, original_y)
-        return None
+        return result
     
-    def calculate_weight_balance(self) -> dict:
-        """计算重量平衡 - 基于箱子质心位置计算扭矩
+    def _verify_balance_cache(self, cached: dict) -> dict:
+        """用完整重算校验累加缓存"""
+        full = self._calculate_weight_balance_full()
+        mismatched = []
+        for key, expected in full.items():
+            actual = cached[key]
+            if isinstance(expected, bool):
+                if actual != expected:
+                    mismatched.append(key)
+            elif abs(actual - expected) > 1e-6 * max(1.0, abs(expected)):
+                mismatched.append(key)
+        
+        if mismatched:
+            print(f"重量平衡缓存与重算不一致 ({self.name}): " +
+                  ", ".join(f"{key}: {cached[key]} != {full[key]}" for key in mismatched))
+            self._rebuild_records()
+            return full
+        return cached
+    
+    def _rebuild_records(self) -> None:
+        """按当前箱子状态重建所有累加缓存"""
+        self._balance.reset()
+        self._box_records.clear()
+        self._used_area = 0.0
+        self._free_space.clear()
+        if self._occupancy is not None:
+            self._occupancy.clear()
+        self.box_array.clear()
+        self.spatial_index.clear()
+        for box in self.boxes:
+            self._record_box(box)
+    
+    def _calculate_weight_balance_full(self) -> dict:
+        """完整计算重量平衡 - 基于箱子质心位置计算扭矩（遍历所有箱子）
         坐标系：X轴（length方向）= 前后方向，Y轴（width方向）= 左右方向
         扭矩 = 重量 × 距离（到中心线的距离）
         """
         if not self.boxes:
-            lr_torque_limit = 500000  # 500kg·m = 500000kg·mm（左右方向）
-            fr_torque_limit = 2000000  # 2000kg·m = 2000000kg·mm（前后方向）
+            lr_torque_limit = self.LR_TORQUE_LIMIT
+            fr_torque_limit = self.FR_TORQUE_LIMIT
             return {
                 'left_weight': 0,
                 'right_weight': 0,
@@ -186,7 +499,7 @@ class Container:
         fr_equivalent_diff = abs(front_equivalent - rear_equivalent)  # 前后等效重量差
         
         # 计算整体重心（用于显示）
-        total_weight = self.total_weight
+        total_weight = sum(box.weight for box in self.boxes)
         if total_weight > 0:
             center_x = sum(box.center_x * box.weight for box in self.boxes) / total_weight
             center_y = sum(box.center_y * box.weight for box in self.boxes) / total_weight
@@ -197,8 +510,8 @@ class Container:
         # 检查是否平衡（根据扭矩限制）
         # 扭矩限制：左右方向更严格，前后方向更宽松
         # 单位：kg·mm (重量kg × 距离mm)
-        lr_torque_limit = 500000  # 500kg·m = 500000kg·mm（左右方向）
-        fr_torque_limit = 2000000  # 2000kg·m = 2000000kg·mm（前后方向）
+        lr_torque_limit = self.LR_TORQUE_LIMIT
+        fr_torque_limit = self.FR_TORQUE_LIMIT
         
         is_balanced = lr_torque <= lr_torque_limit and fr_torque <= fr_torque_limit
         
@@ -226,21 +539,91 @@ class Container:
             'is_balanced': is_balanced
         }
     
+    @property
+    def free_space(self) -> FreeSpaceMap:
+        """极大空闲矩形分解
+        
+        界面拖动会直接修改箱子坐标，因此返回前比较一次记录的边界，
+        只对变化的箱子做增量更新
+        """
+        self._free_space.sync((box, box.get_bounds()) for box in self.boxes)
+        return self._free_space
+    
+    def enable_occupancy(self, resolution: float = None) -> OccupancyGrid:
+        """启用占用栅格（分辨率不同时按新分辨率重建），之后随箱子变化增量更新"""
+        resolution = resolution or OccupancyGrid.DEFAULT_RESOLUTION
+        if self._occupancy is None or self._occupancy.resolution != resolution:
+            self._occupancy = OccupancyGrid(self.length, self.width, resolution)
+            for box in self.boxes:
+                self._occupancy.insert(box, box.get_bounds())
+        return self._occupancy
+    
+    @property
+    def occupancy(self) -> OccupancyGrid:
+        """占用栅格（未启用时按默认分辨率启用），返回前与箱子当前边界同步"""
+        occupancy = self.enable_occupancy(self._occupancy.resolution if self._occupancy else None)
+        occupancy.sync((box, box.get_bounds()) for box in self.boxes)
+        return occupancy
+    
     def get_available_space(self) -> List[Tuple[float, float, float, float]]:
-        """获取可用空间区域列表 (x, y, width, height)"""
-        # 简化实现：返回整个容器减去已占用区域
-        available_spaces = []
+        """获取可用空间区域列表 (x, y, width, height)
         
-        if not self.boxes:
-            return [(0, 0, self.length, self.width)]
+        返回所有极大空闲矩形，按左下角优先排序；矩形之间可以互相重叠
+        """
+        return [(x1, y1, x2 - x1, y2 - y1) for x1, y1, x2, y2 in self.free_space.rects]
+    
+    def largest_free_rect(self) -> Optional[Rect]:
+        """面积最大的空闲矩形 (x1, y1, x2, y2)"""
+        return self.free_space.largest_free_rect()
+    
+    def free_rects_fitting(self, length: float, width: float,
+                           allow_rotation: bool = False) -> List[Rect]:
+        """能容纳 length×width 箱子的空闲矩形 (x1, y1, x2, y2)"""
+        return self.free_space.rects_fitting(length, width, allow_rotation)
+    
+    def free_area(self, region: Optional[Rect] = None) -> float:
+        """区域 (x1, y1, x2, y2) 内的空闲面积，默认整个集装箱"""
+        return self.free_space.free_area(region)
+    
+    def overlap_matrix(self, tolerance: float = 0.0) -> np.ndarray:
+        """所有箱子两两重叠矩阵，行列顺序为 box_array 的行顺序"""
+        return self.box_array.overlap_matrix(tolerance)
+    
+    def out_of_bounds_boxes(self, tolerance: float = 0.0) -> List[Box]:
+        """超出集装箱边界的箱子"""
+        rows = np.flatnonzero(self.box_array.out_of_bounds(self.length, self.width, tolerance))
+        return [self.box_array.box_at(row) for row in rows]
+    
+    def snapshot(self) -> LayoutSnapshot:
+        """当前布局的不可变快照
         
-        # 这里可以实现更复杂的空间分割算法
-        # 现在返回一个简化的结果
-        return available_spaces
+        列数据与 box_array 写时复制共享；布局版本未变化时返回同一个快照，
+        只移动或旋转箱子时新快照继续共享尺寸、重量等静态列
+        """
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.version != self.layout_version or snapshot.name != self.name:
+            snapshot = LayoutSnapshot.from_columns(
+                self.name, self.length, self.width, self.layout_version, self.box_array.freeze(),
+                self.LR_TORQUE_LIMIT, self.FR_TORQUE_LIMIT)
+            self._snapshot = snapshot
+        return snapshot
     
     def clear(self) -> None:
         """清空所有箱子"""
+        removed = [(box, self.recorded_state(box), None) for box in self.boxes] if self._listeners else []
         self.boxes.clear()
+        self._balance.reset()
+        self._box_records.clear()
+        self._used_area = 0.0
+        self._free_space.clear()
+        if self._occupancy is not None:
+            self._occupancy.clear()
+        self.box_array.clear()
+        self.spatial_index.clear()
+        self.placement_engine.reset()
+        self.layout_version += 1
+        if removed:
+            self._notify(removed)
     
     def __str__(self) -> str:
         return f"Container({self.name}, {len(self.boxes)} boxes, {self.area_utilization:.1%} utilized)"
\ No newline at end of file
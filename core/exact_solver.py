@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import bisect
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .box import Box
+from .container import Container
+from .extreme_points import ExtremePointSet
+from .free_space import EPSILON
+
+# 一种尺寸的摆法：(X方向尺寸, Y方向尺寸, 是否旋转)
+Orientation = Tuple[float, float, bool]
+# 搜索中的一次放置：(尺寸类型序号, x, y, 摆法)
+Placement = Tuple[int, float, float, Orientation]
+
+@dataclass
+class ExactSolveResult:
+    """精确求解结果"""
+    layout: List[Tuple[Box, float, float, bool]] = field(default_factory=list)  # (箱子, x, y, 是否旋转)
+    unplaced: List[Box] = field(default_factory=list)  # 宽度方向放不下、无法装入的箱子
+    length: float = 0.0  # 找到的最佳布局占用的长度 (mm)
+    lower_bound: float = 0.0  # 已证明的占用长度下界 (mm)
+    container_length: float = 0.0
+    optimal: bool = False  # 是否已证明最优
+    nodes: int = 0  # 搜索的节点数
+    elapsed: float = 0.0  # 耗时 (秒)
+    stopped: bool = False  # 是否因时间限制或stop()提前停止
+
+    @property
+    def gap(self) -> float:
+        """剩余最优性差距 (长度-下界)/长度，已证明最优时为0，尚未找到可行布局时为1"""
+        if self.optimal:
+            return 0.0
+        if not self.layout:
+            return 1.0
+        return max(0.0, (self.length - self.lower_bound) / self.length)
+
+    @property
+    def fits(self) -> bool:
+        """最佳布局是否能放进集装箱长度"""
+        return bool(self.layout) and self.length <= self.container_length + EPSILON
+
+    def summary(self) -> str:
+        """生成结果摘要文本"""
+        if self.optimal or self.layout:
+            status = "已证明最优" if self.optimal else f"未证明最优, 差距 {self.gap * 100:.1f}%"
+            lines = [
+                f"占用长度: {self.length:.0f}mm (下界 {self.lower_bound:.0f}mm, {status})",
+                f"集装箱长度: {self.container_length:.0f}mm, {'可以装下' if self.fits else '装不下'}",
+            ]
+        else:
+            lines = [f"未找到可行布局 (下界 {self.lower_bound:.0f}mm)"]
+        lines.append(f"搜索节点: {self.nodes} 个, 耗时: {self.elapsed:.1f}s{' (提前停止)' if self.stopped else ''}")
+        if self.unplaced:
+            lines.append(f"宽度方向放不下的箱子: {len(self.unplaced)} 个")
+        return "\n".join(lines)
+
+def strip_lower_bound(orientations: Sequence[Sequence[Orientation]], width: float) -> float:
+    """把箱子全部装入宽度为width的区域所需长度的下界
+
+    取以下各项的最大值：
+    - 单个箱子：每个箱子至少占用其较短可行摆法的X尺寸
+    - 面积下界：总面积 / 宽度
+    - L2下界（Martello-Monaci-Vigo）：以对偶可行函数形式计算，对每个
+      α∈(0, 宽度/2]，Y尺寸大于 宽度-α 的箱子计为整个宽度、小于α的计为0、
+      其余按原尺寸，Σ X尺寸×f(Y尺寸) / 宽度 仍是长度下界。允许旋转时每个
+      箱子取贡献较小的摆法，因此对任何摆法都成立。
+    """
+    if not orientations:
+        return 0.0
+    bound = max(min(dx for dx, _, _ in options) for options in orientations)
+    bound = max(bound, sum(options[0][0] * options[0][1] for options in orientations) / width)
+
+    alphas = {dy for options in orientations for _, dy, _ in options if dy <= width / 2 + EPSILON}
+    for alpha in alphas:
+        def f(dy: float) -> float:
+            if dy > width - alpha + EPSILON:
+                return width
+            return dy if dy >= alpha - EPSILON else 0.0
+        total = sum(min(dx * f(dy) for dx, dy, _ in options) for options in orientations)
+        bound = max(bound, total / width)
+    return bound
+
+def attainable_lengths(orientations: Sequence[Sequence[Orientation]], limit: float,
+                       max_count: int = 50000) -> List[float]:
+    """不超过limit的所有可能占用长度（升序）
+
+    极点上放置的箱子X坐标都是若干其他箱子X尺寸之和，因此占用长度一定是
+    一部分箱子（各取一种摆法）X尺寸之和，下界可以向上取到其中最近的一个。
+    尺寸零散导致组合数超过max_count时返回空列表（不取整）。
+    """
+    sums = {0.0}
+    for options in orientations:
+        sums |= {round(total + dx, 6) for total in sums for dx, _, _ in options
+                 if total + dx <= limit + EPSILON}
+        if len(sums) > max_count:
+            return []
+    return sorted(sums)
+
+def _gap_waste(rects: Sequence[Tuple[float, float, float, float]], length: float, width: float,
+               min_dx: float, min_dy: float) -> float:
+    """已放置箱子之间任何剩余箱子都放不进去的空隙面积（下界用）
+
+    竖向：X∈[0, length) 内每个竖条中，箱子之间（及与两侧壁之间）的Y方向空隙
+    小于剩余箱子的最小Y尺寸时整块浪费；横向：每个横条中，箱子之间（及与
+    前壁之间）的X方向空隙小于最小X尺寸时浪费。两者可能重叠，取较大者。
+    """
+    def waste(edges, across, wall, minimum):
+        total = 0.0
+        for lo, hi in zip(edges, edges[1:]):
+            if hi - lo <= EPSILON:
+                continue
+            # 完整覆盖该条的箱子在另一方向上的区间
+            covering = sorted((a1, a2) for s1, s2, a1, a2 in across if s1 <= lo + EPSILON and s2 >= hi - EPSILON)
+            position = 0.0
+            for a1, a2 in covering:
+                if EPSILON < a1 - position < minimum - EPSILON:
+                    total += (a1 - position) * (hi - lo)
+                position = max(position, a2)
+            if wall is not None and EPSILON < wall - position < minimum - EPSILON:
+                total += (wall - position) * (hi - lo)
+        return total
+
+    x_edges = sorted({0.0, length} | {v for r in rects for v in (r[0], r[2]) if v < length})
+    y_edges = sorted({0.0, width} | {v for r in rects for v in (r[1], r[3])})
+    columns = waste(x_edges, [(r[0], r[2], r[1], r[3]) for r in rects], width, min_dy)
+    rows = waste(y_edges, [(r[1], r[3], r[0], r[2]) for r in rects], None, min_dx)
+    return max(columns, rows)
+
+class ExactSolver:
+    """小批量箱子（不超过 MAX_BOXES 个）的精确分支定界求解
+
+    目标：所有箱子都装入集装箱宽度内，最小化占用的长度（最靠后箱子的末端X）。
+    深度优先搜索每一步选择下一个箱子、摆法和极点位置（ExtremePointSet），
+    只接受末端严格短于当前最佳解的位置，因此第一次下探即得到一个可行解，
+    之后不断收紧。
+
+    - 下界：面积下界与L2下界（strip_lower_bound），最佳解达到下界时立即
+      证明最优并结束
+    - 对称性：尺寸相同的箱子可以互换，分支只在尺寸类型上进行，每种尺寸
+      每层只试一次；不同放置顺序得到的同一组放置只搜索一次
+    - 时间限制：超时或从其他线程调用 stop() 时返回目前的最佳解，并给出
+      与下界之间的剩余差距
+
+    最优性针对极点可达的布局（每个箱子都紧贴其他箱子或集装箱壁）。
+    求解只读取箱子尺寸，不修改箱子和集装箱，可以放在后台线程运行；
+    调用 apply() 才写回集装箱。
+    """
+
+    MAX_BOXES = 30
+
+    def __init__(self, container: Container, extra_boxes: Optional[List[Box]] = None):
+        """
+        初始化求解器
+
+        Args:
+            container: 目标集装箱，其中已有的箱子也参与重新排布
+            extra_boxes: 要一起装入的待装载箱子
+        """
+        self.container = container
+        self._stop_event = threading.Event()
+
+        in_container = set(container.boxes)
+        self.boxes: List[Box] = list(container.boxes) + [
+            box for box in (extra_boxes or []) if box not in in_container
+        ]
+        if len(self.boxes) > self.MAX_BOXES:
+            raise ValueError(f"精确求解最多支持 {self.MAX_BOXES} 个箱子，当前 {len(self.boxes)} 个")
+
+        # 按尺寸归类，宽度方向没有可行摆法的箱子无法装入
+        self._groups: Dict[Tuple[float, float], List[Box]] = {}
+        self._unplaceable: List[Box] = []
+        for box in sorted(self.boxes, key=lambda b: (-b.area, b.id)):
+            if self._box_orientations(box):
+                self._groups.setdefault((box.length, box.width), []).append(box)
+            else:
+                self._unplaceable.append(box)
+        self._kinds = list(self._groups)
+        self._orientations = [self._box_orientations(self._groups[kind][0]) for kind in self._kinds]
+
+    def stop(self) -> None:
+        """请求停止求解（线程安全）"""
+        self._stop_event.set()
+
+    @property
+    def stopped(self) -> bool:
+        """是否已请求停止"""
+        return self._stop_event.is_set()
+
+    def _box_orientations(self, box: Box) -> List[Orientation]:
+        """箱子在集装箱宽度内可行的摆法，X尺寸小的在前"""
+        options = [(box.length, box.width, False)]
+        if box.can_rotate() and box.length != box.width:
+            options.append((box.width, box.length, True))
+        return sorted((o for o in options if o[1] <= self.container.width + EPSILON),
+                      key=lambda o: o[0])
+
+    def run(self, time_limit: float = 10.0,
+            progress_callback: Optional[Callable[[int, float, float, float], None]] = None) -> ExactSolveResult:
+        """
+        运行求解
+
+        Args:
+            time_limit: 时间上限 (秒)，到时必定返回
+            progress_callback: 进度回调 (节点数, 已用时间, 最佳长度, 下界)，约每100ms调用一次
+
+        Returns:
+            ExactSolveResult: 找到的最佳布局（尚未写回集装箱）
+        """
+        self._stop_event.clear()
+        start_time = time.perf_counter()
+        width = self.container.width
+        counts = [len(self._groups[kind]) for kind in self._kinds]
+        areas = [kind[0] * kind[1] for kind in self._kinds]
+        total_area = sum(area * count for area, count in zip(areas, counts))
+        box_orientations = [self._orientations[kind] for kind, count in enumerate(counts) for _ in range(count)]
+
+        # 所有箱子沿X方向排成一排时的长度是占用长度的上限
+        upper_bound = sum(options[0][0] for options in box_orientations)
+        lengths = attainable_lengths(box_orientations, upper_bound)
+        best_length = float('inf')
+        best_layout: Optional[List[Placement]] = None
+
+        def round_up(bound: float) -> float:
+            """下界向上取到最近的可能占用长度"""
+            index = bisect.bisect_left(lengths, bound - EPSILON)
+            return lengths[index] if index < len(lengths) else bound
+
+        lower_bound = round_up(strip_lower_bound(box_orientations, width))
+        points = ExtremePointSet(upper_bound, width)
+        visited = set()
+        placements: List[Placement] = []
+        nodes = 0
+        last_report = start_time
+        timed_out = False
+
+        def search(current_length: float) -> bool:
+            """深度优先搜索，返回True表示应当结束（已证明最优或超时）"""
+            nonlocal best_length, best_layout, nodes, last_report, timed_out
+            nodes += 1
+            # 每个节点都检查时间和停止请求（相对节点内的数组运算开销可以忽略）
+            now = time.perf_counter()
+            if now - start_time >= time_limit or self._stop_event.is_set():
+                timed_out = True
+                return True
+            if progress_callback and now - last_report >= 0.1:
+                last_report = now
+                progress_callback(nodes, now - start_time, best_length, lower_bound)
+
+            if not any(counts):
+                best_length = current_length
+                best_layout = list(placements)
+                return best_length <= lower_bound + EPSILON
+            if max(current_length, lower_bound) >= best_length - EPSILON:
+                return False
+            # 节点下界：全部箱子面积加上已无法利用的空隙，按宽度折算为长度
+            remaining = [self._orientations[kind] for kind, count in enumerate(counts) if count]
+            waste = _gap_waste([(x, y, x + o[0], y + o[1]) for _, x, y, o in placements],
+                               current_length, width,
+                               min(dx for options in remaining for dx, _, _ in options),
+                               min(dy for options in remaining for _, dy, _ in options))
+            if round_up((total_area + waste) / width) >= best_length - EPSILON:
+                return False
+
+            # 所有极点×所有摆法一次向量化检查：在宽度内、末端严格短于最佳解、不与已放置箱子重叠
+            options = [(kind, orientation) for kind, count in enumerate(counts) if count
+                       for orientation in self._orientations[kind]]
+            candidates = points.points()
+            px, py = candidates[:, 0:1], candidates[:, 1:2]
+            dx = np.array([orientation[0] for _, orientation in options])[None, :]
+            dy = np.array([orientation[1] for _, orientation in options])[None, :]
+            feasible = (px + dx < best_length - EPSILON) & (py + dy <= width + EPSILON)
+            if placements:
+                rects = np.array([(x, y, x + o[0], y + o[1]) for _, x, y, o in placements])
+                ox1, oy1, ox2, oy2 = (rects[:, k][None, None, :] for k in range(4))
+                feasible &= ~((px[..., None] < ox2 - EPSILON) & (px[..., None] + dx[..., None] > ox1 + EPSILON) &
+                              (py[..., None] < oy2 - EPSILON) & (py[..., None] + dy[..., None] > oy1 + EPSILON)
+                              ).any(axis=2)
+            children = []
+            for row, column in zip(*np.nonzero(feasible)):
+                kind, orientation = options[column]
+                x, y = float(px[row, 0]), float(py[row, 0])
+                children.append((max(current_length, x + orientation[0]), x, y, kind, orientation))
+            # 左下角的极点优先，同一位置先放面积大的箱子
+            children.sort(key=lambda child: (child[1], child[2], -areas[child[3]], child[0]))
+
+            for end, x, y, kind, orientation in children:
+                if end >= best_length - EPSILON:
+                    continue
+                placement = (kind, x, y, orientation)
+                key = frozenset(placements + [placement])
+                if key in visited:
+                    continue
+                visited.add(key)
+
+                placements.append(placement)
+                counts[kind] -= 1
+                points.insert(len(placements), (x, y, x + orientation[0], y + orientation[1]))
+                finished = search(end)
+                points.remove(len(placements))
+                counts[kind] += 1
+                placements.pop()
+                if finished:
+                    return True
+            return False
+
+        search(0.0)
+        elapsed = time.perf_counter() - start_time
+
+        result = ExactSolveResult(
+            unplaced=list(self._unplaceable),
+            length=best_length if best_layout is not None else 0.0,
+            container_length=self.container.length,
+            nodes=nodes,
+            elapsed=elapsed,
+            stopped=timed_out,
+        )
+        # 搜索完整结束（或达到下界）即证明最优
+        result.optimal = best_layout is not None and not timed_out
+        result.lower_bound = result.length if result.optimal else lower_bound
+
+        remaining = [list(self._groups[kind]) for kind in self._kinds]
+        for kind, x, y, (_, _, rotated) in best_layout or []:
+            result.layout.append((remaining[kind].pop(0), x, y, rotated))
+        return result
+
+    def apply(self, result: ExactSolveResult) -> List[Box]:
+        """
+        将求解结果写回集装箱
+
+        Returns:
+            List[Box]: 不在集装箱中的箱子（包括超出集装箱长度而放不下的箱子）
+        """
+        self.container.clear()
+        leftover = list(result.unplaced)
+        for box, x, y, rotated in result.layout:
+            if box.rotated != rotated:
+                box.rotate()
+            box.move_to(x, y)
+            if not self.container.add_box(box):
+                leftover.append(box)
+        return leftover
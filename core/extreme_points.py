@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from typing import Dict, Hashable, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .free_space import Rect
+
+class ExtremePointSet:
+    """极点（extreme point）候选位置集合
+
+    好的放置位置几乎都紧贴已有箱子或集装箱壁形成的角落。每个箱子
+    (x1, y1, x2, y2) 贡献两个极点：右下角 (x2, y1) 和左上角 (x1, y2)；
+    查询时再把每个极点沿 -y 方向投影到下方第一个箱子顶边（或y=0），沿 -x
+    方向投影到左侧第一个箱子右边（或x=0），得到紧贴支撑面的位置。
+
+    箱子增删、移动、旋转时只更新该箱子贡献的极点（O(1)）；投影和重叠检查在
+    查询时对所有极点和箱子一次向量化完成，候选数量与箱子数成正比
+    （几十到几百个），远少于网格扫描的点数。
+    """
+
+    def __init__(self, length: float, width: float):
+        self.length = float(length)
+        self.width = float(width)
+        self._bounds: Dict[Hashable, Rect] = {}
+        # 查询用的边界数组及其行顺序，箱子变化后按需重建
+        self._array: Optional[np.ndarray] = None
+        self._rows: Dict[Hashable, int] = {}
+
+    def clear(self) -> None:
+        """移除所有箱子"""
+        self._bounds.clear()
+        self._array = None
+
+    def __contains__(self, key) -> bool:
+        return key in self._bounds
+
+    def __len__(self) -> int:
+        return len(self._bounds)
+
+    # ---- 增量维护 ----
+
+    def insert(self, key, rect: Rect) -> None:
+        """加入箱子矩形 (x1, y1, x2, y2)"""
+        self._bounds[key] = tuple(rect)
+        self._array = None
+
+    def remove(self, key) -> None:
+        """移除箱子"""
+        if self._bounds.pop(key, None) is not None:
+            self._array = None
+
+    def update(self, key, rect: Rect) -> None:
+        """箱子移动或旋转后更新（矩形未变化时不做任何事）"""
+        if self._bounds.get(key) != tuple(rect):
+            self.insert(key, rect)
+
+    def sync(self, items: Iterable[Tuple[Hashable, Rect]]) -> None:
+        """与外部状态同步"""
+        self._bounds = {key: tuple(rect) for key, rect in items}
+        self._array = None
+
+    # ---- 查询 ----
+
+    def _obstacles(self, exclude: Sequence) -> np.ndarray:
+        """箱子边界数组 (n, 4)，不含exclude中的箱子"""
+        if self._array is None:
+            self._rows = {key: row for row, key in enumerate(self._bounds)}
+            self._array = np.array(list(self._bounds.values()), dtype=float).reshape(-1, 4)
+        rows = [self._rows[key] for key in exclude if key in self._rows]
+        return np.delete(self._array, rows, axis=0) if rows else self._array
+
+    def points(self, exclude: Sequence = ()) -> np.ndarray:
+        """所有极点及其投影，形状 (m, 2)，去重并按左下角优先（先y后x）排序"""
+        obstacles = self._obstacles(exclude)
+        corners = np.concatenate((
+            np.zeros((1, 2)),
+            obstacles[:, [2, 1]],  # 右下角 (x2, y1)
+            obstacles[:, [0, 3]],  # 左上角 (x1, y2)
+        ))
+        px, py = corners[:, 0], corners[:, 1]
+        if len(obstacles):
+            ox1, oy1, ox2, oy2 = (obstacles[:, k][None, :] for k in range(4))
+            # 沿 -y 投影：x位于箱子x区间内且箱子顶边不高于点的最高顶边
+            below = (ox1 <= px[:, None]) & (px[:, None] < ox2) & (oy2 <= py[:, None])
+            support_y = np.where(below, oy2, 0.0).max(axis=1)
+            # 沿 -x 投影：y位于箱子y区间内且箱子右边不超过点的最右边
+            left = (oy1 <= py[:, None]) & (py[:, None] < oy2) & (ox2 <= px[:, None])
+            support_x = np.where(left, ox2, 0.0).max(axis=1)
+            corners = np.concatenate((corners,
+                                      np.column_stack((px, support_y)),
+                                      np.column_stack((support_x, py))))
+        corners = np.unique(corners, axis=0)
+        order = np.lexsort((corners[:, 0], corners[:, 1]))
+        return corners[order]
+
+    def positions(self, length: float, width: float, exclude: Sequence = ()) -> np.ndarray:
+        """length×width 的箱子可以放置的极点（在集装箱内且不与其他箱子重叠），左下角优先排序"""
+        points = self.points(exclude)
+        px, py = points[:, 0], points[:, 1]
+        inside = (px + length <= self.length) & (py + width <= self.width)
+        points, px, py = points[inside], px[inside], py[inside]
+        obstacles = self._obstacles(exclude)
+        if len(points) and len(obstacles):
+            overlap = ((px[:, None] < obstacles[None, :, 2]) &
+                       (px[:, None] + length > obstacles[None, :, 0]) &
+                       (py[:, None] < obstacles[None, :, 3]) &
+                       (py[:, None] + width > obstacles[None, :, 1])).any(axis=1)
+            points = points[~overlap]
+        return points
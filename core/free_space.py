@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from bisect import insort
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+# 矩形表示为 (x1, y1, x2, y2)
+Rect = Tuple[float, float, float, float]
+
+# 浮点比较容差 (mm)
+EPSILON = 1e-6
+
+def rects_intersect(a: Rect, b: Rect) -> bool:
+    """检查两个矩形是否相交（仅接触不算相交）"""
+    return not (a[2] <= b[0] or a[0] >= b[2] or a[3] <= b[1] or a[1] >= b[3])
+
+def _contains(outer, inner) -> bool:
+    """内部格式 (y1, x1, x2, y2) 的包含检查"""
+    return outer[1] <= inner[1] and outer[0] <= inner[0] and outer[2] >= inner[2] and outer[3] >= inner[3]
+
+def _combine(a, b):
+    """两个空闲矩形的并集中可以得到的新矩形（内部格式）
+
+    x区间相交且y区间相接时，x区间取交、y区间取并得到的矩形仍然空闲；
+    y方向同理。
+    """
+    ay1, ax1, ax2, ay2 = a
+    by1, bx1, bx2, by2 = b
+    combined = []
+    ix1, ix2 = max(ax1, bx1), min(ax2, bx2)
+    if ix1 < ix2 and ay1 <= by2 and by1 <= ay2:
+        combined.append((min(ay1, by1), ix1, ix2, max(ay2, by2)))
+    iy1, iy2 = max(ay1, by1), min(ay2, by2)
+    if iy1 < iy2 and ax1 <= bx2 and bx1 <= ax2:
+        combined.append((iy1, min(ax1, bx1), max(ax2, bx2), iy2))
+    return combined
+
+class FreeSpaceMap:
+    """集装箱空闲空间分解
+
+    维护集装箱内所有极大空闲矩形（不能再向任何方向扩展的空矩形）：
+    - 加入障碍时只切分与之相交的空闲矩形
+    - 移除障碍时把释放出的区域与相邻空闲矩形反复合并，直到没有新的极大矩形
+    - 移动/旋转 = 移除 + 加入
+    空闲矩形按 (y, x) 排序保存，便于按左下角优先顺序查询。
+    """
+
+    def __init__(self, length: float, width: float):
+        self.length = float(length)
+        self.width = float(width)
+        self._obstacles: Dict[Hashable, Rect] = {}
+        # 内部格式 (y1, x1, x2, y2)，按 (y1, x1) 有序
+        self._free: List[Tuple[float, float, float, float]] = [(0.0, 0.0, self.length, self.width)]
+
+    def clear(self) -> None:
+        """移除所有障碍"""
+        self._obstacles.clear()
+        self._free = [(0.0, 0.0, self.length, self.width)]
+
+    def copy(self) -> 'FreeSpaceMap':
+        """复制当前状态"""
+        other = FreeSpaceMap(self.length, self.width)
+        other._obstacles = dict(self._obstacles)
+        other._free = list(self._free)
+        return other
+
+    def __contains__(self, key) -> bool:
+        return key in self._obstacles
+
+    def __len__(self) -> int:
+        return len(self._obstacles)
+
+    def obstacle(self, key) -> Optional[Rect]:
+        """获取已记录的障碍矩形"""
+        return self._obstacles.get(key)
+
+    def insert(self, key, rect: Rect) -> None:
+        """加入障碍矩形"""
+        if key in self._obstacles:
+            self.remove(key)
+        self._obstacles[key] = rect
+        self._split(rect)
+
+    def remove(self, key) -> None:
+        """移除障碍矩形，释放其占用的空间"""
+        rect = self._obstacles.pop(key, None)
+        if rect is None:
+            return
+
+        x1, y1 = max(rect[0], 0.0), max(rect[1], 0.0)
+        x2, y2 = min(rect[2], self.length), min(rect[3], self.width)
+        if x1 >= x2 or y1 >= y2:
+            return
+
+        # 释放区域中仍被其他（重叠的）障碍占用的部分不能算作空闲
+        released = [(y1, x1, x2, y2)]
+        for other in self._obstacles.values():
+            if rects_intersect(other, rect):
+                released = self._split_list(released, other)
+        self._merge(released)
+
+    def update(self, key, rect: Rect) -> None:
+        """障碍移动或旋转"""
+        if self._obstacles.get(key) == rect:
+            return
+        self.remove(key)
+        self._obstacles[key] = rect
+        self._split(rect)
+
+    def sync(self, items: Iterable[Tuple[Hashable, Rect]]) -> None:
+        """与外部状态同步：只对新增、消失或边界变化的障碍做增量更新"""
+        current = dict(items)
+        for key in [key for key in self._obstacles if key not in current]:
+            self.remove(key)
+        for key, rect in current.items():
+            if self._obstacles.get(key) != rect:
+                self.update(key, rect)
+
+    @property
+    def rects(self) -> List[Rect]:
+        """所有极大空闲矩形 (x1, y1, x2, y2)，按左下角优先排序"""
+        return [(x1, y1, x2, y2) for y1, x1, x2, y2 in self._free]
+
+    def bottom_left_position(self, length: float, width: float) -> Optional[Tuple[float, float]]:
+        """左下角优先（先y后x）的最小可放置位置"""
+        for y1, x1, x2, y2 in self._free:
+            if x2 - x1 + EPSILON >= length and y2 - y1 + EPSILON >= width:
+                return (x1, y1)
+        return None
+
+    def largest_free_rect(self) -> Optional[Rect]:
+        """面积最大的空闲矩形"""
+        best = None
+        best_area = -1.0
+        for y1, x1, x2, y2 in self._free:
+            area = (x2 - x1) * (y2 - y1)
+            if area > best_area:
+                best_area = area
+                best = (x1, y1, x2, y2)
+        return best
+
+    def rects_fitting(self, length: float, width: float, allow_rotation: bool = False) -> List[Rect]:
+        """能容纳 length×width 的空闲矩形（allow_rotation时任一方向能放下即可）"""
+        fitting = []
+        for y1, x1, x2, y2 in self._free:
+            free_length, free_width = x2 - x1 + EPSILON, y2 - y1 + EPSILON
+            if ((free_length >= length and free_width >= width) or
+                    (allow_rotation and free_length >= width and free_width >= length)):
+                fitting.append((x1, y1, x2, y2))
+        return fitting
+
+    def free_area(self, region: Optional[Rect] = None) -> float:
+        """区域内的空闲面积（默认整个集装箱），假设障碍之间不重叠"""
+        if region is None:
+            region = (0.0, 0.0, self.length, self.width)
+        rx1, ry1 = max(region[0], 0.0), max(region[1], 0.0)
+        rx2, ry2 = min(region[2], self.length), min(region[3], self.width)
+        if rx1 >= rx2 or ry1 >= ry2:
+            return 0.0
+
+        occupied = 0.0
+        for x1, y1, x2, y2 in self._obstacles.values():
+            overlap_x = min(x2, rx2) - max(x1, rx1)
+            overlap_y = min(y2, ry2) - max(y1, ry1)
+            if overlap_x > 0 and overlap_y > 0:
+                occupied += overlap_x * overlap_y
+        return max(0.0, (rx2 - rx1) * (ry2 - ry1) - occupied)
+
+    def _split(self, rect: Rect) -> None:
+        """用障碍矩形切分所有与之相交的空闲矩形"""
+        self._free = self._split_list(self._free, rect)
+
+    @staticmethod
+    def _split_list(free, rect: Rect):
+        rx1, ry1, rx2, ry2 = rect
+        kept = []
+        pieces = []
+        for item in free:
+            fy1, fx1, fx2, fy2 = item
+            if rx2 <= fx1 or rx1 >= fx2 or ry2 <= fy1 or ry1 >= fy2:
+                kept.append(item)
+                continue
+            if rx1 > fx1:
+                pieces.append((fy1, fx1, rx1, fy2))
+            if rx2 < fx2:
+                pieces.append((fy1, rx2, fx2, fy2))
+            if ry1 > fy1:
+                pieces.append((fy1, fx1, fx2, ry1))
+            if ry2 < fy2:
+                pieces.append((ry2, fx1, fx2, fy2))
+
+        if not pieces:
+            return kept
+
+        # 去除被其他空闲矩形包含的碎片（原有矩形之间互不包含）
+        pieces = list(dict.fromkeys(pieces))
+        for piece in pieces:
+            if any(_contains(other, piece) for other in kept):
+                continue
+            if any(other != piece and _contains(other, piece) for other in pieces):
+                continue
+            insort(kept, piece)
+        return kept
+
+    def _merge(self, released) -> None:
+        """把释放出的矩形并入空闲集合，并闭包生成所有新的极大矩形"""
+        free = set(self._free)
+        queue = list(released)
+        while queue:
+            candidate = queue.pop()
+            if any(_contains(other, candidate) for other in free):
+                continue
+            free = {other for other in free if not _contains(candidate, other)}
+            for other in free:
+                for combined in _combine(candidate, other):
+                    if combined != other and not _contains(other, combined) and not _contains(candidate, combined):
+                        queue.append(combined)
+            free.add(candidate)
+        self._free = sorted(free)
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from .box import Box
+from .free_space import EPSILON
+
+# 子问题的解：(箱子面积和, 各尺寸类型用量, 布局树)
+# 布局树为 None（空）或 (类型序号, 是否旋转, 箱子X尺寸, 箱子Y尺寸, 第一块偏移, 第一块子树, 第二块偏移, 第二块子树)
+Solution = Tuple[float, Tuple[int, ...], Optional[tuple]]
+
+_EMPTY_PLAN = None
+
+@dataclass
+class GuillotinePackResult:
+    """剪切式装载结果"""
+    placements: List[Tuple[Box, float, float, bool]] = field(default_factory=list)  # (箱子, x, y, 是否旋转)
+    leftover: List[Box] = field(default_factory=list)  # 未能装入的箱子
+    region: Tuple[float, float, float, float] = (0.0, 0.0, 0.0, 0.0)  # 参与装载的区域 (x1, y1, x2, y2)
+    subproblems: int = 0  # 实际求解的子问题数
+    memo_hits: int = 0  # 直接复用已求解子问题的次数
+    elapsed: float = 0.0  # 耗时 (秒)
+
+    @property
+    def placed_count(self) -> int:
+        return len(self.placements)
+
+    def summary(self) -> str:
+        """生成结果摘要文本"""
+        x1, y1, x2, y2 = self.region
+        region_area = (x2 - x1) * (y2 - y1)
+        area = sum(box.area for box, _, _, _ in self.placements)
+        return "\n".join([
+            f"装入箱子: {self.placed_count} 个, 剩余: {len(self.leftover)} 个",
+            f"区域利用率: {area / region_area * 100 if region_area > 0 else 0:.1f}%",
+            f"子问题: {self.subproblems} 个, 复用: {self.memo_hits} 次",
+            f"耗时: {self.elapsed * 1000:.1f} ms",
+        ])
+
+class GuillotinePacker:
+    """剪切式（guillotine）装载
+
+    布局必须能被一系列贯穿的直线切割分开，便于逐排卸货。递归求解：在矩形
+    左下角放一个箱子，然后沿箱子的一条边把剩余区域切成两个矩形分别递归
+    （先横切或先竖切两种），第二块使用第一块剩下的箱子；每层只尝试面积
+    最大的 beam 种尺寸/方向，已达到面积上界（矩形面积或可用箱子总面积）时
+    不再尝试其他分支。求解的子问题数超过 max_subproblems 后退化为贪心
+    （只取第一个候选、只先横切），保证几百个箱子也能在数秒内完成。
+
+    子问题以 (矩形尺寸, 剩余箱子的尺寸多重集) 为键缓存。多重集中每种尺寸的
+    个数截断到该矩形面积最多能容纳的个数，因此大量箱子剩余时不同分支的
+    相同子矩形得到同一个键，只求解一次。
+    """
+
+    DEFAULT_BEAM = 2
+    DEFAULT_MAX_SUBPROBLEMS = 20000
+
+    def __init__(self, beam: int = DEFAULT_BEAM, max_subproblems: int = DEFAULT_MAX_SUBPROBLEMS):
+        self.beam = beam
+        self.max_subproblems = max_subproblems
+
+    def plan(self, boxes: List[Box], length: float, width: float,
+             origin: Tuple[float, float] = (0.0, 0.0)) -> GuillotinePackResult:
+        """计算 length×width 区域内的剪切式布局（不修改箱子），origin为区域左下角"""
+        started = time.perf_counter()
+        result = GuillotinePackResult(region=(origin[0], origin[1], origin[0] + length, origin[1] + width))
+
+        # 按尺寸归类，每类的箱子按重量递减取用
+        groups: Dict[Tuple[float, float], List[Box]] = {}
+        for box in sorted(boxes, key=lambda b: b.weight, reverse=True):
+            groups.setdefault((box.length, box.width), []).append(box)
+        self._kinds = list(groups)
+        self._rotatable = [groups[kind][0].can_rotate() for kind in self._kinds]
+        self._areas = [kind[0] * kind[1] for kind in self._kinds]
+        self._min_side = min((min(kind) for kind in self._kinds), default=0.0)
+        self._memo: Dict[tuple, Solution] = {}
+        self._result = result
+
+        counts = tuple(len(groups[kind]) for kind in self._kinds)
+        _, _, plan = self._solve(length, width, counts)
+
+        remaining = [list(groups[kind]) for kind in self._kinds]
+        for kind, x, y, rotated in _flatten(plan, origin[0], origin[1]):
+            result.placements.append((remaining[kind].pop(0), x, y, rotated))
+        result.leftover = [box for group in remaining for box in group]
+        result.elapsed = time.perf_counter() - started
+        return result
+
+    def pack(self, container, boxes: List[Box]) -> GuillotinePackResult:
+        """把箱子剪切式装入集装箱，区域为已有箱子末端之后的整段空间
+
+        写入集装箱时逐个做碰撞检查，放不下的箱子计入 leftover
+        """
+        start_x = max((box.x + box.actual_length for box in container.boxes), default=0.0)
+        result = self.plan(boxes, container.length - start_x, container.width, (start_x, 0.0))
+        for box, x, y, rotated in result.placements:
+            if box.rotated != rotated:
+                box.rotate()
+            box.move_to(x, y)
+            if not container.add_box(box):
+                result.leftover.append(box)
+        return result
+
+    def _solve(self, length: float, width: float, counts: Tuple[int, ...]) -> Solution:
+        """矩形 length×width 内、可用箱子为counts时的最佳剪切式布局"""
+        empty = (0.0, (0,) * len(counts), _EMPTY_PLAN)
+        if min(length, width) < self._min_side - EPSILON:
+            return empty
+
+        # 每种尺寸的个数截断到矩形面积能容纳的上限，放不下的尺寸记为0
+        capped = []
+        for kind, count in enumerate(counts):
+            if count and self._orientations(kind, length, width):
+                capped.append(min(count, int((length * width + EPSILON) // self._areas[kind])))
+            else:
+                capped.append(0)
+        capped = tuple(capped)
+        key = (length, width, capped)
+        cached = self._memo.get(key)
+        if cached is not None:
+            self._result.memo_hits += 1
+            return cached
+        self._result.subproblems += 1
+
+        candidates = []
+        for kind, count in enumerate(capped):
+            if count:
+                for size_x, size_y, rotated in self._orientations(kind, length, width):
+                    # 面积大的优先，同面积时X方向更贴合矩形的优先
+                    candidates.append((-self._areas[kind], length - size_x, kind, size_x, size_y, rotated))
+        candidates.sort()
+        bound = min(length * width, sum(c * a for c, a in zip(capped, self._areas)))
+        greedy = self._result.subproblems > self.max_subproblems
+
+        best = empty
+        for _, _, kind, size_x, size_y, rotated in candidates[:1 if greedy else self.beam]:
+            rest = list(capped)
+            rest[kind] -= 1
+            rest = tuple(rest)
+            # 先横切：右侧与箱子同高的窄条 + 上方整宽的剩余；先竖切：上方与箱子同长的窄条 + 右侧整高的剩余
+            splits = (((length - size_x, size_y), (size_x, 0.0), (length, width - size_y), (0.0, size_y)),
+                      ((size_x, width - size_y), (0.0, size_y), (length - size_x, width), (size_x, 0.0)))
+            for first, first_offset, second, second_offset in splits[:1] if greedy else splits:
+                first_area, first_used, first_plan = self._solve(first[0], first[1], rest)
+                rest_after = tuple(r - u for r, u in zip(rest, first_used))
+                second_area, second_used, second_plan = self._solve(second[0], second[1], rest_after)
+                area = self._areas[kind] + first_area + second_area
+                if area > best[0] + EPSILON:
+                    used = tuple(f + s for f, s in zip(first_used, second_used))
+                    used = used[:kind] + (used[kind] + 1,) + used[kind + 1:]
+                    best = (area, used, (kind, rotated, size_x, size_y,
+                                         first_offset, first_plan, second_offset, second_plan))
+                    if best[0] >= bound - EPSILON:
+                        break
+            if best[0] >= bound - EPSILON:
+                break
+
+        self._memo[key] = best
+        return best
+
+    def _orientations(self, kind: int, length: float, width: float) -> List[Tuple[float, float, bool]]:
+        """一种尺寸能放进矩形的方向 (X尺寸, Y尺寸, 是否旋转)"""
+        box_length, box_width = self._kinds[kind]
+        options = []
+        if box_length <= length + EPSILON and box_width <= width + EPSILON:
+            options.append((box_length, box_width, False))
+        if (self._rotatable[kind] and box_length != box_width and
+                box_width <= length + EPSILON and box_length <= width + EPSILON):
+            options.append((box_width, box_length, True))
+        return options
+
+def _flatten(plan: Optional[tuple], x: float, y: float) -> List[Tuple[int, float, float, bool]]:
+    """把布局树展开为 (类型序号, x, y, 是否旋转)"""
+    placements = []
+    stack = [(plan, x, y)]
+    while stack:
+        node, node_x, node_y = stack.pop()
+        if node is None:
+            continue
+        kind, rotated, _, _, first_offset, first_plan, second_offset, second_plan = node
+        placements.append((kind, node_x, node_y, rotated))
+        stack.append((first_plan, node_x + first_offset[0], node_y + first_offset[1]))
+        stack.append((second_plan, node_x + second_offset[0], node_y + second_offset[1]))
+    return placements
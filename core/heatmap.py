@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from dataclasses import dataclass
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from .box import Box
+from .probe import box_dims
+
+@dataclass(frozen=True, eq=False)
+class FeasibilityHeatmap:
+    """候选箱子在所有栅格点原点上的可行性及放入后的扭矩
+
+    数组形状均为 (X方向原点数, Y方向原点数)，[i, j] 对应原点
+    (i*resolution, j*resolution)。扭矩为放入该位置后整个集装箱的
+    |左-右| 和 |前-后| 扭矩 (kg·mm)，不可行的位置也给出数值。
+    """
+    resolution: float
+    box_length: float  # 箱子X方向尺寸（已考虑旋转）
+    box_width: float  # 箱子Y方向尺寸
+    weight: float
+    feasible: np.ndarray
+    lr_torque: np.ndarray
+    fr_torque: np.ndarray
+    lr_torque_limit: float
+    fr_torque_limit: float
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.feasible.shape
+
+    @property
+    def balanced(self) -> np.ndarray:
+        """可放置且放入后扭矩不超限的原点"""
+        return (self.feasible & (self.lr_torque <= self.lr_torque_limit)
+                & (self.fr_torque <= self.fr_torque_limit))
+
+    @property
+    def load_ratio(self) -> np.ndarray:
+        """放入后两个方向扭矩占限值比例的较大者（<=1 为平衡）"""
+        return np.maximum(self.lr_torque / self.lr_torque_limit,
+                          self.fr_torque / self.fr_torque_limit)
+
+    def origin(self, i: int, j: int) -> Tuple[float, float]:
+        """原点下标对应的坐标"""
+        return (i * self.resolution, j * self.resolution)
+
+    def best_position(self) -> Optional[Tuple[float, float]]:
+        """可放置位置中扭矩占限值比例最小的原点，没有可放置位置返回None"""
+        if not self.feasible.any():
+            return None
+        ratio = np.where(self.feasible, self.load_ratio, np.inf)
+        i, j = np.unravel_index(int(np.argmin(ratio)), ratio.shape)
+        return self.origin(int(i), int(j))
+
+def compute_heatmap(container, length: float, width: float, weight: float,
+                    exclude: Sequence = ()) -> FeasibilityHeatmap:
+    """计算 length×width、重量为weight的箱子在集装箱中的可行原点图和扭矩图
+
+    可行性来自集装箱的占用栅格（一次窗口求和），扭矩由当前平衡结果的带符号
+    净扭矩加上新箱子的贡献得出：左右扭矩只与原点的y有关、前后扭矩只与x有关，
+    两张图由两个一维数组广播得到。exclude中的箱子（如正在重新摆放的箱子）
+    既不算障碍也不计入扭矩。
+    """
+    occupancy = container.occupancy
+    feasible = occupancy.feasible_origins(length, width, exclude=exclude)
+    resolution = occupancy.resolution
+
+    balance = container.calculate_weight_balance()
+    lr_signed = balance['left_torque'] - balance['right_torque']
+    fr_signed = balance['front_torque'] - balance['rear_torque']
+    center_x_line = container.length / 2
+    center_y_line = container.width / 2
+    for box in exclude:
+        if box in container:
+            lr_signed -= box.weight * (box.center_y - center_y_line)
+            fr_signed -= box.weight * (center_x_line - box.center_x)
+
+    # 新箱子质心位于 (i*r + length/2, j*r + width/2)
+    center_x = np.arange(feasible.shape[0]) * resolution + length / 2
+    center_y = np.arange(feasible.shape[1]) * resolution + width / 2
+    fr_torque = np.abs(fr_signed + weight * (center_x_line - center_x))
+    lr_torque = np.abs(lr_signed + weight * (center_y - center_y_line))
+
+    return FeasibilityHeatmap(
+        resolution=resolution, box_length=length, box_width=width, weight=weight,
+        feasible=feasible,
+        lr_torque=np.broadcast_to(lr_torque[None, :], feasible.shape),
+        fr_torque=np.broadcast_to(fr_torque[:, None], feasible.shape),
+        lr_torque_limit=container.LR_TORQUE_LIMIT, fr_torque_limit=container.FR_TORQUE_LIMIT)
+
+def box_heatmap(container, box: Box, rotated: Optional[bool] = None) -> FeasibilityHeatmap:
+    """箱子（指定旋转状态）的热图；箱子已在集装箱中时不把它自身算作障碍"""
+    length, width = box_dims(box, rotated)
+    return compute_heatmap(container, length, width, box.weight, exclude=(box,))
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from .box import Box
+
+# 箱子状态 (x, y, rotated)，不在集装箱中为None
+State = Optional[Tuple[float, float, bool]]
+
+class HistoryEntry:
+    """一条撤销记录：一次编辑中各箱子变化前后的状态（只记录增量）"""
+
+    def __init__(self, label: str):
+        self.label = label
+        # (id(集装箱), 箱子) → [集装箱, 箱子, 变化前, 变化后]，保持首次变化的顺序
+        self._changes: Dict[tuple, list] = {}
+        self.deleted: List[Box] = []  # 本次编辑中被删除（从项目中注销）的箱子，重做时需再次注销
+
+    def __len__(self) -> int:
+        return len(self._changes)
+
+    def add(self, container, box: Box, before: State, after: State) -> None:
+        """记录一次变化；同一箱子的连续变化合并为一条（保留最初状态和最终状态）"""
+        key = (id(container), box)
+        change = self._changes.get(key)
+        if change is None:
+            self._changes[key] = [container, box, before, after]
+        else:
+            change[3] = after
+            if change[2] == change[3]:
+                # 回到了最初状态（如拖出又拖回原处）
+                del self._changes[key]
+
+    def forget(self, container) -> None:
+        """丢弃某个集装箱的变化"""
+        self._changes = {key: change for key, change in self._changes.items()
+                         if change[0] is not container}
+
+    @property
+    def boxes(self) -> List[Box]:
+        """涉及的箱子"""
+        return [change[1] for change in self._changes.values()]
+
+    def changes(self) -> List[Tuple[object, Box, State, State]]:
+        """按发生顺序的 (集装箱, 箱子, 变化前, 变化后)"""
+        return [tuple(change) for change in self._changes.values()]
+
+class History:
+    """集装箱编辑的撤销/重做日志
+
+    通过 Container.add_listener 监听被关注的集装箱，每条记录只保存发生变化的
+    箱子的前后状态，内存与编辑量成正比。transaction() 把多次修改（拖动过程、
+    互换、批量装载等）合并为一条记录；不在事务中的每次修改单独成为一条记录。
+    撤销/重做通过集装箱的增删和 update_box 重放状态，重放期间不产生新记录。
+    """
+
+    DEFAULT_LIMIT = 5000  # 最多保留的撤销步数
+
+    def __init__(self, limit: int = DEFAULT_LIMIT):
+        self._undo = deque(maxlen=limit)
+        self._redo: List[HistoryEntry] = []
+        self._containers: List[object] = []
+        self._open: Optional[HistoryEntry] = None
+        self._depth = 0
+        self._replaying = False
+
+    # ---- 关注的集装箱 ----
+
+    def watch(self, container) -> None:
+        """开始记录集装箱的修改"""
+        if not any(existing is container for existing in self._containers):
+            self._containers.append(container)
+            container.add_listener(self._on_change)
+
+    def unwatch(self, container) -> None:
+        """停止记录集装箱的修改，并丢弃与之相关的记录（如集装箱被关闭）"""
+        container.remove_listener(self._on_change)
+        self._containers = [existing for existing in self._containers if existing is not container]
+        for entries in (self._undo, self._redo):
+            for entry in entries:
+                entry.forget(container)
+        self._undo = deque((entry for entry in self._undo if len(entry)), maxlen=self._undo.maxlen)
+        self._redo = [entry for entry in self._redo if len(entry)]
+
+    def clear(self) -> None:
+        """清空所有记录并停止关注所有集装箱"""
+        for container in self._containers:
+            container.remove_listener(self._on_change)
+        self._containers = []
+        self._undo.clear()
+        self._redo.clear()
+
+    # ---- 记录 ----
+
+    def begin(self, label: str) -> None:
+        """开始一个事务（可嵌套，只有最外层生效）"""
+        if self._depth == 0:
+            self._open = HistoryEntry(label)
+        self._depth += 1
+
+    def end(self) -> None:
+        """结束事务，事务内的修改合并为一条记录"""
+        if self._depth == 0:
+            return
+        self._depth -= 1
+        if self._depth == 0:
+            entry, self._open = self._open, None
+            self._push(entry)
+
+    def mark_deleted(self, boxes: List[Box]) -> None:
+        """记录箱子在当前编辑中被删除而不是放回待装载列表
+
+        撤销时箱子照常回到集装箱；重做时调用方应按 entry.deleted 再次注销这些箱子。
+        不在事务中时记入最近一条记录。
+        """
+        entry = self._open if self._open is not None else (self._undo[-1] if self._undo else None)
+        if entry is not None:
+            entry.deleted.extend(box for box in boxes if box not in entry.deleted)
+
+    @contextmanager
+    def transaction(self, label: str):
+        """with history.transaction("互换箱子"): ..."""
+        self.begin(label)
+        try:
+            yield
+        finally:
+            self.end()
+
+    def _on_change(self, container, changes) -> None:
+        if self._replaying:
+            return
+        entry = self._open if self._open is not None else HistoryEntry("编辑")
+        for box, before, after in changes:
+            entry.add(container, box, before, after)
+        if self._open is None:
+            self._push(entry)
+
+    def _push(self, entry: HistoryEntry) -> None:
+        if len(entry):
+            self._undo.append(entry)
+            self._redo.clear()
+
+    # ---- 撤销/重做 ----
+
+    @property
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    @property
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    @property
+    def undo_label(self) -> Optional[str]:
+        return self._undo[-1].label if self._undo else None
+
+    @property
+    def redo_label(self) -> Optional[str]:
+        return self._redo[-1].label if self._redo else None
+
+    def undo(self) -> Optional[HistoryEntry]:
+        """撤销最近一条记录，返回被撤销的记录（没有可撤销的返回None）"""
+        if not self._undo or self._depth:
+            return None
+        entry = self._undo.pop()
+        self._replay(reversed(entry.changes()), undo=True)
+        self._redo.append(entry)
+        return entry
+
+    def redo(self) -> Optional[HistoryEntry]:
+        """重做最近一条被撤销的记录"""
+        if not self._redo or self._depth:
+            return None
+        entry = self._redo.pop()
+        self._replay(entry.changes(), undo=False)
+        self._undo.append(entry)
+        return entry
+
+    def _replay(self, changes, undo: bool) -> None:
+        self._replaying = True
+        try:
+            # 先移出再放入，箱子在集装箱之间转移时不会同时出现在两处
+            changes = list(changes)
+            targets = [(container, box, before if undo else after)
+                       for container, box, before, after in changes]
+            for container, box, state in targets:
+                if state is None:
+                    container.remove_box(box)
+            for container, box, state in targets:
+                if state is not None:
+                    _apply_state(container, box, state)
+        finally:
+            self._replaying = False
+
+def _apply_state(container, box: Box, state: Tuple[float, float, bool]) -> None:
+    x, y, rotated = state
+    box.move_to(x, y)
+    box.rotated = rotated
+    if container.recorded_state(box) is not None:
+        container.update_box(box)
+    else:
+        container.add_box(box, check=False)
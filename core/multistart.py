@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .box import Box
+from .container import Container
+from .packing import BEST_FIT, pack_boxes, sort_boxes_for_packing
+
+# 传给工作进程的紧凑箱子数据：(id, 长, 宽, 重量, 可旋转)
+BoxSpec = Tuple[str, float, float, float, bool]
+# 工作进程返回的紧凑布局：(集装箱序号, id, x, y, 是否旋转)
+Placement = Tuple[int, str, float, float, bool]
+
+@dataclass
+class StartResult:
+    """单次起点的装箱结果"""
+    start_index: int
+    score: tuple
+    layout: List[Placement] = field(default_factory=list)
+    leftover: List[str] = field(default_factory=list)  # 未装入箱子的id
+    container_count: int = 0
+    utilization: float = 0.0  # 已用集装箱的总体面积利用率 (0-1)
+    balanced_count: int = 0  # 扭矩在限制内的集装箱数量
+
+@dataclass
+class MultiStartResult:
+    """多起点装箱的最佳结果"""
+    best: StartResult
+    starts: int = 0
+    workers: int = 1
+    elapsed: float = 0.0  # 耗时 (秒)
+
+    def summary(self) -> str:
+        """生成结果摘要文本"""
+        best = self.best
+        return "\n".join([
+            f"起点数: {self.starts}（{self.workers} 个进程）",
+            f"最佳起点: #{best.start_index}",
+            f"装入箱子: {len(best.layout)} 个, 剩余: {len(best.leftover)} 个",
+            f"使用集装箱: {best.container_count} 个, 其中平衡: {best.balanced_count} 个",
+            f"总体利用率: {best.utilization * 100:.1f}%",
+            f"耗时: {self.elapsed:.2f}s",
+        ])
+
+def _order_boxes(boxes: List[Box], start_index: int, rng: random.Random) -> List[Box]:
+    """生成第start_index个起点的装箱顺序：前几个为确定性启发式，其余为随机扰动"""
+    if start_index == 0:
+        return sort_boxes_for_packing(boxes)
+    if start_index == 1:
+        return sorted(boxes, key=lambda b: (max(b.length, b.width), b.area), reverse=True)
+    if start_index == 2:
+        return sorted(boxes, key=lambda b: (b.weight, b.area), reverse=True)
+    if start_index == 3:
+        return sorted(boxes, key=lambda b: (b.length + b.width, b.area), reverse=True)
+    # 对面积递减顺序做随机扰动，保留大箱优先的大致结构
+    return sorted(boxes, key=lambda b: b.area * rng.uniform(0.6, 1.4), reverse=True)
+
+def _run_start(args) -> StartResult:
+    """工作进程入口：执行一次装箱并返回紧凑布局"""
+    start_index, seed, specs, length, width = args
+    rng = random.Random(seed)
+
+    boxes = []
+    for box_id, box_length, box_width, weight, can_rotate in specs:
+        box = Box(box_id, box_length, box_width, weight)
+        if can_rotate and start_index >= 4 and rng.random() < 0.5:
+            box.rotate()
+        boxes.append(box)
+
+    containers: List[Container] = [Container("0", length, width)]
+
+    def factory() -> Container:
+        container = Container(str(len(containers)), length, width)
+        containers.append(container)
+        return container
+
+    ordered = _order_boxes(boxes, start_index, rng)
+    result = pack_boxes(ordered, containers[:1], container_factory=factory,
+                        strategy=BEST_FIT, presorted=True)
+
+    layout: List[Placement] = []
+    used = [container for container in containers if container.boxes]
+    for container_index, container in enumerate(used):
+        for box in container.boxes:
+            layout.append((container_index, box.id, box.x, box.y, box.rotated))
+
+    total_area = sum(container.area for container in used)
+    used_area = sum(container.used_area for container in used)
+    utilization = used_area / total_area if total_area > 0 else 0.0
+
+    balanced_count = 0
+    torque_excess = 0.0
+    for container in used:
+        balance = container.calculate_weight_balance()
+        if balance['is_balanced']:
+            balanced_count += 1
+        torque_excess += (max(0.0, balance['lr_torque'] - balance['lr_torque_limit']) / balance['lr_torque_limit'] +
+                          max(0.0, balance['fr_torque'] - balance['fr_torque_limit']) / balance['fr_torque_limit'])
+
+    # 评分越大越好：剩余箱子少 > 集装箱少 > 利用率高 > 平衡的集装箱多 > 超限扭矩小
+    score = (-len(result.leftover), -len(used), round(utilization, 9), balanced_count, -torque_excess)
+    return StartResult(
+        start_index=start_index,
+        score=score,
+        layout=layout,
+        leftover=[box.id for box in result.leftover],
+        container_count=len(used),
+        utilization=utilization,
+        balanced_count=balanced_count,
+    )
+
+class MultiStartPacker:
+    """多起点并行装箱器
+
+    将不同的装箱顺序和旋转初值分发到进程池中并行执行，每个工作进程只返回
+    紧凑布局 (集装箱序号, id, x, y, 是否旋转)，最后按利用率和平衡评分取最佳。
+    每个起点的随机种子由主种子确定性派生，结果与进程数无关。
+    """
+
+    def __init__(self, starts: Optional[int] = None, workers: Optional[int] = None, seed: int = 0,
+                 container_length: float = None, container_width: float = None):
+        """
+        初始化多起点装箱器
+
+        Args:
+            starts: 起点数量，默认为进程数的4倍（至少8个）
+            workers: 进程数，默认为CPU核数；为1时在当前进程内执行
+            seed: 主随机种子
+            container_length: 集装箱长度 (mm)
+            container_width: 集装箱宽度 (mm)
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.starts = starts or max(8, self.workers * 4)
+        self.seed = seed
+        self.container_length = container_length or Container.DEFAULT_LENGTH
+        self.container_width = container_width or Container.DEFAULT_WIDTH
+
+    def _start_seeds(self) -> List[int]:
+        master = random.Random(self.seed)
+        return [master.randrange(2 ** 32) for _ in range(self.starts)]
+
+    def pack(self, boxes: List[Box]) -> MultiStartResult:
+        """对箱子执行多起点装箱，返回最佳结果（不修改传入的箱子）"""
+        start_time = time.perf_counter()
+        specs: List[BoxSpec] = [
+            (box.id, box.length, box.width, box.weight, box.can_rotate()) for box in boxes
+        ]
+        tasks = [
+            (index, seed, specs, self.container_length, self.container_width)
+            for index, seed in enumerate(self._start_seeds())
+        ]
+
+        workers = min(self.workers, len(tasks))
+        if workers <= 1:
+            results = [_run_start(task) for task in tasks]
+        else:
+            chunksize = max(1, len(tasks) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(_run_start, tasks, chunksize=chunksize))
+
+        # 评分相同时取序号小的起点，保证结果确定
+        best = max(results, key=lambda r: (r.score, -r.start_index))
+        return MultiStartResult(
+            best=best,
+            starts=len(tasks),
+            workers=max(1, workers),
+            elapsed=time.perf_counter() - start_time,
+        )
+
+    @staticmethod
+    def apply(result: MultiStartResult, boxes: List[Box],
+              container_factory: Callable[[], Container],
+              containers: Optional[List[Container]] = None) -> List[Box]:
+        """
+        将最佳布局写入集装箱
+
+        Args:
+            result: pack() 的返回值
+            boxes: 传给 pack() 的箱子
+            container_factory: 创建新集装箱的回调
+            containers: 优先使用的空集装箱
+
+        Returns:
+            List[Box]: 未能装入的箱子
+        """
+        boxes_by_id: Dict[str, Box] = {box.id: box for box in boxes}
+        targets = [container for container in (containers or []) if not container.boxes]
+        leftover = [boxes_by_id[box_id] for box_id in result.best.leftover]
+
+        for container_index, box_id, x, y, rotated in result.best.layout:
+            while container_index >= len(targets):
+                targets.append(container_factory())
+            box = boxes_by_id[box_id]
+            if box.rotated != rotated:
+                box.rotate()
+            box.move_to(x, y)
+            if not targets[container_index].add_box(box):
+                leftover.append(box)
+        return leftover
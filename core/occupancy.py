@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import math
+from typing import Dict, Hashable, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .free_space import EPSILON, Rect
+
+# 单元格下标范围 (i0, i1, j0, j1)，左闭右开
+CellRange = Tuple[int, int, int, int]
+
+class OccupancyGrid:
+    """集装箱占用栅格（可选的加速结构）
+
+    把集装箱划分为 resolution×resolution 的单元格（默认10mm，12000×2300mm 为
+    1200×230 格），每格记录覆盖它的箱子数。箱子覆盖所有与其内部相交的单元格，
+    因此某矩形所覆盖单元格的计数和为0时，它一定不与任何箱子重叠（保守判定：
+    箱子边缘不在栅格线上时，和不为0也可能并不重叠，需要精确检查）。
+
+    箱子增删移动时按单元格范围增量更新计数；二维前缀和（summed-area table）
+    在查询时按需重建，之后任意矩形的计数和都是O(1)，对一种箱子尺寸的所有
+    栅格点原点可以一次向量化窗口求和得到可行原点图。
+    """
+
+    DEFAULT_RESOLUTION = 10  # mm
+
+    def __init__(self, length: float, width: float, resolution: float = DEFAULT_RESOLUTION):
+        self.length = float(length)
+        self.width = float(width)
+        self.resolution = float(resolution)
+        self.shape = (max(1, math.ceil(self.length / self.resolution - EPSILON)),
+                      max(1, math.ceil(self.width / self.resolution - EPSILON)))
+        self._counts = np.zeros(self.shape, dtype=np.int32)
+        self._cells: Dict[Hashable, CellRange] = {}
+        self._rects: Dict[Hashable, Rect] = {}
+        self._sat: Optional[np.ndarray] = None
+
+    def clear(self) -> None:
+        """移除所有箱子"""
+        self._counts[:] = 0
+        self._cells.clear()
+        self._rects.clear()
+        self._sat = None
+
+    def __contains__(self, key) -> bool:
+        return key in self._cells
+
+    def __len__(self) -> int:
+        return len(self._cells)
+
+    # ---- 增量维护 ----
+
+    def insert(self, key, rect: Rect) -> None:
+        """加入箱子矩形 (x1, y1, x2, y2)"""
+        if key in self._cells:
+            self.remove(key)
+        cells = self.cell_range(rect)
+        i0, i1, j0, j1 = cells
+        self._counts[i0:i1, j0:j1] += 1
+        self._cells[key] = cells
+        self._rects[key] = rect
+        self._sat = None
+
+    def remove(self, key) -> None:
+        """移除箱子"""
+        cells = self._cells.pop(key, None)
+        if cells is None:
+            return
+        self._rects.pop(key)
+        i0, i1, j0, j1 = cells
+        self._counts[i0:i1, j0:j1] -= 1
+        self._sat = None
+
+    def update(self, key, rect: Rect) -> None:
+        """箱子移动或旋转后更新（矩形未变化时不做任何事）"""
+        if self._rects.get(key) != rect:
+            self.insert(key, rect)
+
+    def sync(self, items: Iterable[Tuple[Hashable, Rect]]) -> None:
+        """与外部状态同步：只对新增、消失或边界变化的箱子做增量更新"""
+        current = dict(items)
+        for key in [key for key in self._cells if key not in current]:
+            self.remove(key)
+        for key, rect in current.items():
+            self.update(key, rect)
+
+    # ---- 查询 ----
+
+    def cell_range(self, rect: Rect) -> CellRange:
+        """矩形内部覆盖的单元格范围（裁剪到栅格内）"""
+        x1, y1, x2, y2 = rect
+        r = self.resolution
+        nx, ny = self.shape
+        return (min(max(math.floor(x1 / r + EPSILON), 0), nx),
+                min(max(math.ceil(x2 / r - EPSILON), 0), nx),
+                min(max(math.floor(y1 / r + EPSILON), 0), ny),
+                min(max(math.ceil(y2 / r - EPSILON), 0), ny))
+
+    @property
+    def summed_area(self) -> np.ndarray:
+        """前缀和表，形状 (nx+1, ny+1)，S[i, j] 为单元格 [0,i)×[0,j) 的计数和"""
+        if self._sat is None:
+            self._sat = _summed_area(self._counts)
+        return self._sat
+
+    def count(self, x: float, y: float, length: float, width: float, exclude: Sequence = ()) -> int:
+        """矩形覆盖的单元格中、除exclude外的箱子计数和"""
+        i0, i1, j0, j1 = self.cell_range((x, y, x + length, y + width))
+        if i0 >= i1 or j0 >= j1:
+            return 0
+        sat = self._sat
+        if sat is not None:
+            total = int(sat[i1, j1] - sat[i0, j1] - sat[i1, j0] + sat[i0, j0])
+        else:
+            # 前缀和失效时直接对区域求和，避免每次修改后都重建整张表
+            total = int(self._counts[i0:i1, j0:j1].sum())
+        for key in exclude:
+            cells = self._cells.get(key)
+            if cells is not None:
+                total -= _overlap_cells(cells, (i0, i1, j0, j1))
+        return total
+
+    def is_free(self, x: float, y: float, length: float, width: float, exclude: Sequence = ()) -> bool:
+        """矩形是否一定不与（除exclude外的）任何箱子重叠（不检查集装箱边界）"""
+        return self.count(x, y, length, width, exclude) == 0
+
+    def feasible_origins(self, length: float, width: float, exclude: Sequence = ()) -> np.ndarray:
+        """尺寸为 length×width 的箱子在所有栅格点原点上的可行性
+
+        返回布尔数组，形状 (X方向原点数, Y方向原点数)，[i, j] 表示原点
+        (i*resolution, j*resolution)：箱子在集装箱内且一定不与其他箱子重叠。
+        集装箱放不下该尺寸时返回空数组。
+        """
+        r = self.resolution
+        count_x = math.floor((self.length - length) / r + EPSILON) + 1
+        count_y = math.floor((self.width - width) / r + EPSILON) + 1
+        if count_x <= 0 or count_y <= 0:
+            return np.zeros((max(count_x, 0), max(count_y, 0)), dtype=bool)
+
+        if any(key in self._cells for key in exclude):
+            counts = self._counts.copy()
+            for key in exclude:
+                cells = self._cells.get(key)
+                if cells is not None:
+                    i0, i1, j0, j1 = cells
+                    counts[i0:i1, j0:j1] -= 1
+            sat = _summed_area(counts)
+        else:
+            sat = self.summed_area
+
+        return window_sums(sat, self.cells_for(length), self.cells_for(width),
+                           count_x, count_y) == 0
+
+    def cells_for(self, size: float) -> int:
+        """长度为size的边从栅格线开始时覆盖的单元格数"""
+        return max(1, math.ceil(size / self.resolution - EPSILON))
+
+    def origin(self, i: int, j: int) -> Tuple[float, float]:
+        """原点下标对应的坐标"""
+        return (i * self.resolution, j * self.resolution)
+
+def window_sums(sat: np.ndarray, cells_x: int, cells_y: int, count_x: int, count_y: int) -> np.ndarray:
+    """以前缀和表一次求出所有 cells_x×cells_y 窗口的和，形状 (count_x, count_y)"""
+    return (sat[cells_x:cells_x + count_x, cells_y:cells_y + count_y]
+            - sat[:count_x, cells_y:cells_y + count_y]
+            - sat[cells_x:cells_x + count_x, :count_y]
+            + sat[:count_x, :count_y])
+
+def _summed_area(counts: np.ndarray) -> np.ndarray:
+    sat = np.zeros((counts.shape[0] + 1, counts.shape[1] + 1), dtype=np.int64)
+    np.cumsum(counts, axis=0, out=sat[1:, 1:])
+    np.cumsum(sat[1:, 1:], axis=1, out=sat[1:, 1:])
+    return sat
+
+def _overlap_cells(a: CellRange, b: CellRange) -> int:
+    width_x = min(a[1], b[1]) - max(a[0], b[0])
+    width_y = min(a[3], b[3]) - max(a[2], b[2])
+    return width_x * width_y if width_x > 0 and width_y > 0 else 0
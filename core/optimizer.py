@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Tuple
+
+from .box import Box
+from .container import Container
+
+# 单个箱子的状态：(是否装入, x, y, 是否旋转)
+BoxState = Tuple[bool, float, float, bool]
+
+@dataclass
+class OptimizeResult:
+    """布局优化结果"""
+    layout: List[Tuple[Box, float, float, bool]] = field(default_factory=list)  # (箱子, x, y, 是否旋转)
+    unplaced: List[Box] = field(default_factory=list)  # 未装入的箱子
+    utilization: float = 0.0  # 面积利用率 (0-1)
+    lr_torque: float = 0.0  # 左右净扭矩 (kg·mm)
+    fr_torque: float = 0.0  # 前后净扭矩 (kg·mm)
+    is_balanced: bool = True
+    iterations: int = 0
+    elapsed: float = 0.0  # 耗时 (秒)
+    stopped: bool = False  # 是否被提前停止
+
+class BalanceOptimizer:
+    """重量平衡布局优化器
+
+    以模拟退火在位置、旋转、交换、装入/取出上做局部搜索，目标是在左右、
+    前后扭矩不超过集装箱限制的前提下最大化面积利用率。
+
+    净扭矩对箱子质心是线性的：
+        左右净扭矩 = Σ 重量 × (质心Y - 宽度/2)
+        前后净扭矩 = Σ 重量 × (长度/2 - 质心X)
+    因此每个候选动作只需减去变动箱子的旧贡献、加上新贡献，O(1) 完成评分。
+
+    可以随时从其他线程调用 stop() 停止，run() 会返回目前为止的最佳布局。
+    """
+
+    def __init__(self, container: Container, extra_boxes: Optional[List[Box]] = None,
+                 seed: Optional[int] = None, balance_penalty: float = 2.0):
+        """
+        初始化优化器
+
+        Args:
+            container: 要优化的集装箱（优化过程中不修改，调用apply()才写回）
+            extra_boxes: 可以装入的待装载箱子
+            seed: 随机种子，相同种子和输入得到相同结果
+            balance_penalty: 扭矩超限的惩罚系数（相对于利用率）
+        """
+        self.container = container
+        self.balance_penalty = balance_penalty
+        self.rng = random.Random(seed)
+        self._stop_event = threading.Event()
+
+        in_container = set(container.boxes)
+        self.boxes: List[Box] = list(container.boxes) + [
+            box for box in (extra_boxes or []) if box not in in_container
+        ]
+        self._weights = [box.weight for box in self.boxes]
+        self._dims = [(box.length, box.width) for box in self.boxes]
+        self._can_rotate = [box.can_rotate() for box in self.boxes]
+
+        self._half_length = container.length / 2
+        self._half_width = container.width / 2
+
+        # 初始状态：集装箱中已有的合法箱子保持原位，其余视为未装入
+        self._states: List[BoxState] = []
+        self._placed = set()
+        for index, box in enumerate(self.boxes):
+            state = (False, box.x, box.y, box.rotated)
+            if box in in_container:
+                candidate = (True, box.x, box.y, box.rotated)
+                if self._fits(index, candidate, ()):
+                    state = candidate
+                    self._placed.add(index)
+            self._states.append(state)
+
+        self._area = 0.0
+        self._lr = 0.0
+        self._fr = 0.0
+        for index, state in enumerate(self._states):
+            area, lr, fr = self._contribution(index, state)
+            self._area += area
+            self._lr += lr
+            self._fr += fr
+
+    def stop(self) -> None:
+        """请求停止优化（线程安全）"""
+        self._stop_event.set()
+
+    @property
+    def stopped(self) -> bool:
+        """是否已请求停止"""
+        return self._stop_event.is_set()
+
+    def _size(self, index: int, rotated: bool) -> Tuple[float, float]:
+        """获取箱子在给定旋转状态下的 (长, 宽)"""
+        length, width = self._dims[index]
+        return (width, length) if rotated else (length, width)
+
+    def _contribution(self, index: int, state: BoxState) -> Tuple[float, float, float]:
+        """箱子对 (面积, 左右净扭矩, 前后净扭矩) 的贡献"""
+        placed, x, y, rotated = state
+        if not placed:
+            return 0.0, 0.0, 0.0
+        length, width = self._size(index, rotated)
+        weight = self._weights[index]
+        return (length * width,
+                weight * (y + width / 2 - self._half_width),
+                weight * (self._half_length - (x + length / 2)))
+
+    def _fits(self, index: int, state: BoxState, ignore) -> bool:
+        """检查箱子在给定状态下是否越界或与已装入的箱子重叠"""
+        _, x, y, rotated = state
+        length, width = self._size(index, rotated)
+        if x < 0 or y < 0 or x + length > self.container.length or y + width > self.container.width:
+            return False
+        x2, y2 = x + length, y + width
+        states = self._states
+        for other in self._placed:
+            if other == index or other in ignore:
+                continue
+            _, ox, oy, orot = states[other]
+            olength, owidth = self._size(other, orot)
+            if not (x2 <= ox or x >= ox + olength or y2 <= oy or y >= oy + owidth):
+                return False
+        return True
+
+    def _score(self, area: float, lr: float, fr: float) -> float:
+        """评分：利用率减去扭矩超限惩罚"""
+        utilization = area / self.container.area
+        excess = (max(0.0, abs(lr) - self.container.LR_TORQUE_LIMIT) / self.container.LR_TORQUE_LIMIT +
+                  max(0.0, abs(fr) - self.container.FR_TORQUE_LIMIT) / self.container.FR_TORQUE_LIMIT)
+        return utilization - self.balance_penalty * excess
+
+    def _is_balanced(self, lr: float, fr: float) -> bool:
+        return (abs(lr) <= self.container.LR_TORQUE_LIMIT and
+                abs(fr) <= self.container.FR_TORQUE_LIMIT)
+
+    def _candidate_position(self, index: int, rotated: bool) -> Optional[Tuple[float, float]]:
+        """随机生成一个紧贴某个已装入箱子或集装箱壁的候选位置"""
+        length, width = self._size(index, rotated)
+        max_x = self.container.length - length
+        max_y = self.container.width - width
+        if max_x < 0 or max_y < 0:
+            return None
+
+        rng = self.rng
+        others = [other for other in self._placed if other != index]
+        if not others or rng.random() < 0.15:
+            # 贴集装箱壁
+            x = rng.choice((0.0, max_x, round(rng.uniform(0, max_x))))
+            y = rng.choice((0.0, max_y, round(rng.uniform(0, max_y))))
+            return (float(x), float(y))
+
+        # 贴某个箱子的一条边，并与该边的一端对齐
+        other = rng.choice(others)
+        _, ox, oy, orot = self._states[other]
+        olength, owidth = self._size(other, orot)
+        side = rng.randrange(4)
+        if side == 0:
+            x, y = ox + olength, rng.choice((oy, oy + owidth - width))
+        elif side == 1:
+            x, y = ox - length, rng.choice((oy, oy + owidth - width))
+        elif side == 2:
+            x, y = rng.choice((ox, ox + olength - length)), oy + owidth
+        else:
+            x, y = rng.choice((ox, ox + olength - length)), oy - width
+        return (min(max(x, 0.0), max_x), min(max(y, 0.0), max_y))
+
+    def _propose(self, step_mm: float) -> List[Tuple[int, BoxState]]:
+        """随机生成一个候选动作，返回 [(箱子序号, 新状态)]，不可行时返回空列表"""
+        rng = self.rng
+        count = len(self.boxes)
+        index = rng.randrange(count)
+        placed, x, y, rotated = self._states[index]
+        move = rng.random()
+
+        if not placed:
+            # 装入一个未装入的箱子
+            new_rotated = rotated if not self._can_rotate[index] else rng.random() < 0.5
+            position = self._candidate_position(index, new_rotated)
+            if position is None:
+                return []
+            return [(index, (True, position[0], position[1], new_rotated))]
+
+        if move < 0.35:
+            # 小范围平移
+            new_x = round(x + rng.gauss(0, step_mm))
+            new_y = round(y + rng.gauss(0, step_mm))
+            return [(index, (True, float(new_x), float(new_y), rotated))]
+        if move < 0.6:
+            # 跳到贴边位置（可能同时旋转）
+            new_rotated = rotated
+            if self._can_rotate[index] and rng.random() < 0.3:
+                new_rotated = not rotated
+            position = self._candidate_position(index, new_rotated)
+            if position is None:
+                return []
+            return [(index, (True, position[0], position[1], new_rotated))]
+        if move < 0.7:
+            # 原地旋转
+            if not self._can_rotate[index]:
+                return []
+            return [(index, (True, x, y, not rotated))]
+        if move < 0.95:
+            # 与另一个已装入的箱子交换位置
+            if len(self._placed) < 2:
+                return []
+            other = rng.choice(tuple(self._placed))
+            if other == index:
+                return []
+            _, ox, oy, orot = self._states[other]
+            return [(index, (True, ox, oy, rotated)), (other, (True, x, y, orot))]
+        # 取出箱子
+        return [(index, (False, x, y, rotated))]
+
+    def _is_feasible(self, changes: List[Tuple[int, BoxState]]) -> bool:
+        """检查动作执行后的布局是否合法"""
+        changed = {index for index, _ in changes}
+        placed_changes = [(index, state) for index, state in changes if state[0]]
+        for index, state in placed_changes:
+            if not self._fits(index, state, changed):
+                return False
+        # 变动箱子之间两两检查
+        for a in range(len(placed_changes)):
+            index_a, (_, ax, ay, arot) = placed_changes[a]
+            alength, awidth = self._size(index_a, arot)
+            for b in range(a + 1, len(placed_changes)):
+                index_b, (_, bx, by, brot) = placed_changes[b]
+                blength, bwidth = self._size(index_b, brot)
+                if not (ax + alength <= bx or ax >= bx + blength or
+                        ay + awidth <= by or ay >= by + bwidth):
+                    return False
+        return True
+
+    def _snapshot(self) -> List[BoxState]:
+        return list(self._states)
+
+    def run(self, time_budget: float = 5.0, max_iterations: Optional[int] = None,
+            progress_callback: Optional[Callable[[int, float, float, bool], None]] = None) -> OptimizeResult:
+        """
+        运行优化
+
+        Args:
+            time_budget: 时间预算 (秒)
+            max_iterations: 最大迭代次数，为None时只受时间预算限制
+            progress_callback: 进度回调 (迭代次数, 已用时间, 最佳利用率, 最佳是否平衡)，约每100ms调用一次
+
+        Returns:
+            OptimizeResult: 找到的最佳布局（尚未写回集装箱）
+        """
+        self._stop_event.clear()
+        start_time = time.perf_counter()
+        last_report = start_time
+
+        current_score = self._score(self._area, self._lr, self._fr)
+        best_key = (self._is_balanced(self._lr, self._fr), current_score)
+        best_states = self._snapshot()
+        best_totals = (self._area, self._lr, self._fr)
+
+        # 温度（评分单位）和平移步长 (mm) 随时间几何衰减
+        start_temperature, end_temperature = 0.02, 0.0002
+        start_step, end_step = 500.0, 5.0
+
+        iteration = 0
+        elapsed = 0.0
+        progress = 0.0
+        while self.boxes:
+            if self._stop_event.is_set():
+                break
+            if max_iterations is not None and iteration >= max_iterations:
+                break
+            if iteration % 64 == 0:
+                now = time.perf_counter()
+                elapsed = now - start_time
+                if elapsed >= time_budget:
+                    break
+                progress = elapsed / time_budget if time_budget > 0 else 1.0
+                if progress_callback and now - last_report >= 0.1:
+                    last_report = now
+                    progress_callback(iteration, elapsed, best_totals[0] / self.container.area, best_key[0])
+            iteration += 1
+
+            temperature = start_temperature * (end_temperature / start_temperature) ** progress
+            step = start_step * (end_step / start_step) ** progress
+
+            changes = self._propose(step)
+            if not changes or not self._is_feasible(changes):
+                continue
+
+            # O(1) 增量评分
+            area, lr, fr = self._area, self._lr, self._fr
+            for index, state in changes:
+                old_area, old_lr, old_fr = self._contribution(index, self._states[index])
+                new_area, new_lr, new_fr = self._contribution(index, state)
+                area += new_area - old_area
+                lr += new_lr - old_lr
+                fr += new_fr - old_fr
+            score = self._score(area, lr, fr)
+
+            delta = score - current_score
+            if delta < 0 and self.rng.random() >= math.exp(delta / temperature):
+                continue
+
+            for index, state in changes:
+                self._states[index] = state
+                if state[0]:
+                    self._placed.add(index)
+                else:
+                    self._placed.discard(index)
+            self._area, self._lr, self._fr = area, lr, fr
+            current_score = score
+
+            key = (self._is_balanced(lr, fr), score)
+            if key > best_key:
+                best_key = key
+                best_states = self._snapshot()
+                best_totals = (area, lr, fr)
+
+        elapsed = time.perf_counter() - start_time
+        return self._build_result(best_states, best_totals, iteration, elapsed)
+
+    def _build_result(self, states: List[BoxState], totals, iterations: int, elapsed: float) -> OptimizeResult:
+        area, lr, fr = totals
+        result = OptimizeResult(
+            utilization=area / self.container.area,
+            lr_torque=abs(lr),
+            fr_torque=abs(fr),
+            is_balanced=self._is_balanced(lr, fr),
+            iterations=iterations,
+            elapsed=elapsed,
+            stopped=self._stop_event.is_set(),
+        )
+        for box, (placed, x, y, rotated) in zip(self.boxes, states):
+            if placed:
+                result.layout.append((box, x, y, rotated))
+            else:
+                result.unplaced.append(box)
+        return result
+
+    def apply(self, result: OptimizeResult) -> List[Box]:
+        """
+        将优化结果写回集装箱
+
+        Returns:
+            List[Box]: 不在集装箱中的箱子（包括被取出的原有箱子）
+        """
+        self.container.clear()
+        leftover = list(result.unplaced)
+        for box, x, y, rotated in result.layout:
+            if box.rotated != rotated:
+                box.rotate()
+            box.move_to(x, y)
+            if not self.container.add_box(box):
+                leftover.append(box)
+        return leftover
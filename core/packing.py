@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .box import Box
+from .container import Container
+from .probe import find_best_orientation
+
+# 装箱策略
+FIRST_FIT = "first_fit"
+BEST_FIT = "best_fit"
+
+@dataclass
+class PackResult:
+    """批量装箱结果"""
+    placed: List[Tuple[Box, Container]] = field(default_factory=list)  # (箱子, 所在集装箱)
+    leftover: List[Box] = field(default_factory=list)  # 未能装入的箱子
+    opened_containers: List[Container] = field(default_factory=list)  # 新开的集装箱
+    used_containers: List[Container] = field(default_factory=list)  # 参与装箱的集装箱
+    elapsed: float = 0.0  # 耗时 (秒)
+
+    @property
+    def placed_count(self) -> int:
+        """装入的箱子数量"""
+        return len(self.placed)
+
+    @property
+    def container_utilization(self) -> Dict[str, float]:
+        """各集装箱面积利用率 (0-1)"""
+        return {container.name: container.area_utilization for container in self.used_containers}
+
+    @property
+    def overall_utilization(self) -> float:
+        """所有参与集装箱的总体面积利用率 (0-1)"""
+        total_area = sum(container.area for container in self.used_containers)
+        used_area = sum(container.used_area for container in self.used_containers)
+        return used_area / total_area if total_area > 0 else 0
+
+    def summary(self) -> str:
+        """生成结果摘要文本"""
+        lines = [
+            f"装入箱子: {self.placed_count} 个",
+            f"剩余箱子: {len(self.leftover)} 个",
+            f"新开集装箱: {len(self.opened_containers)} 个",
+            f"耗时: {self.elapsed * 1000:.1f} ms",
+            f"总体利用率: {self.overall_utilization * 100:.1f}%",
+        ]
+        for name, utilization in self.container_utilization.items():
+            lines.append(f"  {name}: {utilization * 100:.1f}%")
+        return "\n".join(lines)
+
+def sort_boxes_for_packing(boxes: List[Box]) -> List[Box]:
+    """按面积、长边、重量递减排序（Decreasing策略）"""
+    return sorted(boxes, key=lambda b: (b.area, max(b.length, b.width), b.weight), reverse=True)
+
+def fits_empty_container(box: Box, length: float, width: float) -> bool:
+    """检查箱子在给定尺寸的空集装箱中是否能以任一方向放下"""
+    return ((box.length <= length and box.width <= width) or
+            (box.can_rotate() and box.width <= length and box.length <= width))
+
+def pack_boxes(boxes: List[Box], containers: List[Container],
+               container_factory: Optional[Callable[[], Container]] = None,
+               strategy: str = FIRST_FIT, presorted: bool = False) -> PackResult:
+    """
+    一次性将箱子装入集装箱
+
+    Args:
+        boxes: 待装载箱子
+        containers: 已打开的集装箱，按顺序尝试
+        container_factory: 需要时创建新集装箱的回调，为None时不开新集装箱
+        strategy: first_fit（首个能放下的集装箱）或 best_fit（利用率最高且能放下的集装箱）
+        presorted: 为True时按传入顺序装箱，否则按面积递减排序
+
+    Returns:
+        PackResult: 装箱结果，箱子已写入对应集装箱
+    """
+    if strategy not in (FIRST_FIT, BEST_FIT):
+        raise ValueError(f"未知的装箱策略: {strategy}")
+
+    start_time = time.perf_counter()
+    result = PackResult()
+    open_containers = list(containers)
+    used = set()
+
+    ordered = list(boxes) if presorted else sort_boxes_for_packing(boxes)
+    for box in ordered:
+        target = None
+        placement = None
+
+        if strategy == FIRST_FIT:
+            candidates = open_containers
+        else:
+            candidates = sorted(open_containers, key=lambda c: c.used_area, reverse=True)
+
+        for container in candidates:
+            placement = find_best_orientation(container, box)
+            if placement is not None:
+                target = container
+                break
+
+        if target is None and container_factory is not None:
+            # 只有空集装箱能放下时才开新集装箱，避免为超大箱子无限开箱
+            reference = open_containers[-1] if open_containers else None
+            length = reference.length if reference else Container.DEFAULT_LENGTH
+            width = reference.width if reference else Container.DEFAULT_WIDTH
+            if fits_empty_container(box, length, width):
+                target = container_factory()
+                open_containers.append(target)
+                result.opened_containers.append(target)
+                placement = find_best_orientation(target, box)
+
+        if target is None or placement is None:
+            result.leftover.append(box)
+            continue
+
+        x, y, rotated = placement
+        if box.rotated != rotated:
+            box.rotate()
+        box.move_to(x, y)
+        if target.add_box(box):
+            result.placed.append((box, target))
+            if id(target) not in used:
+                used.add(id(target))
+                result.used_containers.append(target)
+        else:
+            result.leftover.append(box)
+
+    result.elapsed = time.perf_counter() - start_time
+    return result
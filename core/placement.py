@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import math
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .box import Box
+from .extreme_points import ExtremePointSet
+from .free_space import EPSILON, Rect
+from .occupancy import OccupancyGrid
+from .probe import box_dims
+
+class PlacementEngine:
+    """放置引擎基类
+
+    引擎由集装箱持有，集装箱在添加、移除、清空箱子时通知引擎，
+    引擎据此维护自己的内部状态并回答"这个箱子放在哪里最好"。
+    """
+
+    name = "base"
+
+    def __init__(self, container):
+        self.container = container
+
+    def reset(self) -> None:
+        """集装箱被清空"""
+        pass
+
+    def box_added(self, box: Box) -> None:
+        """集装箱中添加了箱子"""
+        pass
+
+    def box_removed(self, box: Box) -> None:
+        """集装箱中移除了箱子"""
+        pass
+
+    def box_updated(self, box: Box) -> None:
+        """集装箱中的箱子移动或旋转了"""
+        pass
+
+    def find_position(self, box: Box, rotated: Optional[bool] = None) -> Optional[Tuple[float, float]]:
+        """为箱子寻找放置位置（rotated为None时按当前旋转状态），找不到返回None"""
+        raise NotImplementedError
+
+class GridPlacementEngine(PlacementEngine):
+    """网格扫描放置引擎（左下角优先，保留作为备用）
+
+    候选原点为步长 step 的网格点（可细到1mm）。不逐点调用碰撞检查：按行分块，
+    每块的候选行与所有已放置箱子的边界一次广播求出每行被箱子占住的x区间，
+    用差分数组累加得到整块候选点的可行性，取第一个（先y后x）可行点。
+    分块大小由 CHUNK_CELLS 限制，内存占用与集装箱大小和步长无关。
+    """
+
+    name = "grid"
+
+    # 每块最多处理的 候选行×候选列 数
+    CHUNK_CELLS = 1 << 21
+
+    def __init__(self, container, step: float = 50):
+        super().__init__(container)
+        if step <= 0:
+            raise ValueError(f"网格步长必须为正数: {step}")
+        self.step = step
+
+    def find_position(self, box: Box, rotated: Optional[bool] = None) -> Optional[Tuple[float, float]]:
+        length, width = box_dims(box, rotated)
+        container = self.container
+        step = float(self.step)
+
+        max_x = container.length - length
+        max_y = container.width - width
+        if max_x < 0 or max_y < 0:
+            return None
+        count_x = math.floor(max_x / step) + 1
+        ys = np.arange(math.floor(max_y / step) + 1) * step
+
+        # 已放置箱子的边界（不含箱子自身）
+        bounds = container.box_array.bounds()
+        row = container.box_array.row_of(box)
+        if row is not None:
+            bounds = np.delete(bounds, row, axis=0)
+        # 箱子占住的候选x下标区间 [lo, hi)：x < ox2 且 x + length > ox1
+        lo = np.clip(np.floor((bounds[:, 0] - length) / step) + 1, 0, count_x).astype(np.intp)
+        hi = np.clip(np.ceil(bounds[:, 2] / step), 0, count_x).astype(np.intp)
+
+        rows_per_chunk = max(1, self.CHUNK_CELLS // max(count_x, len(bounds), 1))
+        for start in range(0, len(ys), rows_per_chunk):
+            chunk = ys[start:start + rows_per_chunk]
+            free = self._free_cells(chunk, width, bounds, lo, hi, count_x)
+            for cell in np.flatnonzero(free):
+                y = float(chunk[cell // count_x])
+                x = float(cell % count_x) * step
+                # 浮点边界情况以精确检查为准
+                if container.is_region_free(x, y, length, width, exclude=(box,)):
+                    return (x, y)
+        return None
+
+    @staticmethod
+    def _free_cells(ys: np.ndarray, width: float, bounds: np.ndarray,
+                    lo: np.ndarray, hi: np.ndarray, count_x: int) -> np.ndarray:
+        """候选行ys上所有网格点是否不与任何箱子重叠，形状 (len(ys), count_x)"""
+        # 候选行 × 箱子：y方向相交且x区间非空的组合
+        blocking = ((ys[:, None] < bounds[None, :, 3]) &
+                    (ys[:, None] + width > bounds[None, :, 1]) &
+                    (lo < hi)[None, :])
+        rows, boxes = np.nonzero(blocking)
+        diff = np.zeros((len(ys), count_x + 1), dtype=np.int32)
+        np.add.at(diff, (rows, lo[boxes]), 1)
+        np.add.at(diff, (rows, hi[boxes]), -1)
+        return np.cumsum(diff[:, :-1], axis=1) == 0
+
+class MaxRectsPlacementEngine(PlacementEngine):
+    """MaxRects放置引擎
+
+    基于集装箱维护的极大空闲矩形（FreeSpaceMap）。空闲矩形按 (y, x) 排序，
+    查询时按左下角优先顺序扫描，第一个能容纳箱子的空闲矩形的左下角即为
+    最优位置，且该位置紧贴已有箱子或集装箱壁。
+    """
+
+    name = "maxrects"
+
+    HEURISTIC_BOTTOM_LEFT = "bottom_left"
+    HEURISTIC_BEST_SHORT_SIDE = "best_short_side"
+
+    def __init__(self, container, heuristic: str = HEURISTIC_BOTTOM_LEFT):
+        super().__init__(container)
+        self.heuristic = heuristic
+
+    def free_rects(self) -> List[Rect]:
+        """获取当前所有极大空闲矩形 (x1, y1, x2, y2)"""
+        return self.container.free_space.rects
+
+    def find_position(self, box: Box, rotated: Optional[bool] = None) -> Optional[Tuple[float, float]]:
+        length, width = box_dims(box, rotated)
+
+        free_space = self.container.free_space
+        if box in free_space:
+            # 为集装箱内已有的箱子找新位置：不把它自身当作障碍
+            free_space = free_space.copy()
+            free_space.remove(box)
+
+        if self.heuristic == self.HEURISTIC_BEST_SHORT_SIDE:
+            return self._best_short_side(free_space.rects, length, width)
+        return free_space.bottom_left_position(length, width)
+
+    def _best_short_side(self, free: List[Rect], length: float, width: float) -> Optional[Tuple[float, float]]:
+        """最短边剩余最小优先"""
+        best = None
+        best_score = None
+        for x1, y1, x2, y2 in free:
+            leftover_x = x2 - x1 - length
+            leftover_y = y2 - y1 - width
+            if leftover_x < -EPSILON or leftover_y < -EPSILON:
+                continue
+            score = (min(leftover_x, leftover_y), max(leftover_x, leftover_y), y1, x1)
+            if best_score is None or score < best_score:
+                best_score = score
+                best = (x1, y1)
+        return best
+
+class RasterPlacementEngine(PlacementEngine):
+    """占用栅格放置引擎
+
+    用集装箱的占用栅格（core.occupancy）一次向量化求出箱子在所有栅格点上的
+    可行原点，取左下角优先（先y后x）的第一个。位置都落在栅格点上，适合尺寸为
+    栅格整数倍的密集布局；栅格判定是保守的，紧贴非整格边缘的位置会被跳过。
+    """
+
+    name = "raster"
+
+    def __init__(self, container, resolution: float = OccupancyGrid.DEFAULT_RESOLUTION):
+        super().__init__(container)
+        self.resolution = resolution
+        container.enable_occupancy(resolution)
+
+    def find_position(self, box: Box, rotated: Optional[bool] = None) -> Optional[Tuple[float, float]]:
+        length, width = box_dims(box, rotated)
+        occupancy = self.container.occupancy
+        feasible = occupancy.feasible_origins(length, width, exclude=(box,))
+        rows = np.flatnonzero(feasible.any(axis=0))
+        if not len(rows):
+            return None
+        j = rows[0]
+        i = int(np.argmax(feasible[:, j]))
+        return occupancy.origin(i, int(j))
+
+class ExtremePointPlacementEngine(PlacementEngine):
+    """极点放置引擎
+
+    维护已放置箱子形成的极点集合（core.extreme_points），查询时只评估
+    几十到几百个紧贴箱子或集装箱壁的候选点，取左下角优先的第一个可行点。
+    """
+
+    name = "extreme_point"
+
+    def __init__(self, container):
+        super().__init__(container)
+        self.points = ExtremePointSet(container.length, container.width)
+        self.points.sync((box, box.get_bounds()) for box in container.boxes)
+
+    def reset(self) -> None:
+        self.points.clear()
+
+    def box_added(self, box: Box) -> None:
+        self.points.insert(box, box.get_bounds())
+
+    def box_removed(self, box: Box) -> None:
+        self.points.remove(box)
+
+    def box_updated(self, box: Box) -> None:
+        self.points.update(box, box.get_bounds())
+
+    def find_position(self, box: Box, rotated: Optional[bool] = None) -> Optional[Tuple[float, float]]:
+        length, width = box_dims(box, rotated)
+        for x, y in self.points.positions(length, width, exclude=(box,)):
+            x, y = float(x), float(y)
+            if self.container.is_region_free(x, y, length, width, exclude=(box,)):
+                return (x, y)
+        return None
+
+# 可选的放置引擎
+PLACEMENT_ENGINES = {
+    MaxRectsPlacementEngine.name: MaxRectsPlacementEngine,
+    GridPlacementEngine.name: GridPlacementEngine,
+    RasterPlacementEngine.name: RasterPlacementEngine,
+    ExtremePointPlacementEngine.name: ExtremePointPlacementEngine,
+}
+
+def create_placement_engine(name: str, container, **kwargs) -> PlacementEngine:
+    """按名称创建放置引擎"""
+    if name not in PLACEMENT_ENGINES:
+        raise ValueError(f"未知的放置策略: {name}")
+    return PLACEMENT_ENGINES[name](container, **kwargs)
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from typing import Optional, Sequence, Tuple
+
+from .box import Box
+
+# 放置探测函数只读取集装箱的空间索引和空闲空间，不修改箱子的坐标或旋转状态，
+# 结果可以按 Container.layout_version 缓存，也可以在工作线程中调用
+
+# 箱子尺寸 (X方向长度, Y方向宽度)
+Dims = Tuple[float, float]
+
+def box_dims(box: Box, rotated: Optional[bool] = None) -> Dims:
+    """箱子在指定旋转状态下的尺寸，rotated为None时按当前状态"""
+    if rotated is None:
+        rotated = box.rotated
+    return (box.width, box.length) if rotated else (box.length, box.width)
+
+def fits(container, dims: Dims, x: float, y: float, exclude: Sequence = ()) -> bool:
+    """尺寸为dims的箱子放在 (x, y) 时是否在集装箱内且不与其他箱子重叠"""
+    return container.is_region_free(x, y, dims[0], dims[1], exclude=exclude)
+
+def box_fits_at(container, box: Box, x: float, y: float, rotated: Optional[bool] = None,
+                exclude: Sequence = ()) -> bool:
+    """箱子以指定旋转状态放在 (x, y) 是否有效（箱子自身不算障碍）"""
+    return fits(container, box_dims(box, rotated), x, y, exclude=(box,) + tuple(exclude))
+
+def can_rotate_in_place(container, box: Box) -> bool:
+    """箱子在当前位置旋转90度后是否有效"""
+    return box.can_rotate() and box_fits_at(container, box, box.x, box.y, not box.rotated)
+
+def find_position(container, box: Box, rotated: Optional[bool] = None) -> Optional[Tuple[float, float]]:
+    """由集装箱的放置引擎为箱子（指定旋转状态）寻找位置"""
+    return container.placement_engine.find_position(box, rotated)
+
+def find_best_orientation(container, box: Box) -> Optional[Tuple[float, float, bool]]:
+    """在两个方向上寻找放置位置，返回 (x, y, rotated)，优先左下角更靠前的位置"""
+    best = None
+    position = find_position(container, box, box.rotated)
+    if position is not None:
+        best = (position[0], position[1], box.rotated)
+
+    if box.can_rotate():
+        position = find_position(container, box, not box.rotated)
+        if position is not None:
+            x, y = position
+            if best is None or (y, x) < (best[1], best[0]):
+                best = (x, y, not box.rotated)
+
+    return best
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+from .box import Box
+
+class BoxRegistry:
+    """项目范围的箱子登记表：箱子ID → 箱子及其当前位置
+
+    位置为所在的集装箱，或 None 表示在待装载列表中。查找、转移和注销都是O(1)，
+    待装载列表按加入顺序保存在字典中，移除任意箱子不需要扫描列表。
+
+    watch() 之后通过 Container.add_listener 跟踪集装箱的增删：箱子放入集装箱时
+    自动离开待装载列表，从集装箱移出（放回列表、清空、撤销放置等）时自动回到
+    待装载列表。只有 discard() 会把箱子从项目中彻底删除。
+    """
+
+    def __init__(self):
+        self._boxes: Dict[str, Box] = {}
+        self._locations: Dict[str, object] = {}  # 箱子ID → 集装箱，待装载为None
+        self._pending: Dict[str, Box] = {}  # 待装载的箱子，保持加入顺序
+        self._containers: List[object] = []
+
+    def __len__(self) -> int:
+        return len(self._boxes)
+
+    def __iter__(self) -> Iterator[Box]:
+        return iter(list(self._boxes.values()))
+
+    def __contains__(self, box: Union[Box, str]) -> bool:
+        return _box_id(box) in self._boxes
+
+    # ---- 查询 ----
+
+    def get(self, box_id: str) -> Optional[Box]:
+        """按ID查找箱子，未登记返回None"""
+        return self._boxes.get(box_id)
+
+    def location(self, box: Union[Box, str]):
+        """箱子所在的集装箱；在待装载列表中或未登记时返回None"""
+        return self._locations.get(_box_id(box))
+
+    def is_pending(self, box: Union[Box, str]) -> bool:
+        """箱子是否在待装载列表中"""
+        return _box_id(box) in self._pending
+
+    @property
+    def pending(self) -> List[Box]:
+        """待装载的箱子（按加入顺序）"""
+        return list(self._pending.values())
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    # ---- 登记与转移 ----
+
+    def add_pending(self, box: Box) -> None:
+        """登记箱子并放入待装载列表（已登记的箱子从原位置转移过来）"""
+        self._boxes[box.id] = box
+        self._locations[box.id] = None
+        self._pending[box.id] = box
+
+    def place(self, box: Box, container) -> None:
+        """记录箱子位于集装箱中（未登记的箱子同时登记）"""
+        self._boxes[box.id] = box
+        self._locations[box.id] = container
+        self._pending.pop(box.id, None)
+
+    def discard(self, box: Union[Box, str]) -> Optional[Box]:
+        """从项目中注销箱子，返回被注销的箱子"""
+        box_id = _box_id(box)
+        self._locations.pop(box_id, None)
+        self._pending.pop(box_id, None)
+        return self._boxes.pop(box_id, None)
+
+    def set_pending(self, boxes: Iterable[Box]) -> None:
+        """以新的箱子替换整个待装载列表（原待装载的箱子被注销，如重新导入清单）"""
+        for box_id in self._pending:
+            del self._boxes[box_id]
+            del self._locations[box_id]
+        self._pending = {}
+        for box in boxes:
+            self.add_pending(box)
+
+    # ---- 跟踪集装箱 ----
+
+    def watch(self, container) -> None:
+        """登记集装箱中的箱子并跟踪其后续增删"""
+        if any(existing is container for existing in self._containers):
+            return
+        self._containers.append(container)
+        for box in container.boxes:
+            self.place(box, container)
+        container.add_listener(self._on_change)
+
+    def unwatch(self, container) -> None:
+        """停止跟踪集装箱（如集装箱被关闭），其中的箱子回到待装载列表"""
+        container.remove_listener(self._on_change)
+        self._containers = [existing for existing in self._containers if existing is not container]
+        for box in container.boxes:
+            if self._locations.get(box.id) is container:
+                self.add_pending(box)
+
+    def clear(self) -> None:
+        """注销所有箱子并停止跟踪所有集装箱"""
+        for container in self._containers:
+            container.remove_listener(self._on_change)
+        self._containers = []
+        self._boxes.clear()
+        self._locations.clear()
+        self._pending.clear()
+
+    def _on_change(self, container, changes) -> None:
+        for box, before, after in changes:
+            if after is not None:
+                self.place(box, container)
+            elif self._locations.get(box.id) is container:
+                # 移出后若已放入别的集装箱（转移），以后者为准
+                self.add_pending(box)
+
+def _box_id(box: Union[Box, str]) -> str:
+    return box if isinstance(box, str) else box.id
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .box import Box
+from .free_space import EPSILON
+
+# 一种箱子尺寸在行内的摆法：(Y方向占用的单元数, 面积, X方向深度, Y方向宽度, 是否旋转)
+Option = Tuple[int, float, float, float, bool]
+# 一行的装载方案：每个元素为 (尺寸类型序号, 摆法)
+Pattern = Tuple[Tuple[int, Option], ...]
+
+@dataclass(frozen=True)
+class Row:
+    """横跨集装箱宽度的一行"""
+    x: float  # 行的起始X
+    depth: float  # 行在X方向的深度（行内最深箱子）
+    placements: Tuple[Tuple[Box, float, bool], ...]  # (箱子, y, 是否旋转)
+
+    def fill_ratio(self, width: float) -> float:
+        """行内箱子面积占 深度×宽度 的比例"""
+        area = sum(box.area for box, _, _ in self.placements)
+        return area / (self.depth * width) if self.depth > 0 and width > 0 else 0
+
+@dataclass
+class RowPackResult:
+    """按行装载结果"""
+    rows: List[Row] = field(default_factory=list)
+    leftover: List[Box] = field(default_factory=list)  # 未能装入的箱子
+    length: float = 0.0
+    width: float = 0.0
+    start_x: float = 0.0
+    dp_solves: int = 0  # 实际求解的背包问题数
+    reused_solutions: int = 0  # 直接复用已求解方案的次数
+    elapsed: float = 0.0  # 耗时 (秒)
+
+    @property
+    def placements(self) -> List[Tuple[Box, float, float, bool]]:
+        """所有箱子的 (箱子, x, y, 是否旋转)"""
+        return [(box, row.x, y, rotated) for row in self.rows for box, y, rotated in row.placements]
+
+    @property
+    def placed_count(self) -> int:
+        return sum(len(row.placements) for row in self.rows)
+
+    @property
+    def used_length(self) -> float:
+        """所有行占用的总长度"""
+        return sum(row.depth for row in self.rows)
+
+    def summary(self) -> str:
+        """生成结果摘要文本"""
+        area = sum(box.area for row in self.rows for box, _, _ in row.placements)
+        used = self.used_length * self.width
+        return "\n".join([
+            f"装入箱子: {self.placed_count} 个, 剩余: {len(self.leftover)} 个",
+            f"行数: {len(self.rows)}, 占用长度: {self.used_length:.0f}mm",
+            f"行内填充率: {area / used * 100 if used > 0 else 0:.1f}%",
+            f"求解背包: {self.dp_solves} 次, 复用方案: {self.reused_solutions} 次",
+            f"耗时: {self.elapsed * 1000:.1f} ms",
+        ])
+
+class RowPacker:
+    """按行装载（叉车沿宽度方向成排装卸）
+
+    从集装箱前端开始沿X方向逐行排布，每行横跨整个宽度（Y方向）。每行先确定
+    行深度，再用有界背包动态规划在宽度方向上选择箱子和摆放方向，使行内
+    箱子面积最大；行深度取所有候选深度中行内填充率最高者。
+
+    箱子按尺寸归类，每类在一行内最多能放的个数有限，背包只与
+    （行深度, 各类剩余个数截断到每行上限）有关。大批量装载时连续很多行的
+    这一组合相同，方案直接复用而不重新求解。
+    """
+
+    DEFAULT_RESOLUTION = 10  # 宽度方向的背包单元 (mm)
+
+    def __init__(self, resolution: float = DEFAULT_RESOLUTION):
+        self.resolution = resolution
+
+    def plan(self, boxes: List[Box], length: float, width: float,
+             start_x: float = 0.0) -> RowPackResult:
+        """计算按行布局（不修改箱子），行从 start_x 开始向后排布"""
+        started = time.perf_counter()
+        result = RowPackResult(length=length, width=width, start_x=start_x)
+        capacity = int(math.floor(width / self.resolution + EPSILON))
+
+        # 按尺寸归类，每类的箱子按重量递减取用
+        groups: Dict[Tuple[float, float], List[Box]] = {}
+        for box in sorted(boxes, key=lambda b: b.weight, reverse=True):
+            groups.setdefault((box.length, box.width), []).append(box)
+        kinds = list(groups)
+        remaining = [list(groups[kind]) for kind in kinds]
+        options = [self._options(kind, capacity, groups[kind][0].can_rotate()) for kind in kinds]
+        # 每类在一行内最多的个数（按最窄的摆法）
+        per_row = [max((capacity // option[0] for option in kind_options), default=0)
+                   for kind_options in options]
+
+        cache: Dict[tuple, Optional[Pattern]] = {}
+        x = start_x
+        while True:
+            counts = tuple(min(len(group), limit) for group, limit in zip(remaining, per_row))
+            depths = sorted({option[2] for kind, kind_options in enumerate(options) if counts[kind]
+                             for option in kind_options if option[2] <= length - x + EPSILON})
+            best = None
+            for depth in depths:
+                key = (depth, counts)
+                if key in cache:
+                    result.reused_solutions += 1
+                else:
+                    cache[key] = self._solve(options, counts, depth, capacity)
+                    result.dp_solves += 1
+                pattern = cache[key]
+                if not pattern:
+                    continue
+                area = sum(option[1] for _, option in pattern)
+                used_depth = max(option[2] for _, option in pattern)
+                score = (area / used_depth, area)
+                if best is None or score > best[0]:
+                    best = (score, pattern, used_depth)
+            if best is None:
+                break
+
+            _, pattern, depth = best
+            placements = []
+            y = 0.0
+            # 行内从Y=0开始按宽度递减依次排布
+            for kind, option in sorted(pattern, key=lambda item: -item[1][3]):
+                box = remaining[kind].pop(0)
+                placements.append((box, y, option[4]))
+                y += option[3]
+            result.rows.append(Row(x, depth, tuple(placements)))
+            x += depth
+
+        result.leftover = [box for group in remaining for box in group]
+        result.elapsed = time.perf_counter() - started
+        return result
+
+    def pack(self, container, boxes: List[Box]) -> RowPackResult:
+        """把箱子按行装入集装箱，接在已有箱子之后（最靠后的箱子末端）开始排布
+
+        写入集装箱时逐个做碰撞检查，放不下的箱子计入 leftover
+        """
+        start_x = max((box.x + box.actual_length for box in container.boxes), default=0.0)
+        result = self.plan(boxes, container.length, container.width, start_x)
+        for box, x, y, rotated in result.placements:
+            if box.rotated != rotated:
+                box.rotate()
+            box.move_to(x, y)
+            if not container.add_box(box):
+                result.leftover.append(box)
+        return result
+
+    def _options(self, kind: Tuple[float, float], capacity: int, can_rotate: bool) -> List[Option]:
+        """一种尺寸的摆法：不旋转时X深度为长、Y占用为宽，旋转后互换"""
+        length, width = kind
+        options = [(length, width, False)]
+        if can_rotate and length != width:
+            options.append((width, length, True))
+        result = []
+        for depth, extent, rotated in options:
+            units = max(1, math.ceil(extent / self.resolution - EPSILON))
+            if units <= capacity:
+                result.append((units, length * width, depth, extent, rotated))
+        return result
+
+    @staticmethod
+    def _solve(options: List[List[Option]], counts: Tuple[int, ...], depth: float,
+               capacity: int) -> Optional[Pattern]:
+        """有界背包：宽度容量内、深度不超过depth的摆法中面积最大的组合"""
+        items = []
+        for kind, count in enumerate(counts):
+            fitting = [option for option in options[kind] if option[2] <= depth + EPSILON]
+            if fitting:
+                items.extend([(kind, fitting)] * count)
+        if not items:
+            return None
+
+        # dp[c]: 占用不超过c个单元时的最大面积；choice[n, c]: 第n件物品选用的摆法（0为不选）
+        dp = np.zeros(capacity + 1)
+        choice = np.zeros((len(items), capacity + 1), dtype=np.int8)
+        for n, (_, fitting) in enumerate(items):
+            best = dp.copy()
+            for k, (units, area, _, _, _) in enumerate(fitting, 1):
+                candidate = np.full(capacity + 1, -np.inf)
+                candidate[units:] = dp[:capacity + 1 - units] + area
+                better = candidate > best
+                best[better] = candidate[better]
+                choice[n, better] = k
+            dp = best
+
+        c = int(np.argmax(dp))
+        pattern = []
+        for n in range(len(items) - 1, -1, -1):
+            k = choice[n, c]
+            if k:
+                kind, fitting = items[n]
+                option = fitting[k - 1]
+                pattern.append((kind, option))
+                c -= option[0]
+        return tuple(pattern) if pattern else None
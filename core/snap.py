@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import math
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .spatial_index import BoundingBox
+
+# 矩形表示为 (x1, y1, x2, y2)
+Rect = Tuple[float, float, float, float]
+
+# 判断候选点是否落在禁止区域内部时的容差 (mm)
+EPSILON = 1e-6
+
+def _forbidden_rects(obstacles: Iterable[Rect], length: float, width: float, gap: float) -> np.ndarray:
+    """障碍矩形的闵可夫斯基扩展：箱子左下角落在其内部（开区间）即与障碍重叠"""
+    rects = [(ox1 - length - gap, oy1 - width - gap, ox2 + gap, oy2 + gap)
+             for ox1, oy1, ox2, oy2 in obstacles]
+    return np.array(rects, dtype=float).reshape(-1, 4)
+
+def _free_candidates(forbidden: np.ndarray, max_x: float, max_y: float,
+                     target_x: float, target_y: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    生成候选点并返回其中的空闲点及其到目标点的距离（按距离升序）
+
+    空闲区域是 [0, max_x]×[0, max_y] 去掉所有禁止矩形后的闭集。离目标最近的空闲点
+    要么是目标点在区域内的投影，要么位于某条边界线上：在竖线 x=a 上，最近点的y要么是
+    目标y的投影，要么是某个禁止矩形或区域的y边界；横线同理。因此候选点为
+    目标点投影、各边界线上的投影以及所有边界线的交点。
+    """
+    xs = np.concatenate(([0.0, max_x], forbidden[:, 0], forbidden[:, 2]))
+    ys = np.concatenate(([0.0, max_y], forbidden[:, 1], forbidden[:, 3]))
+    xs = np.unique(xs[(xs >= 0) & (xs <= max_x)])
+    ys = np.unique(ys[(ys >= 0) & (ys <= max_y)])
+    clamped_x = min(max(target_x, 0.0), max_x)
+    clamped_y = min(max(target_y, 0.0), max_y)
+
+    grid_x, grid_y = np.meshgrid(xs, ys, indexing="ij")
+    cand_x = np.concatenate(([clamped_x], xs, np.full(len(ys), clamped_x), grid_x.ravel()))
+    cand_y = np.concatenate(([clamped_y], np.full(len(xs), clamped_y), ys, grid_y.ravel()))
+
+    points = np.unique(np.column_stack((cand_x, cand_y)), axis=0)
+    cand_x, cand_y = points[:, 0], points[:, 1]
+
+    if len(forbidden):
+        inside = ((cand_x[:, None] > forbidden[None, :, 0] + EPSILON) &
+                  (cand_x[:, None] < forbidden[None, :, 2] - EPSILON) &
+                  (cand_y[:, None] > forbidden[None, :, 1] + EPSILON) &
+                  (cand_y[:, None] < forbidden[None, :, 3] - EPSILON)).any(axis=1)
+        cand_x, cand_y = cand_x[~inside], cand_y[~inside]
+
+    distances = np.hypot(cand_x - target_x, cand_y - target_y)
+    order = np.lexsort((cand_x, cand_y, distances))
+    return np.column_stack((cand_x[order], cand_y[order])), distances[order]
+
+def free_positions_near(container, length: float, width: float, target_x: float, target_y: float,
+                        count: int = 1, exclude: Sequence = (), extra_obstacles: Iterable[Rect] = (),
+                        gap: float = 0.0, max_distance: float = math.inf) -> List[Tuple[float, float]]:
+    """
+    在配置空间中求离目标点最近的若干个可放置位置（箱子左下角）
+
+    第一个结果是精确的最近可放置位置；其余结果为按距离排序的其他候选角点/投影点。
+    搜索半径从箱子尺寸开始倍增，只把空间索引中距离不超过半径的箱子当作障碍，
+    找到足够结果或半径覆盖整个集装箱后停止。
+
+    Args:
+        container: 集装箱
+        length, width: 箱子尺寸（X方向、Y方向，已考虑旋转）
+        target_x, target_y: 目标位置
+        count: 返回的位置数量
+        exclude: 不作为障碍的箱子（如正在拖动或参与交换的箱子）
+        extra_obstacles: 额外的障碍矩形 (x1, y1, x2, y2)
+        gap: 与障碍保持的最小间距 (mm)
+        max_distance: 最大搜索距离
+    """
+    max_x = container.length - length
+    max_y = container.width - width
+    if max_x < 0 or max_y < 0:
+        return []
+
+    extra_obstacles = list(extra_obstacles)
+    placed = BoundingBox(target_x - gap, target_y - gap,
+                         target_x + length + gap, target_y + width + gap)
+    full_radius = math.hypot(container.length, container.width) + math.hypot(target_x, target_y)
+    radius = max(length, width, gap, 1.0)
+
+    while True:
+        radius = min(radius, max_distance, full_radius)
+        obstacles = [other.get_bounds() for _, other in
+                     container.spatial_index.within_distance(placed, radius)
+                     if other not in exclude]
+        forbidden = _forbidden_rects(obstacles + extra_obstacles, length, width, gap)
+        positions, distances = _free_candidates(forbidden, max_x, max_y, target_x, target_y)
+
+        # 半径内的候选点只受半径内的障碍影响，结果精确
+        within = distances <= radius
+        if within.sum() >= count or radius >= max_distance or radius >= full_radius:
+            selected = positions[within & (distances <= max_distance)][:count]
+            return [(float(x), float(y)) for x, y in selected]
+        radius *= 2
+
+def nearest_free_position(container, length: float, width: float, target_x: float, target_y: float,
+                          exclude: Sequence = (), extra_obstacles: Iterable[Rect] = (),
+                          gap: float = 0.0, max_distance: float = math.inf) -> Optional[Tuple[float, float]]:
+    """离目标点最近的可放置位置，找不到返回None（参数同 free_positions_near）"""
+    positions = free_positions_near(container, length, width, target_x, target_y, 1,
+                                    exclude, extra_obstacles, gap, max_distance)
+    return positions[0] if positions else None
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from .balance import balance_report
+from .box import Box
+from .box_array import region_balance
+
+@dataclass(frozen=True, eq=False)
+class LayoutSnapshot:
+    """集装箱布局的不可变快照
+
+    由 Container.snapshot() 生成，列数据是 BoxArray 的只读视图（写时复制共享），
+    不引用任何可变的 Box 对象，可以交给工作线程或（序列化后）工作进程计算，
+    期间界面继续编辑集装箱。version 即生成快照时的 Container.layout_version。
+
+    提供与 Container 相同的只读接口（name、length、width、area、boxes、
+    total_weight、area_utilization、calculate_weight_balance），报告生成等代码
+    可以直接以快照代替集装箱。
+    """
+    name: str
+    length: float
+    width: float
+    version: int
+    ids: np.ndarray
+    sequence: np.ndarray
+    box_length: np.ndarray
+    box_width: np.ndarray
+    weight: np.ndarray
+    height: np.ndarray
+    x: np.ndarray
+    y: np.ndarray
+    rotated: np.ndarray
+    lr_torque_limit: float
+    fr_torque_limit: float
+
+    @classmethod
+    def from_columns(cls, name: str, length: float, width: float, version: int,
+                     columns: Dict[str, np.ndarray], lr_torque_limit: float,
+                     fr_torque_limit: float) -> 'LayoutSnapshot':
+        """由 BoxArray.freeze() 的列创建快照"""
+        return cls(name, length, width, version,
+                   ids=columns['ids'], sequence=columns['sequence'],
+                   box_length=columns['length'], box_width=columns['width'],
+                   weight=columns['weight'], height=columns['height'],
+                   x=columns['x'], y=columns['y'], rotated=columns['rotated'],
+                   lr_torque_limit=lr_torque_limit, fr_torque_limit=fr_torque_limit)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @cached_property
+    def _rows(self) -> Dict[str, int]:
+        return {box_id: row for row, box_id in enumerate(self.ids)}
+
+    def row_of(self, box_id: str) -> Optional[int]:
+        """箱子ID对应的行号，不存在返回None"""
+        return self._rows.get(box_id)
+
+    def position(self, box_id: str) -> Optional[Tuple[float, float, bool]]:
+        """箱子在快照中的 (x, y, rotated)"""
+        row = self._rows.get(box_id)
+        if row is None:
+            return None
+        return float(self.x[row]), float(self.y[row]), bool(self.rotated[row])
+
+    @cached_property
+    def boxes(self) -> Tuple[Box, ...]:
+        """按加入集装箱的顺序重建的箱子副本（与实时布局无关，修改不影响集装箱）"""
+        boxes = []
+        for row in np.argsort(self.sequence, kind="stable"):
+            height = self.height[row]
+            boxes.append(Box(self.ids[row], float(self.box_length[row]), float(self.box_width[row]),
+                             float(self.weight[row]),
+                             height=None if np.isnan(height) else float(height),
+                             x=float(self.x[row]), y=float(self.y[row]),
+                             rotated=bool(self.rotated[row])))
+        return tuple(boxes)
+
+    # ---- 向量化视图与运算 ----
+
+    def actual_length(self) -> np.ndarray:
+        """实际长度（考虑旋转）"""
+        return np.where(self.rotated, self.box_width, self.box_length)
+
+    def actual_width(self) -> np.ndarray:
+        """实际宽度（考虑旋转）"""
+        return np.where(self.rotated, self.box_length, self.box_width)
+
+    def bounds(self) -> np.ndarray:
+        """所有箱子的边界，形状 (n, 4)，每行 (x1, y1, x2, y2)"""
+        return np.column_stack((self.x, self.y,
+                                self.x + self.actual_length(), self.y + self.actual_width()))
+
+    def centers(self) -> Tuple[np.ndarray, np.ndarray]:
+        """所有箱子的质心 (X数组, Y数组)"""
+        return self.x + self.actual_length() / 2, self.y + self.actual_width() / 2
+
+    @property
+    def area(self) -> float:
+        """集装箱总面积"""
+        return self.length * self.width
+
+    @property
+    def used_area(self) -> float:
+        """已使用面积"""
+        return float(np.dot(self.box_length, self.box_width))
+
+    @property
+    def area_utilization(self) -> float:
+        """面积利用率 (0-1)"""
+        return self.used_area / self.area if self.area > 0 else 0
+
+    @property
+    def total_weight(self) -> float:
+        """总重量"""
+        return float(self.weight.sum())
+
+    def calculate_weight_balance(self) -> dict:
+        """重量平衡（字段与 Container.calculate_weight_balance 相同）"""
+        center_x, center_y = self.centers()
+        regions = region_balance(self.weight, center_x, center_y, self.length, self.width)
+        return balance_report(regions, self.length, self.width,
+                              self.lr_torque_limit, self.fr_torque_limit)
@@ -1,9 +1,11 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from typing import List, Set, Tuple, Optional
+from typing import Dict, Iterable, List, Set, Tuple, Optional
 from dataclasses import dataclass
 import math
+import random
+import time
 
 @dataclass
 class BoundingBox:
@@ -21,10 +23,127 @@ class BoundingBox:
     def contains_point(self, x: float, y: float) -> bool:
         """检查是否包含点"""
         return self.x1 <= x <= self.x2 and self.y1 <= y <= self.y2
+    
+    def expanded(self, distance: float) -> 'BoundingBox':
+        """向四周扩展distance后的边界框"""
+        return BoundingBox(self.x1 - distance, self.y1 - distance,
+                           self.x2 + distance, self.y2 + distance)
+    
+    def distance_to(self, other: 'BoundingBox') -> float:
+        """两个边界框之间的最短距离（相交或接触为0）"""
+        dx = max(0.0, other.x1 - self.x2, self.x1 - other.x2)
+        dy = max(0.0, other.y1 - self.y2, self.y1 - other.y2)
+        return math.hypot(dx, dy)
+
+def _touches(a: BoundingBox, b: BoundingBox) -> bool:
+    """相交或接触（候选筛选用，比 intersects 宽松）"""
+    return not (a.x2 < b.x1 or a.x1 > b.x2 or a.y2 < b.y1 or a.y1 > b.y2)
+
+class SpatialIndex:
+    """空间索引基类
+
+    所有后端提供相同接口：insert / remove / update / query / get_nearby_objects / clear。
+    query 返回可能与边界框相交的候选对象（可能多于真正相交的对象，调用方需精确检查）。
+    """
+
+    name = "base"
+
+    def __init__(self, width: float, height: float):
+        self.width = width
+        self.height = height
+        # 对象当前的边界框
+        self.bboxes: Dict[object, BoundingBox] = {}
+
+    def __len__(self) -> int:
+        return len(self.bboxes)
+
+    def __contains__(self, obj) -> bool:
+        return obj in self.bboxes
+
+    def insert(self, obj, bbox: BoundingBox):
+        """插入对象"""
+        raise NotImplementedError
 
-class SpatialGrid:
+    def remove(self, obj):
+        """移除对象"""
+        raise NotImplementedError
+
+    def update(self, obj, new_bbox: BoundingBox):
+        """更新对象位置"""
+        self.remove(obj)
+        self.insert(obj, new_bbox)
+
+    def bulk_load(self, items: Iterable[Tuple[object, BoundingBox]]):
+        """批量加载（清空后插入）"""
+        self.clear()
+        for obj, bbox in items:
+            self.insert(obj, bbox)
+
+    def query(self, bbox: BoundingBox) -> Set:
+        """查询可能与给定边界框相交的对象"""
+        raise NotImplementedError
+
+    def get_nearby_objects(self, obj, distance: float) -> Set:
+        """获取指定距离内的对象"""
+        bbox = self.bboxes.get(obj)
+        if bbox is None:
+            return set()
+        nearby = self.query(bbox.expanded(distance))
+        nearby.discard(obj)  # 移除自身
+        return nearby
+
+    def within_distance(self, bbox: BoundingBox, distance: float,
+                        exclude=None) -> List[Tuple[float, object]]:
+        """与边界框距离不超过distance的所有对象，按距离升序返回 [(距离, 对象)]"""
+        found = []
+        for obj in self.query(bbox.expanded(distance)):
+            if obj is exclude:
+                continue
+            d = bbox.distance_to(self.bboxes[obj])
+            if d <= distance:
+                found.append((d, obj))
+        found.sort(key=lambda item: item[0])
+        return found
+
+    def nearest(self, bbox: BoundingBox, k: int = 1, max_distance: float = math.inf,
+                exclude=None) -> List[Tuple[float, object]]:
+        """
+        距离边界框最近的k个对象，按距离升序返回 [(距离, 对象)]
+
+        以倍增半径扩展查询范围，找到k个半径内的对象后停止；
+        max_distance限制搜索范围，超出的对象不返回。
+        """
+        total = len(self) - (1 if exclude is not None and exclude in self else 0)
+        radius = max(self.width, self.height) / 64
+        while True:
+            radius = min(radius, max_distance)
+            found = self.within_distance(bbox, radius, exclude)
+            if len(found) >= min(k, total) or radius >= max_distance:
+                return found[:k]
+            radius *= 2
+
+    def clear(self):
+        """清空索引"""
+        raise NotImplementedError
+
+def suggest_cell_size(sizes: Iterable[Tuple[float, float]], width: float, height: float) -> float:
+    """根据箱子尺寸分布推荐网格单元大小
+
+    取箱子平均边长的中位数，使每个箱子约覆盖2×2个单元；
+    并限制在容器短边的1/32到短边之间。
+    """
+    extents = sorted((length + w) / 2 for length, w in sizes)
+    short_side = min(width, height)
+    if not extents:
+        return short_side / 4
+    median = extents[len(extents) // 2]
+    return max(short_side / 32, min(short_side, median / 2))
+
+class SpatialGrid(SpatialIndex):
     """空间网格索引，用于加速碰撞检测"""
     
+    name = "grid"
+    
     def __init__(self, width: float, height: float, cell_size: float = 1000):
         """
         初始化空间网格
@@ -34,13 +153,12 @@ class SpatialGrid:
             height: 容器高度
             cell_size: 网格单元大小（默认1000mm = 1m）
         """
-        self.width = width
-        self.height = height
+        super().__init__(width, height)
         self.cell_size = cell_size
         
         # 计算网格尺寸
-        self.cols = math.ceil(width / cell_size)
-        self.rows = math.ceil(height / cell_size)
+        self.cols = max(1, math.ceil(width / cell_size))
+        self.rows = max(1, math.ceil(height / cell_size))
         
         # 初始化网格（每个单元格存储一组对象）
         self.grid = [[set() for _ in range(self.cols)] for _ in range(self.rows)]
@@ -48,12 +166,19 @@ class SpatialGrid:
         # 对象到网格单元的映射
         self.object_cells = {}
     
+    @classmethod
+    def auto(cls, width: float, height: float,
+             sizes: Iterable[Tuple[float, float]]) -> 'SpatialGrid':
+        """按箱子尺寸分布自动确定单元大小的网格"""
+        return cls(width, height, suggest_cell_size(sizes, width, height))
+    
     def _get_cells(self, bbox: BoundingBox) -> List[Tuple[int, int]]:
         """获取边界框覆盖的所有网格单元"""
-        col_start = max(0, int(bbox.x1 // self.cell_size))
-        col_end = min(self.cols - 1, int(bbox.x2 // self.cell_size))
-        row_start = max(0, int(bbox.y1 // self.cell_size))
-        row_end = min(self.rows - 1, int(bbox.y2 // self.cell_size))
+        # 超出范围的部分归入边缘单元
+        col_start = min(self.cols - 1, max(0, int(bbox.x1 // self.cell_size)))
+        col_end = max(0, min(self.cols - 1, int(bbox.x2 // self.cell_size)))
+        row_start = min(self.rows - 1, max(0, int(bbox.y1 // self.cell_size)))
+        row_end = max(0, min(self.rows - 1, int(bbox.y2 // self.cell_size)))
         
         cells = []
         for row in range(row_start, row_end + 1):
@@ -63,8 +188,11 @@ class SpatialGrid:
     
     def insert(self, obj, bbox: BoundingBox):
         """插入对象"""
+        if obj in self.object_cells:
+            self.remove(obj)
         cells = self._get_cells(bbox)
         self.object_cells[obj] = cells
+        self.bboxes[obj] = bbox
         
         for row, col in cells:
             self.grid[row][col].add(obj)
@@ -76,11 +204,7 @@ class SpatialGrid:
             for row, col in cells:
                 self.grid[row][col].discard(obj)
             del self.object_cells[obj]
-    
-    def update(self, obj, new_bbox: BoundingBox):
-        """更新对象位置"""
-        self.remove(obj)
-        self.insert(obj, new_bbox)
+            del self.bboxes[obj]
     
     def query(self, bbox: BoundingBox) -> Set:
         """查询可能与给定边界框相交的对象"""
@@ -116,9 +240,334 @@ class SpatialGrid:
         nearby.discard(obj)  # 移除自身
         return nearby
     
+    def _ring_cells(self, col_start: int, col_end: int, row_start: int, row_end: int, ring: int):
+        """单元范围向外第ring圈的所有网格单元（已裁剪到网格内）"""
+        c0, c1 = col_start - ring, col_end + ring
+        r0, r1 = row_start - ring, row_end + ring
+        for row in range(max(0, r0), min(self.rows - 1, r1) + 1):
+            if ring == 0 or row == r0 or row == r1:
+                # 顶边和底边整行
+                for col in range(max(0, c0), min(self.cols - 1, c1) + 1):
+                    yield row, col
+            else:
+                # 中间行只有左右两端
+                if c0 >= 0:
+                    yield row, c0
+                if c1 <= self.cols - 1:
+                    yield row, c1
+    
+    def _ring_search(self, bbox: BoundingBox, k: int, max_distance: float, exclude):
+        """按圈向外扩展搜索：已搜索到第r圈时，剩余对象与边界框的距离至少为 r×单元大小"""
+        cells = self._get_cells(bbox)
+        col_start, row_start = cells[0][1], cells[0][0]
+        col_end, row_end = cells[-1][1], cells[-1][0]
+        max_ring = max(col_start, row_start, self.cols - 1 - col_end, self.rows - 1 - row_end)
+        
+        seen = set()
+        found = []
+        for ring in range(max_ring + 1):
+            # 前ring-1圈已搜索完，未搜索的对象距离不小于该下界
+            lower_bound = (ring - 1) * self.cell_size
+            if lower_bound > max_distance:
+                break
+            if len(found) >= k:
+                found.sort(key=lambda item: item[0])
+                if found[k - 1][0] <= lower_bound:
+                    break
+            for row, col in self._ring_cells(col_start, col_end, row_start, row_end, ring):
+                for obj in self.grid[row][col]:
+                    if obj in seen or obj is exclude:
+                        continue
+                    seen.add(obj)
+                    d = bbox.distance_to(self.bboxes[obj])
+                    if d <= max_distance:
+                        found.append((d, obj))
+        
+        found.sort(key=lambda item: item[0])
+        return found
+    
+    def within_distance(self, bbox: BoundingBox, distance: float,
+                        exclude=None) -> List[Tuple[float, object]]:
+        """与边界框距离不超过distance的所有对象，按距离升序返回 [(距离, 对象)]"""
+        return self._ring_search(bbox, math.inf, distance, exclude)
+    
+    def nearest(self, bbox: BoundingBox, k: int = 1, max_distance: float = math.inf,
+                exclude=None) -> List[Tuple[float, object]]:
+        """距离边界框最近的k个对象，按距离升序返回 [(距离, 对象)]；由内向外逐圈搜索，凑够k个即停止"""
+        return self._ring_search(bbox, k, max_distance, exclude)[:k]
+    
     def clear(self):
         """清空索引"""
         for row in self.grid:
             for cell in row:
                 cell.clear()
-        self.object_cells.clear()
\ No newline at end of file
+        self.object_cells.clear()
+        self.bboxes.clear()
+
+class _RTreeNode:
+    """R树节点：叶子节点的children为对象，内部节点的children为子节点"""
+
+    __slots__ = ("bbox", "children", "bboxes", "leaf")
+
+    def __init__(self, children, bboxes, leaf):
+        self.children = children
+        self.bboxes = bboxes
+        self.leaf = leaf
+        self.bbox = BoundingBox(min(b.x1 for b in bboxes), min(b.y1 for b in bboxes),
+                                max(b.x2 for b in bboxes), max(b.y2 for b in bboxes))
+
+class STRTree(SpatialIndex):
+    """STR（Sort-Tile-Recursive）批量加载的R树
+
+    树本身只在批量加载时构建；之后插入的对象先放入溢出列表线性检查，
+    移除或移动的对象在树中留下失效条目并在查询时过滤。
+    溢出或失效条目超过对象数的一定比例时整体重建。
+    """
+
+    name = "rtree"
+
+    def __init__(self, width: float, height: float, node_capacity: int = 16,
+                 rebuild_ratio: float = 0.25):
+        super().__init__(width, height)
+        self.node_capacity = node_capacity
+        self.rebuild_ratio = rebuild_ratio
+        self._root: Optional[_RTreeNode] = None
+        # 树中有效条目：对象 -> 建树时的边界框
+        self._in_tree: Dict[object, BoundingBox] = {}
+        self._stale = 0
+        self._overflow: Dict[object, BoundingBox] = {}
+
+    def bulk_load(self, items: Iterable[Tuple[object, BoundingBox]]):
+        self.bboxes = dict(items)
+        self._build()
+
+    def _build(self):
+        self._overflow.clear()
+        self._stale = 0
+        self._in_tree = dict(self.bboxes)
+        entries = list(self._in_tree.items())
+        if not entries:
+            self._root = None
+            return
+
+        nodes = self._pack([obj for obj, _ in entries], [bbox for _, bbox in entries], leaf=True)
+        while len(nodes) > 1:
+            nodes = self._pack(nodes, [node.bbox for node in nodes], leaf=False)
+        self._root = nodes[0]
+
+    def _pack(self, items, bboxes, leaf: bool) -> List[_RTreeNode]:
+        """按X切片、片内按Y排序，每node_capacity个条目组成一个节点"""
+        capacity = self.node_capacity
+        count = len(items)
+        node_count = math.ceil(count / capacity)
+        slice_count = max(1, math.ceil(math.sqrt(node_count)))
+        slice_size = slice_count * capacity
+
+        order = sorted(range(count), key=lambda i: bboxes[i].x1 + bboxes[i].x2)
+        nodes = []
+        for start in range(0, count, slice_size):
+            tile = sorted(order[start:start + slice_size], key=lambda i: bboxes[i].y1 + bboxes[i].y2)
+            for node_start in range(0, len(tile), capacity):
+                group = tile[node_start:node_start + capacity]
+                nodes.append(_RTreeNode([items[i] for i in group], [bboxes[i] for i in group], leaf))
+        return nodes
+
+    def _maybe_rebuild(self):
+        if len(self._overflow) + self._stale > max(32, self.rebuild_ratio * len(self.bboxes)):
+            self._build()
+
+    def insert(self, obj, bbox: BoundingBox):
+        if obj in self.bboxes:
+            self.remove(obj)
+        self.bboxes[obj] = bbox
+        self._overflow[obj] = bbox
+        self._maybe_rebuild()
+
+    def remove(self, obj):
+        if self.bboxes.pop(obj, None) is None:
+            return
+        if self._in_tree.pop(obj, None) is not None:
+            self._stale += 1
+        self._overflow.pop(obj, None)
+        self._maybe_rebuild()
+
+    def query(self, bbox: BoundingBox) -> Set:
+        candidates = {obj for obj, other in self._overflow.items() if _touches(bbox, other)}
+        if self._root is None or not _touches(bbox, self._root.bbox):
+            return candidates
+
+        in_tree = self._in_tree
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node.leaf:
+                for obj, other in zip(node.children, node.bboxes):
+                    if in_tree.get(obj) is other and _touches(bbox, other):
+                        candidates.add(obj)
+            else:
+                for child in node.children:
+                    if _touches(bbox, child.bbox):
+                        stack.append(child)
+        return candidates
+
+    def clear(self):
+        self.bboxes.clear()
+        self._build()
+
+class _QuadNode:
+    """四叉树节点"""
+
+    __slots__ = ("bbox", "depth", "items", "children")
+
+    def __init__(self, bbox: BoundingBox, depth: int):
+        self.bbox = bbox
+        self.depth = depth
+        self.items: Dict[object, BoundingBox] = {}
+        self.children: Optional[List['_QuadNode']] = None
+
+class QuadTree(SpatialIndex):
+    """区域四叉树
+
+    对象存放在能完整容纳它的最深节点中；节点对象数超过容量时分裂。
+    """
+
+    name = "quadtree"
+
+    def __init__(self, width: float, height: float, node_capacity: int = 8, max_depth: int = 8):
+        super().__init__(width, height)
+        self.node_capacity = node_capacity
+        self.max_depth = max_depth
+        self._root = _QuadNode(BoundingBox(0, 0, width, height), 0)
+        self._owner: Dict[object, _QuadNode] = {}
+
+    @staticmethod
+    def _child_for(node: _QuadNode, bbox: BoundingBox) -> Optional[_QuadNode]:
+        for child in node.children:
+            cb = child.bbox
+            if cb.x1 <= bbox.x1 and cb.y1 <= bbox.y1 and bbox.x2 <= cb.x2 and bbox.y2 <= cb.y2:
+                return child
+        return None
+
+    def _split(self, node: _QuadNode):
+        b = node.bbox
+        mx, my = (b.x1 + b.x2) / 2, (b.y1 + b.y2) / 2
+        depth = node.depth + 1
+        node.children = [
+            _QuadNode(BoundingBox(b.x1, b.y1, mx, my), depth),
+            _QuadNode(BoundingBox(mx, b.y1, b.x2, my), depth),
+            _QuadNode(BoundingBox(b.x1, my, mx, b.y2), depth),
+            _QuadNode(BoundingBox(mx, my, b.x2, b.y2), depth),
+        ]
+        items, node.items = node.items, {}
+        for obj, bbox in items.items():
+            self._place(node, obj, bbox)
+
+    def _place(self, node: _QuadNode, obj, bbox: BoundingBox):
+        while node.children is not None:
+            child = self._child_for(node, bbox)
+            if child is None:
+                break
+            node = child
+        node.items[obj] = bbox
+        self._owner[obj] = node
+        if (node.children is None and len(node.items) > self.node_capacity and
+                node.depth < self.max_depth):
+            self._split(node)
+
+    def insert(self, obj, bbox: BoundingBox):
+        if obj in self.bboxes:
+            self.remove(obj)
+        self.bboxes[obj] = bbox
+        self._place(self._root, obj, bbox)
+
+    def remove(self, obj):
+        if self.bboxes.pop(obj, None) is None:
+            return
+        node = self._owner.pop(obj)
+        del node.items[obj]
+
+    def query(self, bbox: BoundingBox) -> Set:
+        candidates = set()
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            for obj, other in node.items.items():
+                if _touches(bbox, other):
+                    candidates.add(obj)
+            if node.children is not None:
+                for child in node.children:
+                    if _touches(bbox, child.bbox):
+                        stack.append(child)
+        return candidates
+
+    def clear(self):
+        self.bboxes.clear()
+        self._owner.clear()
+        self._root = _QuadNode(BoundingBox(0, 0, self.width, self.height), 0)
+
+# 可选的空间索引后端
+SPATIAL_INDEX_BACKENDS = {
+    SpatialGrid.name: SpatialGrid,
+    STRTree.name: STRTree,
+    QuadTree.name: QuadTree,
+}
+
+def create_spatial_index(backend: str, width: float, height: float,
+                         items: Iterable[Tuple[object, BoundingBox]] = (),
+                         **kwargs) -> SpatialIndex:
+    """
+    按名称创建空间索引并批量加载对象
+
+    backend 为 "grid" 且未指定 cell_size 时，按对象尺寸分布自动确定单元大小。
+    """
+    if backend not in SPATIAL_INDEX_BACKENDS:
+        raise ValueError(f"未知的空间索引类型: {backend}")
+    items = list(items)
+    if backend == SpatialGrid.name and "cell_size" not in kwargs:
+        kwargs["cell_size"] = suggest_cell_size(
+            ((bbox.x2 - bbox.x1, bbox.y2 - bbox.y1) for _, bbox in items), width, height)
+    index = SPATIAL_INDEX_BACKENDS[backend](width, height, **kwargs)
+    index.bulk_load(items)
+    return index
+
+def benchmark_spatial_indexes(width: float, height: float,
+                              items: List[Tuple[object, BoundingBox]],
+                              queries: Optional[List[BoundingBox]] = None,
+                              updates: int = 0, seed: int = 0,
+                              backends: Optional[Iterable[str]] = None) -> Dict[str, float]:
+    """
+    对各后端运行同一工作负载（批量加载 + 若干次移动 + 查询），返回耗时（秒）
+
+    Args:
+        width, height: 索引范围
+        items: (对象, 边界框) 列表
+        queries: 查询边界框，默认用每个对象自身的边界框
+        updates: 随机移动对象的次数
+        seed: 移动的随机种子
+        backends: 参与比较的后端，默认全部
+    """
+    if queries is None:
+        queries = [bbox for _, bbox in items]
+
+    timings = {}
+    for backend in backends or SPATIAL_INDEX_BACKENDS:
+        rng = random.Random(seed)
+        start = time.perf_counter()
+        index = create_spatial_index(backend, width, height, items)
+        for _ in range(updates if items else 0):
+            obj, bbox = items[rng.randrange(len(items))]
+            dx = rng.uniform(-0.1, 0.1) * width
+            dy = rng.uniform(-0.1, 0.1) * height
+            index.update(obj, BoundingBox(bbox.x1 + dx, bbox.y1 + dy, bbox.x2 + dx, bbox.y2 + dy))
+        for bbox in queries:
+            index.query(bbox)
+        timings[backend] = time.perf_counter() - start
+    return timings
+
+def choose_spatial_index(width: float, height: float,
+                         items: List[Tuple[object, BoundingBox]],
+                         queries: Optional[List[BoundingBox]] = None,
+                         updates: int = 0) -> str:
+    """按基准测试结果选出最快的后端"""
+    timings = benchmark_spatial_indexes(width, height, items, queries, updates)
+    return min(timings, key=timings.get)
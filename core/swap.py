@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from .box import Box
+from .snap import nearest_free_position
+
+@dataclass(frozen=True)
+class SwapPlan:
+    """两个箱子互换后的位置"""
+    first_position: Tuple[float, float]
+    second_position: Tuple[float, float]
+    displacement: float = 0.0  # 相对于直接互换位置的总偏移 (mm)
+
+    @property
+    def is_direct(self) -> bool:
+        """是否为直接互换（无需调整位置）"""
+        return self.displacement == 0.0
+
+class SwapPlanner:
+    """箱子互换可行性计算
+
+    不修改任何箱子的坐标：先检查直接互换，不可行时用配置空间求解器
+    （core.snap）依次为两个箱子寻找离对方原位置最近的有效位置。
+    结果按两个箱子的当前状态缓存，集装箱布局版本变化时整体失效。
+    """
+
+    # 互换后允许偏离对方原位置的最大距离 (mm)
+    SEARCH_RADIUS = 800
+
+    def __init__(self, container, search_radius: float = None):
+        self.container = container
+        self.search_radius = search_radius if search_radius is not None else self.SEARCH_RADIUS
+        self._cache: Dict[tuple, Optional[SwapPlan]] = {}
+        self._cache_version = None
+
+    def can_swap(self, first: Box, second: Box) -> bool:
+        """两个箱子能否互换且互换后不重叠、不超界"""
+        return self.plan(first, second) is not None
+
+    def plan(self, first: Box, second: Box) -> Optional[SwapPlan]:
+        """计算互换方案，不可行返回None"""
+        version = self.container.layout_version
+        if version != self._cache_version:
+            self._cache.clear()
+            self._cache_version = version
+
+        key = (first.id, first.get_bounds(), second.id, second.get_bounds())
+        if key not in self._cache:
+            self._cache[key] = self._compute(first, second)
+        return self._cache[key]
+
+    def _compute(self, first: Box, second: Box) -> Optional[SwapPlan]:
+        container = self.container
+        exclude = (first, second)
+        first_dims = (first.actual_length, first.actual_width)
+        second_dims = (second.actual_length, second.actual_width)
+        first_target = (second.x, second.y)
+        second_target = (first.x, first.y)
+
+        # 直接互换
+        if (container.is_region_free(*first_target, *first_dims, exclude=exclude) and
+                container.is_region_free(*second_target, *second_dims, exclude=exclude) and
+                not _rects_overlap(_rect(first_target, first_dims), _rect(second_target, second_dims))):
+            return SwapPlan(first_target, second_target)
+
+        # 依次放置两个箱子，先放置的箱子作为后放置箱子的障碍；两种顺序取总偏移小者
+        candidates = []
+        first_position = self._nearest(first_dims, first_target, exclude)
+        if first_position is not None:
+            second_position = self._nearest(second_dims, second_target, exclude,
+                                             _rect(first_position, first_dims))
+            if second_position is not None:
+                candidates.append((first_position, second_position))
+
+        second_position = self._nearest(second_dims, second_target, exclude)
+        if second_position is not None:
+            first_position = self._nearest(first_dims, first_target, exclude,
+                                           _rect(second_position, second_dims))
+            if first_position is not None:
+                candidates.append((first_position, second_position))
+
+        best = None
+        for first_position, second_position in candidates:
+            displacement = (_distance(first_position, first_target) +
+                            _distance(second_position, second_target))
+            if best is None or displacement < best.displacement:
+                best = SwapPlan(first_position, second_position, displacement)
+        return best
+
+    def _nearest(self, dims, target, exclude, obstacle=None) -> Optional[Tuple[float, float]]:
+        return nearest_free_position(self.container, dims[0], dims[1], target[0], target[1],
+                                     exclude=exclude,
+                                     extra_obstacles=[obstacle] if obstacle else (),
+                                     max_distance=self.search_radius)
+
+def _rect(position, dims):
+    return (position[0], position[1], position[0] + dims[0], position[1] + dims[1])
+
+def _rects_overlap(a, b) -> bool:
+    return not (a[2] <= b[0] or a[0] >= b[2] or a[3] <= b[1] or a[1] >= b[3])
+
+def _distance(a, b) -> float:
+    return ((a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2) ** 0.5
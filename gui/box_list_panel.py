@@ -70,6 +70,7 @@ class BoxListPanel(QWidget):
     # 信号定义
     box_selected = pyqtSignal(Box)
     box_double_clicked = pyqtSignal(Box)
+    heatmap_toggled = pyqtSignal(bool)  # 切换选中箱子的可行位置热图
     
     def __init__(self):
         super().__init__()
@@ -133,6 +134,12 @@ class BoxListPanel(QWidget):
         self.clear_selection_btn.clicked.connect(self.clear_selection)
         button_layout.addWidget(self.clear_selection_btn)
         
+        self.heatmap_btn = QPushButton("可行位置")
+        self.heatmap_btn.setCheckable(True)
+        self.heatmap_btn.setToolTip("在集装箱中显示选中箱子可以放置的位置：绿色为放入后仍平衡，橙色为扭矩超限")
+        self.heatmap_btn.toggled.connect(self.heatmap_toggled.emit)
+        button_layout.addWidget(self.heatmap_btn)
+        
         layout.addLayout(button_layout)
     
     def set_boxes(self, boxes: List[Box]):
@@ -210,7 +217,7 @@ class BoxListPanel(QWidget):
             self.box_double_clicked.emit(item.box)
     
     def auto_place_selected(self):
-        """自动放置选中的箱子"""
+        """自动放置选中的箱子（与双击相同，由集装箱的放置引擎寻找位置）"""
         current_item = self.box_list.currentItem()
         if isinstance(current_item, BoxListItem):
             self.box_double_clicked.emit(current_item.box)
@@ -7,14 +7,21 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QGraphicsView,
                              QGraphicsDropShadowEffect, QSizePolicy)
 from PyQt5.QtCore import Qt, pyqtSignal, QRectF, QPointF
 from PyQt5.QtGui import (QPen, QBrush, QColor, QFont, QPainter, QTransform, 
-                         QWheelEvent, QMouseEvent)
+                         QWheelEvent, QMouseEvent, QImage, QPixmap)
 from typing import Dict, List, Optional
+import math
 import random
 import time
+import numpy as np
 
 from core.container import Container
 from core.box import Box
-from core.spatial_index import SpatialGrid, BoundingBox
+from core.collision import find_overlapping_pairs, find_out_of_bounds
+from core.heatmap import FeasibilityHeatmap
+from core.spatial_index import BoundingBox
+from core.probe import box_dims, can_rotate_in_place, fits
+from core.snap import nearest_free_position
+from core.swap import SwapPlanner
 
 class BoxGraphicsItem(QGraphicsRectItem):
     """箱子图形项"""
@@ -141,68 +148,35 @@ class BoxGraphicsItem(QGraphicsRectItem):
             container = self.get_container_cached()
             
             if container:
-                # 使用空间索引获取附近的箱子
-                view = self.get_view_cached()
-                if view and hasattr(view, 'spatial_index'):
-                    # 获取100mm范围内的箱子
-                    nearby_boxes = view.spatial_index.get_nearby_objects(self.box, 100)
-                    
-                    if nearby_boxes:
-                        # 计算到最近箱子的距离（使用平方距离，避免平方根）
-                        min_distance_sq = float('inf')
-                        for other_box in nearby_boxes:
-                            dx = max(0, max(other_box.x - (raw_x + self.box.actual_length), 
-                                           raw_x - (other_box.x + other_box.actual_length)))
-                            dy = max(0, max(other_box.y - (raw_y + self.box.actual_width),
-                                           raw_y - (other_box.y + other_box.actual_width)))
-                            distance_sq = dx*dx + dy*dy
-                            min_distance_sq = min(min_distance_sq, distance_sq)
-                        
-                        # 根据平方距离设置网格大小
-                        if min_distance_sq < 50*50:  # 50mm范围内
-                            grid_size = 1  # 1mm精细网格
-                        elif min_distance_sq < 100*100:  # 100mm范围内
-                            grid_size = 5  # 5mm中等网格
+                # 用集装箱空间索引查找100mm范围内最近的箱子（逐圈搜索，找到即停）
+                drag_bbox = BoundingBox(raw_x, raw_y,
+                                        raw_x + self.box.actual_length,
+                                        raw_y + self.box.actual_width)
+                nearest = container.spatial_index.nearest(drag_bbox, 1, max_distance=100,
+                                                          exclude=self.box)
+                
+                if nearest:
+                    min_distance = nearest[0][0]
+                    # 根据距离设置网格大小
+                    if min_distance < 50:  # 50mm范围内
+                        grid_size = 1  # 1mm精细网格
+                    elif min_distance < 100:  # 100mm范围内
+                        grid_size = 5  # 5mm中等网格
             
             # 应用网格吸附
             new_x = round(raw_x / grid_size) * grid_size
             new_y = round(raw_y / grid_size) * grid_size
             
-            # 临时更新box位置进行检测
-            old_x, old_y = self.box.x, self.box.y
-            self.box.x = new_x
-            self.box.y = new_y
+            # 图形项当前位置即上一次接受的拖动位置（拖动中箱子坐标按100ms节流提交，可能落后于图形项）
+            old_x = self.pos().x() / self.scale_factor
+            old_y = self.pos().y() / self.scale_factor
             
             # 检查新位置是否有效
             is_valid = True
             
             if container:
-                # 检查边界
-                if (new_x < 0 or new_y < 0 or 
-                    new_x + self.box.actual_length > container.length or
-                    new_y + self.box.actual_width > container.width):
-                    is_valid = False
-                else:
-                    # 使用空间索引进行碰撞检测
-                    view = self.get_view_cached()
-                    if view and hasattr(view, 'spatial_index'):
-                        # 查询可能碰撞的箱子
-                        bbox = BoundingBox(new_x, new_y, 
-                                         new_x + self.box.actual_length,
-                                         new_y + self.box.actual_width)
-                        candidates = view.spatial_index.query(bbox)
-                        
-                        # 只检查候选箱子
-                        for other_box in candidates:
-                            if other_box is not self.box and self.box.overlaps_with(other_box):
-                                is_valid = False
-                                break
-                    else:
-                        # 备用：全部检查
-                        for other_box in container.boxes:
-                            if other_box is not self.box and self.box.overlaps_with(other_box):
-                                is_valid = False
-                                break
+                # 边界检查 + 空间索引碰撞检测（不修改箱子坐标）
+                is_valid = fits(container, box_dims(self.box), new_x, new_y, exclude=(self.box,))
             
             if is_valid:
                 # 位置有效，使用绿色边框
@@ -226,14 +200,10 @@ class BoxGraphicsItem(QGraphicsRectItem):
                 
                 if (valid_x, valid_y) != (old_x, old_y):
                     # 找到了更近的有效位置
-                    self.box.x = valid_x
-                    self.box.y = valid_y
                     self.setPen(QPen(QColor(255, 150, 0), 2))  # 橙色边框
                     return QPointF(valid_x * self.scale_factor, valid_y * self.scale_factor)
                 else:
-                    # 恢复原位置
-                    self.box.x = old_x
-                    self.box.y = old_y
+                    # 保持原位置
                     self.setPen(QPen(QColor(255, 0, 0), 2))
                     return QPointF(old_x * self.scale_factor, old_y * self.scale_factor)
         
@@ -255,91 +225,16 @@ class BoxGraphicsItem(QGraphicsRectItem):
         return super().itemChange(change, value)
     
     def _find_snap_position(self, old_x, old_y, target_x, target_y, container):
-        """使用磁吸算法找到最接近的有效位置"""
-        # 如果目标位置在容器内且不发生碰撞，直接返回
-        self.box.x = target_x
-        self.box.y = target_y
-        
-        # 检查边界
-        if (target_x >= 0 and target_y >= 0 and 
-            target_x + self.box.actual_length <= container.length and
-            target_y + self.box.actual_width <= container.width):
-            
-            # 检查是否与其他箱子碰撞
-            collision_box = None
-            for other_box in container.boxes:
-                if other_box is not self.box and self.box.overlaps_with(other_box):
-                    collision_box = other_box
-                    break
-            
-            if collision_box:
-                # 计算吸附位置（紧贴碰撞箱子）
-                snap_positions = []
-                
-                # 吸附到碰撞箱子的右侧
-                snap_x_right = collision_box.x + collision_box.actual_length + 1
-                if (snap_x_right + self.box.actual_length <= container.length and
-                    abs(snap_x_right - target_x) < abs(old_x - target_x)):
-                    snap_positions.append((snap_x_right, target_y))
-                
-                # 吸附到碰撞箱子的左侧
-                snap_x_left = collision_box.x - self.box.actual_length - 1
-                if (snap_x_left >= 0 and
-                    abs(snap_x_left - target_x) < abs(old_x - target_x)):
-                    snap_positions.append((snap_x_left, target_y))
-                
-                # 吸附到碰撞箱子的上方
-                snap_y_top = collision_box.y - self.box.actual_width - 1
-                if (snap_y_top >= 0 and
-                    abs(snap_y_top - target_y) < abs(old_y - target_y)):
-                    snap_positions.append((target_x, snap_y_top))
-                
-                # 吸附到碰撞箱子的下方
-                snap_y_bottom = collision_box.y + collision_box.actual_width + 1
-                if (snap_y_bottom + self.box.actual_width <= container.width and
-                    abs(snap_y_bottom - target_y) < abs(old_y - target_y)):
-                    snap_positions.append((target_x, snap_y_bottom))
-                
-                # 选择最近的吸附位置
-                best_snap = None
-                min_distance = float('inf')
-                
-                for snap_x, snap_y in snap_positions:
-                    self.box.x = snap_x
-                    self.box.y = snap_y
-                    
-                    # 检查这个位置是否有效（不与其他箱子碰撞）
-                    valid = True
-                    view = self.get_view_cached()
-                    if view and hasattr(view, 'spatial_index'):
-                        # 使用空间索引检查
-                        bbox = BoundingBox(snap_x, snap_y,
-                                         snap_x + self.box.actual_length,
-                                         snap_y + self.box.actual_width)
-                        candidates = view.spatial_index.query(bbox)
-                        for other_box in candidates:
-                            if other_box is not self.box and self.box.overlaps_with(other_box):
-                                valid = False
-                                break
-                    else:
-                        # 备用方法
-                        for other_box in container.boxes:
-                            if other_box is not self.box and self.box.overlaps_with(other_box):
-                                valid = False
-                                break
-                    
-                    if valid:
-                        distance = ((snap_x - target_x)**2 + (snap_y - target_y)**2)**0.5
-                        if distance < min_distance:
-                            min_distance = distance
-                            best_snap = (snap_x, snap_y)
-                
-                if best_snap:
-                    return best_snap
+        """使用配置空间求离目标最近的有效位置（见 core.snap），不比原位置更近时返回原位置"""
+        snap = nearest_free_position(container, self.box.actual_length, self.box.actual_width,
+                                     target_x, target_y, exclude=(self.box,), gap=1)
+        if snap is None:
+            return old_x, old_y
         
-        # 如果没有找到合适的吸附位置，返回原位置
-        return old_x, old_y
-    
+        snap_distance = math.hypot(snap[0] - target_x, snap[1] - target_y)
+        if snap_distance >= math.hypot(old_x - target_x, old_y - target_y):
+            return old_x, old_y
+        return snap
     
     def get_container(self):
         """获取当前的容器对象"""
@@ -375,6 +270,8 @@ class BoxGraphicsItem(QGraphicsRectItem):
             # 清空缓存
             self._cached_view = None
             self._cached_container = None
+            # 一次拖动（含拖动过程中的实时更新）合并为一条撤销记录
+            self.begin_edit("移动箱子")
         super().mousePressEvent(event)
     
     def mouseReleaseEvent(self, event):
@@ -387,33 +284,48 @@ class BoxGraphicsItem(QGraphicsRectItem):
             self._cached_view = None
             self._cached_container = None
             
-            # 更新空间索引
-            view = self.get_view_cached()
-            if view and hasattr(view, 'spatial_index'):
-                bbox = BoundingBox(self.box.x, self.box.y,
-                                 self.box.x + self.box.actual_length,
-                                 self.box.y + self.box.actual_width)
-                view.spatial_index.update(self.box, bbox)
         
         # 恢复正常边框
         self.setPen(QPen(QColor(0, 0, 0), 1))
         
-        # 更新box的最终位置
-        pos = self.pos()
-        old_x, old_y = self.box.x, self.box.y
-        new_x = pos.x() / self.scale_factor
-        new_y = pos.y() / self.scale_factor
+        # 提交本次拖动的最终位置：多选拖动时其他选中的箱子随之移动，
+        # 它们在拖动中只按100ms节流提交过，这里一并提交图形项的最终位置
+        if self.scene():
+            items = [self] + [item for item in self.scene().selectedItems()
+                              if isinstance(item, BoxGraphicsItem) and item is not self]
+            self.commit_positions(items)
         
-        # 如果位置发生了变化，发射信号
-        if abs(new_x - old_x) > 0.1 or abs(new_y - old_y) > 0.1:
-            self.box.x = new_x
-            self.box.y = new_y
-            
-            # 通知主窗口箱子位置已改变
-            for view in self.scene().views():
-                if hasattr(view, 'box_moved'):
-                    view.box_moved.emit(self.box, new_x, new_y)
-                    break
+        if event.button() == Qt.LeftButton:
+            self.end_edit()
+    
+    def commit_positions(self, items):
+        """把图形项位置与箱子坐标不一致的箱子批量提交到集装箱（一次 move_many），并通知主窗口"""
+        container = self.get_container()
+        moved = []
+        for item in items:
+            new_x = item.pos().x() / item.scale_factor
+            new_y = item.pos().y() / item.scale_factor
+            if container and item.box in container:
+                x, y, _ = container.recorded_state(item.box)
+            else:
+                x, y = item.box.x, item.box.y
+            if abs(new_x - x) > 0.1 or abs(new_y - y) > 0.1:
+                moved.append((item.box, new_x, new_y))
+        if not moved:
+            return
+        
+        # 拖动时每个位置已单独校验过，这里不再整批校验
+        if container:
+            container.move_many(moved, check=False)
+        for box, new_x, new_y in moved:
+            if not (container and box in container):
+                box.move_to(new_x, new_y)
+        
+        # 通知主窗口箱子位置已改变（已提交的位置主窗口不会重复移动）
+        view = self.get_view_cached()
+        if view and hasattr(view, 'box_moved'):
+            for box, new_x, new_y in moved:
+                view.box_moved.emit(box, new_x, new_y)
     
     def show_context_menu(self, pos):
         """显示右键菜单"""
@@ -428,9 +340,16 @@ class BoxGraphicsItem(QGraphicsRectItem):
         
         if swap_candidates:
             swap_menu = menu.addMenu("与相邻箱子互换")
+            planner = self.get_swap_planner()
             for candidate in swap_candidates:
                 direction = self.get_direction_to_box(candidate)
-                action = QAction(f"与{direction}箱子 {candidate.id} 互换", menu)
+                label = f"与{direction}箱子 {candidate.id} 互换"
+                plan = planner.plan(self.box, candidate) if planner else None
+                if plan is None:
+                    label += "（会重叠）"
+                elif not plan.is_direct:
+                    label += "（需调整位置）"
+                action = QAction(label, menu)
                 action.triggered.connect(lambda checked, box=candidate: self.swap_with_box(box))
                 swap_menu.addAction(action)
             menu.addSeparator()
@@ -440,9 +359,15 @@ class BoxGraphicsItem(QGraphicsRectItem):
         rotate_action.triggered.connect(self.rotate_box)
         menu.addAction(rotate_action)
         
-        # 放回列表
-        return_action = QAction("放回左侧列表", menu)
-        return_action.triggered.connect(self.return_to_list)
+        # 放回列表（多选时放回所有选中的箱子）
+        view = self.get_view_cached()
+        selected = view.selected_boxes() if view and hasattr(view, 'selected_boxes') else []
+        if len(selected) > 1 and self.box in selected:
+            return_action = QAction(f"将选中的 {len(selected)} 个箱子放回左侧列表", menu)
+            return_action.triggered.connect(lambda checked, boxes=selected: view.return_boxes_to_list(boxes))
+        else:
+            return_action = QAction("放回左侧列表", menu)
+            return_action.triggered.connect(self.return_to_list)
         menu.addAction(return_action)
         
         # 显示菜单
@@ -455,7 +380,7 @@ class BoxGraphicsItem(QGraphicsRectItem):
         """将箱子放回左侧列表"""
         # 获取主窗口
         container = self.get_container()
-        if container and self.box in container.boxes:
+        if container and self.box in container:
             # 在移除之前获取视图引用
             parent_view = None
             if self.scene():
@@ -465,7 +390,11 @@ class BoxGraphicsItem(QGraphicsRectItem):
                         break
             
             # 从集装箱移除
-            container.remove_box(self.box)
+            self.begin_edit("放回列表")
+            try:
+                container.remove_box(self.box)
+            finally:
+                self.end_edit()
             
             # 从容器视图的box_items字典中移除
             for view in self.scene().views():
@@ -484,33 +413,24 @@ class BoxGraphicsItem(QGraphicsRectItem):
     def rotate_box(self):
         """旋转箱子"""
         if self.box.can_rotate():
-            # 保存原始位置和状态
-            old_rotated = self.box.rotated
-            old_length = self.box.actual_length
-            old_width = self.box.actual_width
-            
-            # 执行旋转
-            self.box.rotate()
-            
-            # 检查旋转后是否有效
             container = self.get_container()
             if container:
-                # 检查边界
-                if (self.box.x + self.box.actual_length > container.length or
-                    self.box.y + self.box.actual_width > container.width):
-                    # 旋转后超出边界，撤销
-                    self.box.rotated = old_rotated
+                # 先探测旋转后是否超界或碰撞，无效时不旋转
+                if not can_rotate_in_place(container, self.box):
                     return
-                
-                # 检查碰撞
-                for other_box in container.boxes:
-                    if other_box is not self.box and self.box.overlaps_with(other_box):
-                        # 旋转后碰撞，撤销
-                        self.box.rotated = old_rotated
-                        return
-            
-            # 旋转有效，更新显示
+                self.begin_edit("旋转箱子")
+                try:
+                    container.rotate_box(self.box)
+                finally:
+                    self.end_edit()
+            else:
+                self.box.rotate()
             self.update_from_box()
+            
+            # 通知主窗口刷新重量平衡
+            view = self.get_view_cached()
+            if view and hasattr(view, 'box_moved'):
+                view.box_moved.emit(self.box, self.box.x, self.box.y)
     
     def mouseDoubleClickEvent(self, event):
         """双击事件 - 旋转箱子"""
@@ -526,10 +446,11 @@ class BoxGraphicsItem(QGraphicsRectItem):
         gap_threshold = 500  # 间隙阈值(mm) - 大幅放宽到500mm
         overlap_threshold = 50   # 重叠阈值(mm) - 进一步降低重叠要求
         
-        for other_box in container.boxes:
-            if other_box is self.box:
-                continue
-            
+        # 只检查空间索引中距离不超过间隙阈值的箱子
+        nearby = container.spatial_index.within_distance(
+            BoundingBox(*self.box.get_bounds()), gap_threshold, exclude=self.box)
+        
+        for _, other_box in nearby:
             # 计算两个箱子的边界
             self_left = self.box.x
             self_right = self.box.x + self.box.actual_length
@@ -589,204 +510,29 @@ class BoxGraphicsItem(QGraphicsRectItem):
             else:
                 return "上方"
     
+    def begin_edit(self, label):
+        """通知视图开始一次可撤销的编辑（期间的修改合并为一条撤销记录）"""
+        view = self.get_view_cached()
+        if view and hasattr(view, 'edit_started'):
+            view.edit_started.emit(label)
+    
+    def end_edit(self):
+        """通知视图编辑结束"""
+        view = self.get_view_cached()
+        if view and hasattr(view, 'edit_finished'):
+            view.edit_finished.emit()
+    
+    def get_swap_planner(self):
+        """获取视图的互换规划器"""
+        view = self.get_view_cached()
+        return getattr(view, 'swap_planner', None)
+    
     def can_swap_with(self, other_box):
-        """检查是否可以与另一个箱子互换位置"""
-        container = self.get_container_cached()
-        if not container:
-            return False
-        
-        # 保存原始位置
-        self_old_x, self_old_y = self.box.x, self.box.y
-        other_old_x, other_old_y = other_box.x, other_box.y
-        
-        # 首先尝试最简单的直接交换
-        self.box.x, self.box.y = other_old_x, other_old_y
-        other_box.x, other_box.y = self_old_x, self_old_y
-        
-        if self._is_swap_position_valid(container, other_box) and self._check_other_box_valid(other_box, container):
-            # 恢复位置并返回成功
-            self.box.x, self.box.y = self_old_x, self_old_y
-            other_box.x, other_box.y = other_old_x, other_old_y
-            return True
-        
-        # 如果直接交换不行，尝试其他策略
-        swap_strategies = self._generate_swap_strategies(other_box, container)
-        
-        for strategy in swap_strategies[1:]:  # 跳过第一个（直接交换已经试过）
-            self_new_x, self_new_y, other_new_x, other_new_y = strategy
-            
-            # 临时设置新位置
-            self.box.x, self.box.y = self_new_x, self_new_y
-            other_box.x, other_box.y = other_new_x, other_new_y
-            
-            # 检查是否有效
-            if self._is_swap_position_valid(container, other_box) and self._check_other_box_valid(other_box, container):
-                # 恢复位置并返回成功
-                self.box.x, self.box.y = self_old_x, self_old_y
-                other_box.x, other_box.y = other_old_x, other_old_y
-                return True
-        
-        # 恢复原始位置
-        self.box.x, self.box.y = self_old_x, self_old_y
-        other_box.x, other_box.y = other_old_x, other_old_y
-        return False
-    
-    def _generate_swap_strategies(self, other_box, container, self_original_pos, other_original_pos):
-        """生成多种交换策略"""
-        strategies = []
-        self_orig_x, self_orig_y = self_original_pos
-        other_orig_x, other_orig_y = other_original_pos
-        
-        # 策略1：直接交换位置（最高优先级）
-        direct_swap = (other_orig_x, other_orig_y, self_orig_x, self_orig_y)
-        strategies.append(direct_swap)
-        
-        # 策略2：允许少量偏移的交换（在原位置附近微调）
-        for self_offset in [(0, 0), (10, 0), (-10, 0), (0, 10), (0, -10), (10, 10), (-10, -10)]:
-            for other_offset in [(0, 0), (10, 0), (-10, 0), (0, 10), (0, -10), (10, 10), (-10, -10)]:
-                if self_offset == (0, 0) and other_offset == (0, 0):
-                    continue  # 跳过直接交换，已经添加过了
-                
-                self_new_x = other_orig_x + self_offset[0]
-                self_new_y = other_orig_y + self_offset[1]
-                other_new_x = self_orig_x + other_offset[0]
-                other_new_y = self_orig_y + other_offset[1]
-                
-                # 检查是否在边界内
-                if (self_new_x >= 0 and self_new_y >= 0 and
-                    self_new_x + self.box.actual_length <= container.length and
-                    self_new_y + self.box.actual_width <= container.width and
-                    other_new_x >= 0 and other_new_y >= 0 and
-                    other_new_x + other_box.actual_length <= container.length and
-                    other_new_y + other_box.actual_width <= container.width):
-                    
-                    strategies.append((self_new_x, self_new_y, other_new_x, other_new_y))
-        
-        # 策略3：如果直接交换不行，尝试紧贴放置 - 使用原始位置作为参考
-        # 暂时设置box位置到原始位置进行计算
-        current_self_x, current_self_y = self.box.x, self.box.y
-        current_other_x, current_other_y = other_box.x, other_box.y
-        
-        # 设置为原始位置
-        self.box.x, self.box.y = self_orig_x, self_orig_y
-        other_box.x, other_box.y = other_orig_x, other_orig_y
-        
-        self_adjacent_positions = self._find_adjacent_positions(other_box, self.box, container)
-        other_adjacent_positions = self._find_adjacent_positions(self.box, other_box, container)
-        
-        # 恢复当前位置
-        self.box.x, self.box.y = current_self_x, current_self_y
-        other_box.x, other_box.y = current_other_x, current_other_y
-        
-        # 优先选择一个箱子占据对方原位置，另一个箱子紧贴
-        for self_pos in self_adjacent_positions[:3]:  # 只取前3个最近的位置
-            strategies.append((self_pos[0], self_pos[1], self_orig_x, self_orig_y))
-        
-        for other_pos in other_adjacent_positions[:3]:  # 只取前3个最近的位置
-            strategies.append((other_orig_x, other_orig_y, other_pos[0], other_pos[1]))
-        
-        # 策略4：最后才考虑完全不同的位置
-        if len(strategies) < 10:  # 只有在前面的策略不够时才使用
-            self_positions = self._find_positions_near(other_orig_x, other_orig_y, self.box, container)
-            other_positions = self._find_positions_near(self_orig_x, self_orig_y, other_box, container)
-            
-            # 只添加前几个最近的组合
-            for i, self_pos in enumerate(self_positions[:3]):
-                for j, other_pos in enumerate(other_positions[:3]):
-                    if i + j < 4:  # 限制组合数量
-                        strategies.append((self_pos[0], self_pos[1], other_pos[0], other_pos[1]))
-        
-        return strategies
-    
-    def _find_adjacent_positions(self, reference_box, box_to_place, container):
-        """寻找紧贴参考箱子的位置"""
-        positions = []
-        
-        # 四个紧贴位置：左、右、上、下
-        adjacent_offsets = [
-            # 左侧紧贴
-            (reference_box.x - box_to_place.actual_length - 1, reference_box.y),
-            # 右侧紧贴
-            (reference_box.x + reference_box.actual_length + 1, reference_box.y),
-            # 上方紧贴
-            (reference_box.x, reference_box.y - box_to_place.actual_width - 1),
-            # 下方紧贴
-            (reference_box.x, reference_box.y + reference_box.actual_width + 1),
-            
-            # 对角线位置
-            (reference_box.x - box_to_place.actual_length - 1, reference_box.y - box_to_place.actual_width - 1),
-            (reference_box.x + reference_box.actual_length + 1, reference_box.y - box_to_place.actual_width - 1),
-            (reference_box.x - box_to_place.actual_length - 1, reference_box.y + reference_box.actual_width + 1),
-            (reference_box.x + reference_box.actual_length + 1, reference_box.y + reference_box.actual_width + 1),
-        ]
-        
-        for x, y in adjacent_offsets:
-            # 检查边界
-            if (x >= 0 and y >= 0 and 
-                x + box_to_place.actual_length <= container.length and
-                y + box_to_place.actual_width <= container.width):
-                positions.append((x, y))
-        
-        return positions
-    
-    def _find_positions_near(self, target_x, target_y, box_to_place, container):
-        """在目标位置附近寻找可放置的位置"""
-        positions = []
-        
-        # 多层搜索：先近距离精细搜索，再远距离粗糙搜索
-        search_configs = [
-            (100, 25),   # 100mm半径，25mm步长
-            (300, 50),   # 300mm半径，50mm步长
-            (800, 100),  # 800mm半径，100mm步长
-        ]
-        
-        for search_radius, step in search_configs:
-            layer_positions = []
-            
-            # 在目标位置周围搜索
-            for dx in range(-search_radius, search_radius + 1, step):
-                for dy in range(-search_radius, search_radius + 1, step):
-                    new_x = target_x + dx
-                    new_y = target_y + dy
-                    
-                    # 检查是否在容器边界内
-                    if (new_x >= 0 and new_y >= 0 and 
-                        new_x + box_to_place.actual_length <= container.length and
-                        new_y + box_to_place.actual_width <= container.width):
-                        
-                        # 计算距离目标位置的距离
-                        distance = ((new_x - target_x)**2 + (new_y - target_y)**2)**0.5
-                        layer_positions.append((new_x, new_y, distance))
-            
-            # 按距离排序，每层取最近的几个位置
-            layer_positions.sort(key=lambda p: p[2])
-            positions.extend([(p[0], p[1]) for p in layer_positions[:5]])  # 每层取5个最近位置
-        
-        # 去重并按距离排序
-        unique_positions = list(set(positions))
-        unique_with_distance = [(x, y, ((x - target_x)**2 + (y - target_y)**2)**0.5) 
-                               for x, y in unique_positions]
-        unique_with_distance.sort(key=lambda p: p[2])
-        
-        return [(p[0], p[1]) for p in unique_with_distance[:15]]  # 返回最近的15个位置
-    
-    def _is_swap_position_valid(self, container, exclude_box=None):
-        """检查当前交换位置是否有效"""
-        # 检查边界
-        if (self.box.x < 0 or self.box.y < 0 or 
-            self.box.x + self.box.actual_length > container.length or
-            self.box.y + self.box.actual_width > container.width):
+        """检查是否可以与另一个箱子互换位置（不修改箱子坐标）"""
+        planner = self.get_swap_planner()
+        if not planner:
             return False
-        
-        # 检查与其他箱子的碰撞（排除参与交换的两个箱子）
-        for box in container.boxes:
-            if box is self.box or box is exclude_box:
-                continue
-            
-            if self.box.overlaps_with(box):
-                return False
-        
-        return True
+        return planner.can_swap(self.box, other_box)
     
     def swap_with_box(self, other_box):
         """与另一个箱子互换位置"""
@@ -801,74 +547,51 @@ class BoxGraphicsItem(QGraphicsRectItem):
         
         print(f"尝试交换: {self.box.id}({self_old_x:.1f},{self_old_y:.1f},尺寸:{self.box.actual_length}x{self.box.actual_width}) ↔ {other_box.id}({other_old_x:.1f},{other_old_y:.1f},尺寸:{other_box.actual_length}x{other_box.actual_width})")
         
-        # 首先尝试最简单的直接交换
-        self.box.x, self.box.y = other_old_x, other_old_y
-        other_box.x, other_box.y = self_old_x, self_old_y
-        
-        swap_success = False
-        
-        # 完全开放的交换逻辑：允许重叠和超出边界
-        print(f"✓ 位置交换完成（允许重叠和超界）: {self.box.id}({self_old_x:.1f},{self_old_y:.1f})→({self.box.x:.1f},{self.box.y:.1f}), {other_box.id}({other_old_x:.1f},{other_old_y:.1f})→({other_box.x:.1f},{other_box.y:.1f})")
-        swap_success = True
-        
-        # 更新图形项位置
-        self.setPos(self.box.x * self.scale_factor, self.box.y * self.scale_factor)
+        planner = self.get_swap_planner()
+        plan = planner.plan(self.box, other_box) if planner else None
+        if plan:
+            (self_new_x, self_new_y), (other_new_x, other_new_y) = plan.first_position, plan.second_position
+        else:
+            # 没有不重叠的方案时仍直接交换（允许重叠和超界），由重叠警告提示用户
+            self_new_x, self_new_y = other_old_x, other_old_y
+            other_new_x, other_new_y = self_old_x, self_old_y
+            print("未找到无重叠的交换位置，直接交换（允许重叠和超界）")
         
-        # 更新另一个箱子的图形项
-        view = self.get_view_cached()
-        if view and hasattr(view, 'box_items'):
-            if other_box in view.box_items:
-                other_item = view.box_items[other_box]
-                other_item.setPos(other_box.x * self.scale_factor, other_box.y * self.scale_factor)
-        
-        # 更新空间索引
-        if view and hasattr(view, 'spatial_index'):
-            bbox1 = BoundingBox(self.box.x, self.box.y,
-                              self.box.x + self.box.actual_length,
-                              self.box.y + self.box.actual_width)
-            bbox2 = BoundingBox(other_box.x, other_box.y,
-                              other_box.x + other_box.actual_length,
-                              other_box.y + other_box.actual_width)
-            view.spatial_index.update(self.box, bbox1)
-            view.spatial_index.update(other_box, bbox2)
-        
-        # 通知主窗口更新
-        if view and hasattr(view, 'box_moved'):
-            view.box_moved.emit(self.box, self.box.x, self.box.y)
-            view.box_moved.emit(other_box, other_box.x, other_box.y)
+        # 两个箱子都通过集装箱移动（同步空间索引等缓存），合并为一条撤销记录
+        self.begin_edit("互换箱子")
+        try:
+            container.move_box(self.box, self_new_x, self_new_y)
+            container.move_box(other_box, other_new_x, other_new_y)
+            
+            # 更新图形项位置
+            self.setPos(self.box.x * self.scale_factor, self.box.y * self.scale_factor)
+            
+            # 更新另一个箱子的图形项
+            view = self.get_view_cached()
+            if view and hasattr(view, 'box_items'):
+                if other_box in view.box_items:
+                    other_item = view.box_items[other_box]
+                    other_item.setPos(other_box.x * self.scale_factor, other_box.y * self.scale_factor)
+            
+            # 通知主窗口刷新状态（位置已提交，主窗口不会重复移动）
+            if view and hasattr(view, 'box_moved'):
+                view.box_moved.emit(self.box, self.box.x, self.box.y)
+                view.box_moved.emit(other_box, other_box.x, other_box.y)
+        finally:
+            self.end_edit()
         
         # 验证交换结果
-        if (abs(self.box.x - other_old_x) < 1 and abs(self.box.y - other_old_y) < 1 and
-            abs(other_box.x - self_old_x) < 1 and abs(other_box.y - self_old_y) < 1):
+        if plan is None or plan.is_direct:
             print(f"完美交换成功: {self.box.id}↔{other_box.id}")
         else:
             print(f"位置调整交换: {self.box.id}({self_old_x:.1f},{self_old_y:.1f})→({self.box.x:.1f},{self.box.y:.1f}), {other_box.id}({other_old_x:.1f},{other_old_y:.1f})→({other_box.x:.1f},{other_box.y:.1f})")
         
         # 检查并显示重叠警告
-        view = self.get_view_cached()
         if view and hasattr(view, 'parent') and view.parent():
             container_view = view.parent()
             if hasattr(container_view, 'check_and_show_overlaps'):
                 container_view.check_and_show_overlaps()
     
-    def _check_other_box_valid(self, other_box, container):
-        """检查另一个箱子的位置是否有效"""
-        # 检查边界
-        if (other_box.x < 0 or other_box.y < 0 or 
-            other_box.x + other_box.actual_length > container.length or
-            other_box.y + other_box.actual_width > container.width):
-            return False
-        
-        # 检查与其他箱子的碰撞（排除参与交换的两个箱子）
-        for box in container.boxes:
-            if box is other_box or box is self.box:
-                continue
-            
-            if other_box.overlaps_with(box):
-                return False
-        
-        return True
-    
     def set_swap_candidate(self, is_candidate):
         """设置是否为交换候选"""
         if self._is_swap_candidate != is_candidate:
@@ -911,6 +634,14 @@ class ContainerGraphicsView(QGraphicsView):
     box_moved = pyqtSignal(Box, float, float)
     box_selected = pyqtSignal(Box)
     selection_cleared = pyqtSignal()
+    edit_started = pyqtSignal(str)  # 可撤销编辑开始（撤销记录名称）
+    edit_finished = pyqtSignal()
+    layout_changed = pyqtSignal()  # 批量操作完成（每批只发出一次）
+    boxes_deleted = pyqtSignal(list)  # 箱子被删除（不回到待装载列表）
+    
+    # 方向键微调步长 (mm)，按住Shift时使用大步长
+    NUDGE_STEP = 10
+    NUDGE_STEP_LARGE = 100
     
     def __init__(self):
         super().__init__()
@@ -918,8 +649,9 @@ class ContainerGraphicsView(QGraphicsView):
         self.container: Optional[Container] = None
         self.scale_factor = 0.2  # 缩放因子：1mm = 0.2像素（适中显示）
         self.box_items: Dict[Box, BoxGraphicsItem] = {}
-        self.spatial_index: Optional[SpatialGrid] = None  # 空间索引
-        
+        self.swap_planner: Optional[SwapPlanner] = None
+        self.heatmap: Optional[FeasibilityHeatmap] = None
+        self.heatmap_item = None
         
         self.setup_view()
         self.setup_scene()
@@ -959,11 +691,7 @@ class ContainerGraphicsView(QGraphicsView):
     def set_container(self, container: Container):
         """设置集装箱"""
         self.container = container
-        # 创建空间索引
-        if container:
-            self.spatial_index = SpatialGrid(container.length, container.width)
-        else:
-            self.spatial_index = None
+        self.swap_planner = SwapPlanner(container)
         self.update_view()
     
     def update_view(self):
@@ -974,6 +702,7 @@ class ContainerGraphicsView(QGraphicsView):
         # 清空场景
         self.scene.clear()
         self.box_items.clear()
+        self.heatmap_item = None
         
         # 绘制集装箱边界
         self.draw_container_boundary()
@@ -981,6 +710,10 @@ class ContainerGraphicsView(QGraphicsView):
         # 绘制网格
         self.draw_grid()
         
+        # 绘制可行位置热图
+        if self.heatmap is not None:
+            self.draw_heatmap()
+        
         # 绘制箱子
         self.draw_boxes()
         
@@ -1093,23 +826,51 @@ class ContainerGraphicsView(QGraphicsView):
         right_text.setPos(width/2 - 25, 50)  # 水平居中，距离顶部50px
         right_text.setZValue(-0.5)
     
+    def show_heatmap(self, heatmap: FeasibilityHeatmap):
+        """显示候选箱子的可行位置热图（每个像素对应一个箱子左下角原点）"""
+        self.heatmap = heatmap
+        self.draw_heatmap()
+    
+    def clear_heatmap(self):
+        """隐藏可行位置热图"""
+        self.heatmap = None
+        if self.heatmap_item is not None:
+            self.scene.removeItem(self.heatmap_item)
+            self.heatmap_item = None
+    
+    def draw_heatmap(self):
+        """把热图绘制为箱子下方的半透明图层：绿色=放入后平衡（越深扭矩余量越大），橙色=扭矩超限"""
+        if self.heatmap_item is not None:
+            self.scene.removeItem(self.heatmap_item)
+            self.heatmap_item = None
+        heatmap = self.heatmap
+        if heatmap is None or not heatmap.feasible.size:
+            return
+        
+        # 图像行对应Y方向、列对应X方向，与场景坐标一致
+        feasible = heatmap.feasible.T
+        balanced = heatmap.balanced.T
+        margin = np.clip(1 - heatmap.load_ratio.T, 0, 1)
+        rgba = np.zeros(feasible.shape + (4,), dtype=np.uint8)
+        rgba[feasible & ~balanced] = (230, 126, 34, 90)
+        rgba[balanced, 0] = 46
+        rgba[balanced, 1] = 204
+        rgba[balanced, 2] = 113
+        rgba[balanced, 3] = (60 + 140 * margin[balanced]).astype(np.uint8)
+        
+        height, width = feasible.shape
+        image = QImage(rgba.data, width, height, width * 4, QImage.Format_RGBA8888).copy()
+        self.heatmap_item = self.scene.addPixmap(QPixmap.fromImage(image))
+        self.heatmap_item.setScale(heatmap.resolution * self.scale_factor)
+        self.heatmap_item.setZValue(-0.8)  # 在网格之上，箱子之下
+    
     def draw_boxes(self):
         """绘制箱子"""
         if not self.container:
             return
         
-        # 清空空间索引
-        if self.spatial_index:
-            self.spatial_index.clear()
-        
         for box in self.container.boxes:
             self.add_box_item(box)
-            # 添加到空间索引
-            if self.spatial_index:
-                bbox = BoundingBox(box.x, box.y,
-                                 box.x + box.actual_length,
-                                 box.y + box.actual_width)
-                self.spatial_index.insert(box, bbox)
     
     def add_box_item(self, box: Box):
         """添加箱子图形项"""
@@ -1119,23 +880,12 @@ class ContainerGraphicsView(QGraphicsView):
         box_item = BoxGraphicsItem(box, self.scale_factor)
         self.scene.addItem(box_item)
         self.box_items[box] = box_item
-        
-        # 添加到空间索引
-        if self.spatial_index:
-            bbox = BoundingBox(box.x, box.y,
-                             box.x + box.actual_length,
-                             box.y + box.actual_width)
-            self.spatial_index.insert(box, bbox)
     
     def remove_box_item(self, box: Box):
         """移除箱子图形项"""
         if box in self.box_items:
             self.scene.removeItem(self.box_items[box])
             del self.box_items[box]
-            
-            # 从空间索引移除
-            if self.spatial_index:
-                self.spatial_index.remove(box)
     
     def add_box(self, box: Box):
         """添加箱子"""
@@ -1230,25 +980,86 @@ class ContainerGraphicsView(QGraphicsView):
     
     def keyPressEvent(self, event):
         """按键事件"""
+        nudges = {Qt.Key_Left: (-1, 0), Qt.Key_Right: (1, 0), Qt.Key_Up: (0, -1), Qt.Key_Down: (0, 1)}
         if event.key() == Qt.Key_Delete:
             # 删除选中的箱子
-            selected_items = self.scene.selectedItems()
-            for item in selected_items:
-                if isinstance(item, BoxGraphicsItem):
-                    if self.container:
-                        self.container.remove_box(item.box)
-                    self.remove_box_item(item.box)
+            self.remove_boxes(self.selected_boxes())
         elif event.key() == Qt.Key_R:
             # 旋转选中的箱子
-            selected_items = self.scene.selectedItems()
-            for item in selected_items:
-                if isinstance(item, BoxGraphicsItem):
-                    if item.box.can_rotate():
-                        item.box.rotate()
-                        item.update_from_box()
+            self.rotate_boxes(self.selected_boxes())
+        elif event.key() in nudges and self.selected_boxes():
+            # 方向键整体微调选中的箱子
+            step = self.NUDGE_STEP_LARGE if event.modifiers() & Qt.ShiftModifier else self.NUDGE_STEP
+            dx, dy = nudges[event.key()]
+            self.move_boxes(self.selected_boxes(), dx * step, dy * step)
         else:
             super().keyPressEvent(event)
     
+    def selected_boxes(self) -> List[Box]:
+        """当前选中的箱子"""
+        return [item.box for item in self.scene.selectedItems() if isinstance(item, BoxGraphicsItem)]
+    
+    def remove_boxes(self, boxes: List[Box]) -> List[Box]:
+        """批量从集装箱移除箱子并删除图形项，返回被移除的箱子"""
+        if not boxes:
+            return []
+        self.edit_started.emit("删除箱子")
+        try:
+            removed = self.container.remove_many(boxes) if self.container else list(boxes)
+            for box in removed:
+                self.remove_box_item(box)
+            # 在编辑结束前通知删除，使删除与移出记入同一条撤销记录
+            self.boxes_deleted.emit(removed)
+        finally:
+            self.edit_finished.emit()
+        self.layout_changed.emit()
+        return removed
+    
+    def rotate_boxes(self, boxes: List[Box]) -> bool:
+        """批量原地旋转箱子；任何一个旋转后超界或重叠时全部不旋转"""
+        if not boxes or not self.container:
+            return False
+        self.edit_started.emit("旋转箱子")
+        try:
+            rotated = self.container.rotate_many(boxes)
+        finally:
+            self.edit_finished.emit()
+        if rotated:
+            for box in boxes:
+                if box in self.box_items:
+                    self.box_items[box].update_from_box()
+            self.layout_changed.emit()
+        return rotated
+    
+    def move_boxes(self, boxes: List[Box], dx: float, dy: float) -> bool:
+        """批量平移箱子；任何一个移动后超界或重叠时全部不移动"""
+        if not boxes or not self.container:
+            return False
+        self.edit_started.emit("移动箱子")
+        try:
+            moved = self.container.move_many([(box, box.x + dx, box.y + dy) for box in boxes])
+        finally:
+            self.edit_finished.emit()
+        if moved:
+            for box in boxes:
+                if box in self.box_items:
+                    self.box_items[box].update_from_box()
+            self.layout_changed.emit()
+        return moved
+    
+    def return_boxes_to_list(self, boxes: List[Box]) -> None:
+        """批量将箱子放回左侧列表"""
+        self.edit_started.emit("放回列表")
+        try:
+            removed = self.container.remove_many(boxes) if self.container else []
+        finally:
+            self.edit_finished.emit()
+        for box in removed:
+            self.remove_box_item(box)
+        parent_view = self.parent()
+        if removed and parent_view and hasattr(parent_view, 'return_boxes_to_list'):
+            parent_view.return_boxes_to_list(removed)
+    
     def dragEnterEvent(self, event):
         """拖入事件"""
         if event.mimeData().hasText() and event.mimeData().text().startswith("box_id:"):
@@ -1288,6 +1099,10 @@ class ContainerView(QWidget):
     box_moved = pyqtSignal(Box, float, float)
     box_placed = pyqtSignal(Box)
     selection_changed = pyqtSignal(object)  # Box or None
+    edit_started = pyqtSignal(str)
+    edit_finished = pyqtSignal()
+    layout_changed = pyqtSignal()
+    boxes_deleted = pyqtSignal(list)
     
     def __init__(self):
         super().__init__()
@@ -1461,23 +1276,36 @@ class ContainerView(QWidget):
         self.status_label = QLabel("就绪")
         self.control_layout.addWidget(self.status_label)
     
+    def on_layout_changed(self):
+        """批量操作完成后刷新一次重叠警告并通知主窗口"""
+        self.check_and_show_overlaps()
+        self.layout_changed.emit()
+    
     def return_box_to_list(self, box):
         """将箱子放回左侧列表"""
+        self.return_boxes_to_list([box])
+    
+    def return_boxes_to_list(self, boxes):
+        """将一批箱子放回左侧列表，界面只刷新一次
+        
+        箱子已从集装箱移除，主窗口的登记表据此把它们放回了待装载列表
+        """
         # 获取主窗口
         main_window = None
         widget = self.parent()
         while widget:
-            if hasattr(widget, 'pending_boxes'):  # 找到主窗口
+            if hasattr(widget, 'registry'):  # 找到主窗口
                 main_window = widget
                 break
             widget = widget.parent()
         
         if main_window:
-            # 重置箱子位置，避免影响后续放置
-            box.x = 0
-            box.y = 0
-            # 添加到待装载列表
-            main_window.pending_boxes.append(box)
+            for box in boxes:
+                # 重置箱子位置，避免影响后续放置
+                box.x = 0
+                box.y = 0
+                if not main_window.registry.is_pending(box):
+                    main_window.registry.add_pending(box)
             # 更新左侧列表显示
             main_window.box_list_panel.set_boxes(main_window.pending_boxes)
             # 更新状态
@@ -1486,6 +1314,10 @@ class ContainerView(QWidget):
     def setup_connections(self):
         """设置信号连接"""
         self.graphics_view.box_moved.connect(self.box_moved.emit)
+        self.graphics_view.edit_started.connect(self.edit_started.emit)
+        self.graphics_view.edit_finished.connect(self.edit_finished.emit)
+        self.graphics_view.layout_changed.connect(self.on_layout_changed)
+        self.graphics_view.boxes_deleted.connect(self.boxes_deleted.emit)
         self.graphics_view.box_selected.connect(self.on_box_selected)
         self.graphics_view.selection_cleared.connect(self.on_selection_cleared)
     
@@ -1523,6 +1355,14 @@ class ContainerView(QWidget):
         """高亮箱子"""
         self.graphics_view.highlight_box(box)
     
+    def show_heatmap(self, heatmap):
+        """显示可行位置热图"""
+        self.graphics_view.show_heatmap(heatmap)
+    
+    def clear_heatmap(self):
+        """隐藏可行位置热图"""
+        self.graphics_view.clear_heatmap()
+    
     def zoom_in(self):
         """放大"""
         self.graphics_view.scale(1.2, 1.2)
@@ -1774,74 +1614,16 @@ class ContainerView(QWidget):
             self.hide_overlap_warning()
     
     def _find_overlapping_pairs(self):
-        """查找所有重叠的箱子对"""
+        """查找所有重叠的箱子对（排序扫描，见 core.collision）"""
         if not self.graphics_view.container:
             return []
             
-        overlapping_pairs = []
-        out_of_bounds_boxes = []
-        boxes = self.graphics_view.container.boxes
         container = self.graphics_view.container
-        
-        # 检查箱子间重叠
-        for i, box1 in enumerate(boxes):
-            for j, box2 in enumerate(boxes[i+1:], i+1):
-                if self._boxes_overlap(box1, box2):
-                    overlapping_pairs.append((box1, box2))
-        
-        # 检查超出边界的箱子
-        for box in boxes:
-            if self._box_out_of_bounds(box, container):
-                out_of_bounds_boxes.append(box)
+        overlapping_pairs = find_overlapping_pairs(container.boxes)
         
         # 如果有超出边界的箱子，添加特殊的"边界重叠"
-        if out_of_bounds_boxes:
+        for box in find_out_of_bounds(container.boxes, container.length, container.width):
             # 创建虚拟的边界对象用于显示
-            for box in out_of_bounds_boxes:
-                overlapping_pairs.append((box, "边界"))
+            overlapping_pairs.append((box, "边界"))
         
         return overlapping_pairs
-    
-    def _box_out_of_bounds(self, box, container):
-        """检查箱子是否超出容器边界"""
-        return (box.x < 0 or box.y < 0 or 
-                box.x + box.actual_length > container.length or
-                box.y + box.actual_width > container.width)
-    
-    def _boxes_overlap(self, box1, box2):
-        """检查两个箱子是否重叠（优化版本）"""
-        # 快速边界检查 - 如果箱子距离太远，直接返回False
-        tolerance = 1.0  # 1mm容差
-        
-        # 计算中心点距离进行快速排除
-        box1_center_x = box1.x + box1.actual_length / 2
-        box1_center_y = box1.y + box1.actual_width / 2
-        box2_center_x = box2.x + box2.actual_length / 2
-        box2_center_y = box2.y + box2.actual_width / 2
-        
-        # 如果中心点距离大于两个箱子尺寸之和，肯定不重叠
-        max_distance_x = (box1.actual_length + box2.actual_length) / 2
-        max_distance_y = (box1.actual_width + box2.actual_width) / 2
-        
-        if (abs(box1_center_x - box2_center_x) > max_distance_x or 
-            abs(box1_center_y - box2_center_y) > max_distance_y):
-            return False
-        
-        # 精确边界检查
-        box1_left = box1.x
-        box1_right = box1.x + box1.actual_length
-        box1_top = box1.y
-        box1_bottom = box1.y + box1.actual_width
-        
-        box2_left = box2.x
-        box2_right = box2.x + box2.actual_length
-        box2_top = box2.y
-        box2_bottom = box2.y + box2.actual_width
-        
-        # 检查是否重叠
-        overlap = not (box1_right <= box2_left + tolerance or 
-                      box2_right <= box1_left + tolerance or 
-                      box1_bottom <= box2_top + tolerance or 
-                      box2_bottom <= box1_top + tolerance)
-        
-        return overlap
\ No newline at end of file
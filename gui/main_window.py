@@ -4,7 +4,7 @@
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                              QSplitter, QMenuBar, QStatusBar, QAction, QFileDialog,
                              QMessageBox, QTabWidget, QDockWidget, QTextEdit, QLabel)
-from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtCore import Qt, pyqtSignal, QThread
 from PyQt5.QtGui import QIcon, QKeySequence
 import os
 from datetime import datetime
@@ -16,8 +16,26 @@ from utils.excel_reader import ExcelReader
 from utils.project_manager import ProjectManager
 from core.container import Container
 from core.box import Box
+from core.heatmap import box_heatmap
+from core.history import History
+from core.registry import BoxRegistry
 from data.sample_boxes import get_sample_boxes
 
+class ExactSolveWorker(QThread):
+    """在后台线程运行精确求解，求解期间界面保持响应"""
+    
+    progress = pyqtSignal(int, float, float, float)  # 节点数, 已用时间, 最佳长度, 下界
+    solved = pyqtSignal(object)  # ExactSolveResult
+    
+    def __init__(self, solver, time_limit, parent=None):
+        super().__init__(parent)
+        self.solver = solver
+        self.time_limit = time_limit
+    
+    def run(self):
+        result = self.solver.run(self.time_limit, progress_callback=self.progress.emit)
+        self.solved.emit(result)
+
 class MainWindow(QMainWindow):
     """主窗口类"""
     
@@ -25,11 +43,14 @@ class MainWindow(QMainWindow):
         super().__init__()
         self.containers = []  # 集装箱列表
         self.current_container_index = 0
-        self.pending_boxes = []  # 待装载箱子列表
+        self.registry = BoxRegistry()  # 箱子登记表：箱子ID → 所在集装箱或待装载列表
         self.excel_reader = ExcelReader()
         self.project_manager = ProjectManager()
         self.current_project_path = None
         self.selected_box = None  # 当前选中的箱子
+        self.history = History()  # 撤销/重做日志
+        self.exact_worker = None  # 正在运行的精确求解
+        self.heatmap_key = None  # 当前热图对应的 (集装箱, 布局版本, 箱子ID, 是否旋转)
         
         self.init_ui()
         self.create_menus()
@@ -39,6 +60,15 @@ class MainWindow(QMainWindow):
         # 创建默认集装箱
         self.add_new_container()
     
+    @property
+    def pending_boxes(self):
+        """待装载箱子列表（由登记表维护，按加入顺序）"""
+        return self.registry.pending
+    
+    @pending_boxes.setter
+    def pending_boxes(self, boxes):
+        self.registry.set_pending(boxes)
+    
     def show_message_box(self, icon, title, text, parent=None):
         """显示居中的消息框"""
         if parent is None:
@@ -182,6 +212,23 @@ class MainWindow(QMainWindow):
         exit_action.triggered.connect(self.close)
         file_menu.addAction(exit_action)
         
+        # 编辑菜单
+        edit_menu = menubar.addMenu('编辑(&E)')
+        
+        # 撤销
+        self.undo_action = QAction('撤销(&U)', self)
+        self.undo_action.setShortcut('Ctrl+Z')
+        self.undo_action.triggered.connect(self.undo)
+        edit_menu.addAction(self.undo_action)
+        
+        # 重做
+        self.redo_action = QAction('重做(&R)', self)
+        self.redo_action.setShortcut('Ctrl+Y')
+        self.redo_action.triggered.connect(self.redo)
+        edit_menu.addAction(self.redo_action)
+        
+        self.update_history_actions()
+        
         # 集装箱菜单
         container_menu = menubar.addMenu('集装箱(&C)')
         
@@ -198,6 +245,39 @@ class MainWindow(QMainWindow):
         clear_action.triggered.connect(self.clear_current_container)
         container_menu.addAction(clear_action)
         
+        container_menu.addSeparator()
+        
+        # 一键装载全部待装载箱子
+        pack_all_action = QAction('一键装载全部箱子(&P)', self)
+        pack_all_action.setShortcut('Ctrl+P')
+        pack_all_action.triggered.connect(self.auto_pack_pending)
+        container_menu.addAction(pack_all_action)
+        
+        # 多起点并行装载
+        multi_pack_action = QAction('多起点并行装载(&M)', self)
+        multi_pack_action.triggered.connect(self.multi_start_pack_pending)
+        container_menu.addAction(multi_pack_action)
+        
+        # 按行装载到当前集装箱
+        row_pack_action = QAction('按行装载到当前集装箱(&R)', self)
+        row_pack_action.triggered.connect(self.row_pack_pending)
+        container_menu.addAction(row_pack_action)
+        
+        # 剪切式装载到当前集装箱
+        guillotine_action = QAction('剪切式装载到当前集装箱(&G)', self)
+        guillotine_action.triggered.connect(self.guillotine_pack_pending)
+        container_menu.addAction(guillotine_action)
+        
+        # 平衡优化当前集装箱
+        optimize_action = QAction('平衡优化当前集装箱(&B)', self)
+        optimize_action.triggered.connect(self.optimize_current_container)
+        container_menu.addAction(optimize_action)
+        
+        # 精确求解当前集装箱（后台运行，再次点击停止）
+        exact_action = QAction('精确求解当前集装箱(&E)', self)
+        exact_action.triggered.connect(self.exact_solve_current_container)
+        container_menu.addAction(exact_action)
+        
         # 测试菜单
         test_menu = menubar.addMenu('测试(&T)')
         
@@ -242,11 +322,16 @@ class MainWindow(QMainWindow):
         # 箱子列表面板信号
         self.box_list_panel.box_selected.connect(self.on_box_selected)
         self.box_list_panel.box_double_clicked.connect(self.on_box_double_clicked)
+        self.box_list_panel.heatmap_toggled.connect(self.update_heatmap)
         
         # 集装箱视图信号
         self.container_view.box_moved.connect(self.on_box_moved)
         self.container_view.box_placed.connect(self.on_box_placed)
         self.container_view.selection_changed.connect(self.on_selection_changed)
+        self.container_view.edit_started.connect(self.history.begin)
+        self.container_view.edit_finished.connect(self.on_edit_finished)
+        self.container_view.layout_changed.connect(self.update_status)
+        self.container_view.boxes_deleted.connect(self.on_boxes_deleted)
     
     def import_excel(self):
         """导入Excel文件"""
@@ -270,6 +355,7 @@ class MainWindow(QMainWindow):
                     self.box_list_panel.set_boxes(boxes)
                     self.log_message(f"成功导入 {len(boxes)} 个箱子")
                     self.update_status()
+                    self.update_heatmap()
                 else:
                     self.show_message_box(QMessageBox.Warning, "导入失败", "没有找到有效的箱子数据")
                     
@@ -330,16 +416,19 @@ class MainWindow(QMainWindow):
     def load_project_from_path(self, file_path: str):
         """从指定路径加载项目"""
         try:
-            success, containers, pending_boxes, project_info = self.project_manager.load_project(file_path)
+            success, containers, pending_boxes, project_info = self.project_manager.load_project(
+                file_path, registry=self.registry)
             
             if success:
                 # 清空当前数据
                 self.containers.clear()
                 self.container_tabs.clear()
+                self.history.clear()
                 
-                # 加载新数据
+                # 加载新数据（登记表已由项目管理器填充）
                 self.containers = containers
-                self.pending_boxes = pending_boxes
+                for container in self.containers:
+                    self.history.watch(container)
                 self.current_project_path = file_path
                 
                 # 更新界面
@@ -359,6 +448,7 @@ class MainWindow(QMainWindow):
                 self.setWindowTitle(f"Container Loading System - {project_name}")
                 
                 self.update_status()
+                self.update_heatmap()
                 self.show_message_box(QMessageBox.Information, "加载成功", f"项目已加载:\n{file_path}")
                 self.log_message(f"项目加载成功: {file_path}")
                 
@@ -386,8 +476,10 @@ class MainWindow(QMainWindow):
             try:
                 from utils.pdf_generator import PDFGenerator
                 
+                # 用布局快照生成报告，生成期间不再读取可变的箱子对象
+                snapshots = [container.snapshot() for container in self.containers]
                 generator = PDFGenerator()
-                success = generator.generate_report(self.containers, file_path, True)
+                success = generator.generate_report(snapshots, file_path, True)
                 
                 if success:
                     self.show_message_box(QMessageBox.Information, "导出成功", f"PDF报告已保存到:\n{file_path}")
@@ -399,31 +491,73 @@ class MainWindow(QMainWindow):
                 self.show_message_box(QMessageBox.Critical, "导出错误", f"导出PDF时出错:\n{str(e)}")
                 self.log_message(f"PDF导出错误: {str(e)}")
     
+    def undo(self):
+        """撤销上一步编辑"""
+        entry = self.history.undo()
+        if entry:
+            self.refresh_after_history(entry)
+            self.log_message(f"撤销: {entry.label}")
+    
+    def redo(self):
+        """重做上一步被撤销的编辑"""
+        entry = self.history.redo()
+        if entry:
+            # 被删除的箱子重做移出后由登记表放回了待装载列表，需再次注销
+            for box in entry.deleted:
+                self.registry.discard(box)
+            self.refresh_after_history(entry)
+            self.log_message(f"重做: {entry.label}")
+    
+    def on_edit_finished(self):
+        """视图中的一次编辑结束"""
+        self.history.end()
+        self.update_history_actions()
+        self.update_heatmap()
+    
+    def refresh_after_history(self, entry):
+        """撤销/重做后刷新界面（被移出集装箱的箱子已由登记表放回待装载列表）"""
+        self.box_list_panel.set_boxes(self.pending_boxes)
+        if self.current_container:
+            self.container_view.set_container(self.current_container)
+        self.update_status()
+        self.update_heatmap()
+    
+    def update_history_actions(self):
+        """根据撤销/重做日志更新菜单项状态"""
+        undo_label = self.history.undo_label
+        redo_label = self.history.redo_label
+        self.undo_action.setEnabled(undo_label is not None)
+        self.undo_action.setText(f"撤销 {undo_label}(&U)" if undo_label else "撤销(&U)")
+        self.redo_action.setEnabled(redo_label is not None)
+        self.redo_action.setText(f"重做 {redo_label}(&R)" if redo_label else "重做(&R)")
+    
     def clear_current_container(self):
         """清空当前集装箱"""
         if self.current_container:
-            # 将集装箱中的所有箱子放回待装载列表
-            boxes_to_return = list(self.current_container.boxes)  # 复制列表避免修改时出错
-            for box in boxes_to_return:
-                # 重置箱子位置
-                box.x = 0
-                box.y = 0
-                # 添加到待装载列表
-                self.pending_boxes.append(box)
-            
-            # 清空集装箱
-            self.current_container.clear()
+            # 将集装箱中的所有箱子放回待装载列表（由登记表跟踪）
+            with self.history.transaction("清空集装箱"):
+                boxes_to_return = list(self.current_container.boxes)  # 复制列表避免修改时出错
+                for box in boxes_to_return:
+                    # 重置箱子位置
+                    box.x = 0
+                    box.y = 0
+                
+                # 清空集装箱
+                self.current_container.clear()
             
             # 更新界面
             self.container_view.update_view()
             self.box_list_panel.set_boxes(self.pending_boxes)
             self.update_status()
+            self.update_heatmap()
             self.log_message(f"已清空当前集装箱，{len(boxes_to_return)}个箱子已放回待装载列表")
     
     def add_new_container(self):
         """添加新集装箱"""
         container = Container(f"集装箱 {len(self.containers) + 1}")
         self.containers.append(container)
+        self.history.watch(container)
+        self.registry.watch(container)
         
         # 添加标签页 - 创建包含集装箱信息的标签内容
         tab_widget = self.create_container_tab_widget(container)
@@ -433,7 +567,250 @@ class MainWindow(QMainWindow):
         self.current_container_index = len(self.containers) - 1
         self.container_view.set_container(container)
         self.update_status()
+        self.update_heatmap()
         self.log_message(f"添加新集装箱: {container.name}")
+        return container
+    
+    def auto_pack_pending(self):
+        """一键将所有待装载箱子装入集装箱，不够时自动新开集装箱"""
+        if not self.pending_boxes:
+            self.show_message_box(QMessageBox.Information, "一键装载", "没有待装载的箱子")
+            return
+        
+        from core.packing import pack_boxes, BEST_FIT
+        
+        self.log_message(f"开始一键装载 {len(self.pending_boxes)} 个箱子...")
+        with self.history.transaction("一键装载"):
+            result = pack_boxes(list(self.pending_boxes), self.containers,
+                                container_factory=self.add_new_container,
+                                strategy=BEST_FIT)
+        
+        # 更新界面（已装入的箱子由登记表移出待装载列表）
+        self.box_list_panel.set_boxes(self.pending_boxes)
+        if self.current_container:
+            self.container_view.set_container(self.current_container)
+        self.update_status()
+        self.update_heatmap()
+        
+        summary = result.summary()
+        for line in summary.split("\n"):
+            self.log_message(line)
+        if result.leftover:
+            leftover_ids = ", ".join(box.id for box in result.leftover[:10])
+            if len(result.leftover) > 10:
+                leftover_ids += " ..."
+            summary += f"\n\n未装入: {leftover_ids}"
+        self.show_message_box(QMessageBox.Information, "一键装载完成", summary)
+    
+    def multi_start_pack_pending(self):
+        """多进程尝试多种装箱顺序，取最佳布局装入空集装箱"""
+        if not self.pending_boxes:
+            self.show_message_box(QMessageBox.Information, "多起点装载", "没有待装载的箱子")
+            return
+        
+        from PyQt5.QtWidgets import QApplication
+        from core.multistart import MultiStartPacker
+        
+        boxes = list(self.pending_boxes)
+        packer = MultiStartPacker(seed=0)
+        self.log_message(f"开始多起点装载 {len(boxes)} 个箱子（{packer.starts} 个起点, {packer.workers} 个进程）...")
+        
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            result = packer.pack(boxes)
+            with self.history.transaction("多起点装载"):
+                leftover = MultiStartPacker.apply(result, boxes, self.add_new_container, self.containers)
+        finally:
+            QApplication.restoreOverrideCursor()
+        
+        # 未装入的箱子留在待装载列表
+        self.box_list_panel.set_boxes(self.pending_boxes)
+        if self.current_container:
+            self.container_view.set_container(self.current_container)
+        self.update_status()
+        self.update_heatmap()
+        
+        summary = result.summary()
+        for line in summary.split("\n"):
+            self.log_message(line)
+        self.show_message_box(QMessageBox.Information, "多起点装载完成", summary)
+    
+    def row_pack_pending(self):
+        """把待装载箱子横跨宽度成排装入当前集装箱（接在已有箱子之后）"""
+        container = self.current_container
+        if not container or not self.pending_boxes:
+            self.show_message_box(QMessageBox.Information, "按行装载", "没有待装载的箱子")
+            return
+        
+        from core.row_packing import RowPacker
+        
+        self.log_message(f"开始按行装载 {len(self.pending_boxes)} 个箱子到 {container.name}...")
+        with self.history.transaction("按行装载"):
+            result = RowPacker().pack(container, self.pending_boxes)
+        
+        # 更新界面（已装入的箱子由登记表移出待装载列表）
+        self.box_list_panel.set_boxes(self.pending_boxes)
+        self.container_view.set_container(container)
+        self.update_status()
+        self.update_heatmap()
+        
+        summary = result.summary()
+        for line in summary.split("\n"):
+            self.log_message(line)
+        self.show_message_box(QMessageBox.Information, "按行装载完成", summary)
+    
+    def guillotine_pack_pending(self):
+        """把待装载箱子以可直线切割分开的布局装入当前集装箱（接在已有箱子之后）"""
+        container = self.current_container
+        if not container or not self.pending_boxes:
+            self.show_message_box(QMessageBox.Information, "剪切式装载", "没有待装载的箱子")
+            return
+        
+        from core.guillotine import GuillotinePacker
+        
+        self.log_message(f"开始剪切式装载 {len(self.pending_boxes)} 个箱子到 {container.name}...")
+        with self.history.transaction("剪切式装载"):
+            result = GuillotinePacker().pack(container, self.pending_boxes)
+        
+        self.box_list_panel.set_boxes(self.pending_boxes)
+        self.container_view.set_container(container)
+        self.update_status()
+        self.update_heatmap()
+        
+        summary = result.summary()
+        for line in summary.split("\n"):
+            self.log_message(line)
+        self.show_message_box(QMessageBox.Information, "剪切式装载完成", summary)
+    
+    def optimize_current_container(self):
+        """在扭矩限制内优化当前集装箱布局（可随时取消）"""
+        container = self.current_container
+        if not container or (not container.boxes and not self.pending_boxes):
+            self.show_message_box(QMessageBox.Information, "平衡优化", "没有可以优化的箱子")
+            return
+        
+        from PyQt5.QtWidgets import QProgressDialog, QApplication
+        from core.optimizer import BalanceOptimizer
+        
+        time_budget = 10.0  # 秒
+        optimizer = BalanceOptimizer(container, self.pending_boxes)
+        
+        progress = QProgressDialog("正在优化布局...", "停止", 0, 100, self)
+        progress.setWindowTitle("平衡优化")
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(0)
+        
+        def on_progress(iteration, elapsed, utilization, balanced):
+            progress.setValue(int(elapsed / time_budget * 100))
+            progress.setLabelText(f"已迭代 {iteration} 次\n"
+                                  f"最佳利用率: {utilization * 100:.1f}% "
+                                  f"({'平衡' if balanced else '超限'})")
+            QApplication.processEvents()
+            if progress.wasCanceled():
+                optimizer.stop()
+        
+        self.log_message(f"开始平衡优化: {container.name}")
+        result = optimizer.run(time_budget, progress_callback=on_progress)
+        progress.close()
+        
+        # 写回集装箱，被取出的箱子回到待装载列表
+        with self.history.transaction("平衡优化"):
+            leftover = optimizer.apply(result)
+        for box in leftover:
+            box.x = 0
+            box.y = 0
+        
+        self.box_list_panel.set_boxes(self.pending_boxes)
+        self.container_view.set_container(container)
+        self.update_status()
+        self.update_heatmap()
+        
+        status = "平衡" if result.is_balanced else "仍超限"
+        message = (f"利用率: {result.utilization * 100:.1f}%\n"
+                   f"左右扭矩: {result.lr_torque / 1000:.1f}kg·m\n"
+                   f"前后扭矩: {result.fr_torque / 1000:.1f}kg·m\n"
+                   f"状态: {status}\n"
+                   f"迭代: {result.iterations} 次, 耗时 {result.elapsed:.1f}s")
+        for line in message.split("\n"):
+            self.log_message(line)
+        self.show_message_box(QMessageBox.Information, "平衡优化完成", message)
+    
+    def exact_solve_current_container(self):
+        """在后台线程精确求解当前集装箱（已有箱子和待装载箱子一起重新排布）"""
+        if self.exact_worker is not None:
+            # 求解进行中：请求停止，返回目前的最佳布局
+            self.exact_worker.solver.stop()
+            self.log_message("已请求停止精确求解")
+            return
+        
+        container = self.current_container
+        if not container or (not container.boxes and not self.pending_boxes):
+            self.show_message_box(QMessageBox.Information, "精确求解", "没有可以装载的箱子")
+            return
+        
+        from core.exact_solver import ExactSolver
+        
+        try:
+            solver = ExactSolver(container, self.pending_boxes)
+        except ValueError as e:
+            self.show_message_box(QMessageBox.Warning, "精确求解", str(e))
+            return
+        
+        time_limit = 30.0  # 秒
+        self.exact_worker = ExactSolveWorker(solver, time_limit, self)
+        self.exact_worker.progress.connect(self.on_exact_progress)
+        self.exact_worker.solved.connect(lambda result: self.on_exact_solved(container, solver, result))
+        self.exact_worker.finished.connect(self.exact_worker.deleteLater)
+        self.log_message(f"开始精确求解: {container.name}, {len(solver.boxes)} 个箱子 "
+                         f"(时间上限 {time_limit:.0f}s, 再次点击菜单可停止)")
+        self.exact_worker.start()
+    
+    def on_exact_progress(self, nodes, elapsed, best_length, lower_bound):
+        """精确求解进度显示在状态栏"""
+        best = f"{best_length:.0f}mm" if best_length != float('inf') else "-"
+        self.status_bar.showMessage(f"精确求解中: {nodes} 个节点, {elapsed:.0f}s, "
+                                    f"最佳长度 {best}, 下界 {lower_bound:.0f}mm")
+    
+    def on_exact_solved(self, container, solver, result):
+        """精确求解完成：布局可以装下且箱子在求解期间未被改动时写回集装箱"""
+        self.exact_worker = None
+        self.status_bar.showMessage("就绪")
+        summary = result.summary()
+        for line in summary.split("\n"):
+            self.log_message(line)
+        
+        # 求解期间箱子可能已被移入其他集装箱、删除或有新箱子放入该集装箱
+        unchanged = (container in self.containers and
+                     set(container.boxes) <= set(solver.boxes) and
+                     all(self.registry.location(box) is container or self.registry.is_pending(box)
+                         for box in solver.boxes))
+        if not unchanged:
+            self.log_message("求解期间箱子已变动，结果未写回")
+            self.show_message_box(QMessageBox.Warning, "精确求解", "求解期间箱子已变动，结果未写回")
+            return
+        if not result.fits:
+            self.show_message_box(QMessageBox.Information, "精确求解", summary)
+            return
+        
+        with self.history.transaction("精确求解"):
+            leftover = solver.apply(result)
+        for box in leftover:
+            box.x = 0
+            box.y = 0
+        
+        self.box_list_panel.set_boxes(self.pending_boxes)
+        if container is self.current_container:
+            self.container_view.set_container(container)
+        self.update_status()
+        self.update_heatmap()
+        self.show_message_box(QMessageBox.Information, "精确求解完成", summary)
+    
+    def closeEvent(self, event):
+        """关闭窗口前结束后台求解"""
+        if self.exact_worker is not None:
+            self.exact_worker.solver.stop()
+            self.exact_worker.wait()
+        super().closeEvent(event)
     
     def save_container_config(self):
         """保存当前集装箱配置"""
@@ -522,6 +899,8 @@ class MainWindow(QMainWindow):
                 
                 # 添加到集装箱列表
                 self.containers.append(container)
+                self.history.watch(container)
+                self.registry.watch(container)
                 
                 # 创建标签页
                 tab_widget = self.create_container_tab_widget(container)
@@ -532,6 +911,7 @@ class MainWindow(QMainWindow):
                 self.current_container_index = len(self.containers) - 1
                 self.container_view.set_container(container)
                 self.update_status()
+                self.update_heatmap()
                 
                 self.show_message_box(QMessageBox.Information, "导入成功", 
                     f"成功导入集装箱配置:\n"
@@ -653,10 +1033,9 @@ class MainWindow(QMainWindow):
             self.container_tabs.removeTab(index)
             
             # 将箱子返回到待装载列表
-            for box in container.boxes:
-                self.pending_boxes.append(box)
-            
             del self.containers[index]
+            self.history.unwatch(container)
+            self.registry.unwatch(container)
             
             # 调整当前索引
             if self.current_container_index >= index:
@@ -668,6 +1047,7 @@ class MainWindow(QMainWindow):
                 self.container_view.set_container(self.current_container)
             
             self.update_status()
+            self.update_heatmap()
             self.log_message(f"已关闭集装箱: {container.name}")
     
     def on_container_tab_changed(self, index):
@@ -676,41 +1056,48 @@ class MainWindow(QMainWindow):
             self.current_container_index = index
             self.container_view.set_container(self.containers[index])
             self.update_status()
+            self.update_heatmap()
     
     def on_box_selected(self, box):
         """箱子被选中"""
         self.info_panel.show_box_info(box)
         self.container_view.highlight_box(box)
+        self.update_heatmap()
     
     def on_box_double_clicked(self, box):
         """箱子被双击"""
         self.log_message(f"双击箱子: {box.id}, 当前位置: ({box.x}, {box.y})")
-        self.log_message(f"当前待装载箱子数量: {len(self.pending_boxes)}")
-        self.log_message(f"箱子是否在待装载列表: {box in self.pending_boxes}")
+        self.log_message(f"当前待装载箱子数量: {self.registry.pending_count}")
+        self.log_message(f"箱子是否在待装载列表: {self.registry.is_pending(box)}")
         
         if self.current_container:
             self.log_message(f"集装箱中现有箱子数量: {len(self.current_container.boxes)}")
-            self.log_message(f"箱子是否已在集装箱: {box in self.current_container.boxes}")
+            self.log_message(f"箱子是否已在集装箱: {box in self.current_container}")
             
-            # 尝试自动放置箱子
+            # 尝试自动放置箱子（放置引擎直接给出紧贴位置）
             position = self.current_container.find_placement_position(box)
+            if position is None and box.can_rotate():
+                # 当前方向放不下时探测旋转90度后的位置，找到才真正旋转
+                position = self.current_container.find_placement_position(box, not box.rotated)
+                if position is not None:
+                    box.rotate()
+                    self.log_message(f"旋转后可以放置: {box.id}")
             self.log_message(f"找到的位置: {position}")
             
             if position:
                 box.move_to(*position)
                 self.log_message(f"移动箱子到位置: {position}")
                 
-                if self.current_container.add_box(box):
+                with self.history.transaction("放置箱子"):
+                    added = self.current_container.add_box(box)
+                if added:
+                    # 登记表随 add_box 把箱子移出待装载列表
                     self.log_message(f"成功添加箱子到集装箱")
-                    if box in self.pending_boxes:
-                        self.pending_boxes.remove(box)
-                        self.log_message(f"从待装载列表移除箱子")
-                    else:
-                        self.log_message(f"警告: 箱子不在待装载列表中!")
                     
                     self.box_list_panel.remove_box(box)
                     self.container_view.add_box(box)
                     self.update_status()
+                    self.update_heatmap()
                     self.log_message(f"自动放置箱子: {box.id}")
                 else:
                     self.log_message(f"无法添加箱子到集装箱: {box.id}")
@@ -721,7 +1108,14 @@ class MainWindow(QMainWindow):
     
     def on_box_moved(self, box, new_x, new_y):
         """箱子被移动"""
-        box.move_to(new_x, new_y)
+        if self.current_container and box in self.current_container:
+            # 视图释放鼠标时已通过集装箱提交的位置不再重复提交
+            recorded = self.current_container.recorded_state(box)
+            if recorded is None or recorded[:2] != (new_x, new_y):
+                # 通过集装箱移动，增量更新重量平衡
+                self.current_container.move_box(box, new_x, new_y)
+        else:
+            box.move_to(new_x, new_y)
         self.update_status()
         
         # 如果这个箱子当前被选中，实时更新右侧信息面板的位置
@@ -731,18 +1125,15 @@ class MainWindow(QMainWindow):
     def on_box_placed(self, box):
         """箱子被放置"""
         self.update_status()
+        self.update_heatmap()
         self.log_message(f"箱子 {box.id} 已放置")
     
     def on_box_dropped(self, box_id, x, y):
         """处理箱子拖拽放置事件"""
-        # 查找要放置的箱子
-        box_to_place = None
-        for box in self.pending_boxes:
-            if box.id == box_id:
-                box_to_place = box
-                break
-        
-        if not box_to_place:
+        # 按ID查找要放置的箱子（只接受待装载列表中的箱子）
+        box_to_place = self.registry.get(box_id)
+        
+        if not box_to_place or not self.registry.is_pending(box_to_place):
             self.log_message(f"错误: 找不到箱子 {box_id}")
             return
         
@@ -762,27 +1153,35 @@ class MainWindow(QMainWindow):
             self.show_message_box(QMessageBox.Warning, "放置失败", "箱子位置超出集装箱边界")
             return
         
-        # 检查是否与其他箱子重叠
-        for other_box in self.current_container.boxes:
-            if box_to_place.overlaps_with(other_box):
-                self.log_message(f"箱子 {box_id} 与箱子 {other_box.id} 重叠")
-                self.show_message_box(QMessageBox.Warning, "放置失败", f"箱子与已有箱子 {other_box.id} 重叠")
-                return
+        # 检查是否与其他箱子重叠（集装箱空间索引筛选候选）
+        collisions = self.current_container.find_collisions(box_to_place)
+        if collisions:
+            other_box = collisions[0]
+            self.log_message(f"箱子 {box_id} 与箱子 {other_box.id} 重叠")
+            self.show_message_box(QMessageBox.Warning, "放置失败", f"箱子与已有箱子 {other_box.id} 重叠")
+            return
         
         # 添加到集装箱
-        if self.current_container.add_box(box_to_place):
-            # 从待装载列表移除
-            self.pending_boxes.remove(box_to_place)
-            
-            # 更新界面
+        with self.history.transaction("放置箱子"):
+            added = self.current_container.add_box(box_to_place)
+        if added:
+            # 登记表随 add_box 把箱子移出待装载列表，这里只更新界面
             self.box_list_panel.remove_box(box_to_place)
             self.container_view.add_box(box_to_place)
             self.update_status()
+            self.update_heatmap()
             self.log_message(f"成功拖拽放置箱子: {box_id}")
         else:
             self.log_message(f"无法添加箱子 {box_id} 到集装箱")
             self.show_message_box(QMessageBox.Warning, "放置失败", "无法将箱子添加到集装箱")
     
+    def on_boxes_deleted(self, boxes):
+        """箱子在视图中被删除：从项目中注销，不回到待装载列表"""
+        for box in boxes:
+            self.registry.discard(box)
+        self.history.mark_deleted(boxes)
+        self.log_message(f"已删除 {len(boxes)} 个箱子")
+    
     def on_selection_changed(self, selected_box):
         """选择发生变化"""
         self.selected_box = selected_box  # 记录当前选中的箱子
@@ -799,6 +1198,7 @@ class MainWindow(QMainWindow):
             self.box_list_panel.set_boxes(sample_boxes)
             self.log_message(f"已加载 {len(sample_boxes)} 个示例箱子")
             self.update_status()
+            self.update_heatmap()
             self.show_message_box(QMessageBox.Information, "加载示例数据", f"成功加载 {len(sample_boxes)} 个示例箱子")
         except Exception as e:
             self.show_message_box(QMessageBox.Critical, "加载失败", f"加载示例数据时出错:\n{str(e)}")
@@ -832,7 +1232,8 @@ class MainWindow(QMainWindow):
         self.log_text.ensureCursorVisible()
     
     def update_status(self):
-        """更新状态栏"""
+        """更新状态栏（拖动过程中也会调用，热图不在这里刷新）"""
+        self.update_history_actions()
         container_count = len(self.containers)
         current_index = self.current_container_index + 1 if self.containers else 0
         
@@ -858,6 +1259,21 @@ class MainWindow(QMainWindow):
             self.box_status_label.setText("箱子: 0")
             self.utilization_label.setText("利用率: 0%")
     
+    def update_heatmap(self):
+        """按左侧列表选中的箱子刷新当前集装箱的可行位置热图（布局、箱子和方向都未变时沿用上次结果）"""
+        box = self.box_list_panel.get_selected_box()
+        container = self.current_container
+        if (not self.box_list_panel.heatmap_btn.isChecked() or box is None
+                or not container or not self.registry.is_pending(box)):
+            self.heatmap_key = None
+            self.container_view.clear_heatmap()
+            return
+        key = (container, container.layout_version, box.id, box.rotated)
+        if key == self.heatmap_key:
+            return
+        self.heatmap_key = key
+        self.container_view.show_heatmap(box_heatmap(container, box))
+    
     @property
     def current_container(self):
         """获取当前集装箱"""
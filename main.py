@@ -8,6 +8,7 @@
 import sys
 import os
 import platform
+import multiprocessing
 
 # 添加当前目录到Python路径，确保打包后能找到模块
 if getattr(sys, 'frozen', False):
@@ -113,4 +114,6 @@ def main():
             msg.exec_()
 
 if __name__ == "__main__":
+    # 打包后的exe使用多进程装箱时需要
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
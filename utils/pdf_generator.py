@@ -109,7 +109,7 @@ class PDFGenerator:
         生成PDF报告
         
         Args:
-            containers: 集装箱列表
+            containers: 集装箱列表（也可以是 Container.snapshot() 生成的布局快照）
             output_path: 输出文件路径
             include_visualization: 是否包含可视化图表
             
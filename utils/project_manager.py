@@ -3,12 +3,13 @@
 
 import json
 import os
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 from pathlib import Path
 
 from core.container import Container
 from core.box import Box
+from core.registry import BoxRegistry
 
 class ProjectManager:
     """项目管理器 - 负责项目的保存和加载"""
@@ -92,12 +93,14 @@ class ProjectManager:
             print(f"保存项目时出错: {str(e)}")
             return False
     
-    def load_project(self, file_path: str) -> Tuple[bool, List[Container], List[Box], Dict[str, Any]]:
+    def load_project(self, file_path: str, registry: Optional[BoxRegistry] = None
+                     ) -> Tuple[bool, List[Container], List[Box], Dict[str, Any]]:
         """
         从JSON文件加载项目
         
         Args:
             file_path: 项目文件路径
+            registry: 箱子登记表，加载成功时被替换为项目中的箱子并跟踪加载的集装箱
             
         Returns:
             Tuple[bool, List[Container], List[Box], Dict]: 
@@ -120,6 +123,8 @@ class ProjectManager:
             
             containers = []
             pending_boxes = []
+            # 按ID登记已加载的箱子，重复ID的箱子只保留第一个
+            loaded = BoxRegistry()
             
             # 加载集装箱数据
             for container_data in project_data.get("containers", []):
@@ -132,25 +137,44 @@ class ProjectManager:
                 # 加载箱子数据
                 for box_data in container_data.get("boxes", []):
                     box = self.create_box_from_data(box_data)
-                    if box:
+                    if box and self.register_loaded_box(loaded, box, container):
                         container.add_box(box)
                 
+                # 按载入的箱子尺寸分布选择空间索引
+                container.tune_spatial_index()
                 containers.append(container)
             
             # 加载待装载箱子数据
             for box_data in project_data.get("pending_boxes", []):
                 box = self.create_box_from_data(box_data)
-                if box:
+                if box and self.register_loaded_box(loaded, box, None):
                     pending_boxes.append(box)
             
             project_info = project_data.get("project_info", {})
             
+            if registry is not None:
+                registry.clear()
+                for container in containers:
+                    registry.watch(container)
+                registry.set_pending(pending_boxes)
+            
             return True, containers, pending_boxes, project_info
             
         except Exception as e:
             print(f"加载项目时出错: {str(e)}")
             return False, [], [], {}
     
+    def register_loaded_box(self, loaded: BoxRegistry, box: Box, container) -> bool:
+        """登记加载的箱子，ID已存在时跳过并返回False"""
+        if box.id in loaded:
+            print(f"跳过重复的箱子ID: {box.id}")
+            return False
+        if container is None:
+            loaded.add_pending(box)
+        else:
+            loaded.place(box, container)
+        return True
+    
     def create_box_from_data(self, box_data: Dict[str, Any]) -> Box:
         """从数据字典创建Box对象"""
         try: